@@ -0,0 +1,93 @@
+# bench_stats.py - measures /stats' path-limited `git log` latency on a
+# synthetic many-commit repo, with and without a commit-graph carrying
+# changed-path Bloom filters (see study_cli_hub/git_maintenance.py). Builds
+# the repo with `git fast-import` in a temp dir, so it never touches this
+# clone's own history.
+#
+#   python scripts/bench_stats.py [--commits 20000] [--users 50] [--runs 5]
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from study_cli_hub import git_maintenance, stats  # noqa: E402
+
+
+def _fast_import_stream(commits, users):
+    """One commit per note edit, round-robin across users, one day apart -
+    roughly the shape of the real repo's history (many small commits, each
+    touching a single subjects/<user>/ folder)."""
+    start = datetime.now(timezone.utc) - timedelta(days=commits // 24 + 1)
+    for i in range(commits):
+        user = f"user{i % users}"
+        when = int((start + timedelta(hours=i)).timestamp())
+        content = f"note revision {i}\n".encode()
+        message = f"Auto-sync {i}".encode()
+        yield b"commit refs/heads/main\n"
+        yield f"committer Bench <bench@example.com> {when} +0000\n".encode()
+        yield f"data {len(message)}\n".encode() + message + b"\n"
+        yield f"M 644 inline subjects/{user}/Subject/note{i % 7}.txt\n".encode()
+        yield f"data {len(content)}\n".encode() + content + b"\n"
+
+
+def build_repo(path, commits, users):
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    proc = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    for chunk in _fast_import_stream(commits, users):
+        proc.stdin.write(chunk)
+    proc.stdin.close()
+    if proc.wait() != 0:
+        raise SystemExit("git fast-import failed")
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=path, check=True)
+
+
+def time_stats(path, users, runs):
+    """Best-of-`runs` wall time for one user's commit-date query - the exact
+    call /stats makes - sampled over a few different users."""
+    sample = [f"user{i}" for i in range(0, users, max(1, users // 5))]
+    best = float("inf")
+    for _ in range(runs):
+        began = time.perf_counter()
+        for user in sample:
+            stats._user_commit_dates(user, cwd=path, lookback_days=100000)
+        best = min(best, (time.perf_counter() - began) / len(sample))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="study-hub-bench-")
+    try:
+        print(f"Building a {args.commits}-commit repo across {args.users} users...")
+        build_repo(workdir, args.commits, args.users)
+
+        without = time_stats(workdir, args.users, args.runs)
+        print(f"without commit-graph:            {without * 1000:8.1f} ms / query")
+
+        began = time.perf_counter()
+        if not git_maintenance.write_commit_graph(cwd=workdir):
+            raise SystemExit("git commit-graph write failed")
+        write_time = time.perf_counter() - began
+        status = git_maintenance.commit_graph_status(cwd=workdir)
+        print(f"commit-graph write:              {write_time * 1000:8.1f} ms (bloom filters: {status['bloom_filters']})")
+
+        with_graph = time_stats(workdir, args.users, args.runs)
+        print(f"with commit-graph + Bloom:       {with_graph * 1000:8.1f} ms / query")
+        print(f"speedup:                         {without / with_graph:8.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
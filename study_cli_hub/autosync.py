@@ -0,0 +1,195 @@
+# autosync.py - debounced background commit+push, so notes reach GitHub a
+# few seconds after you stop writing instead of only at /sync or exit. That
+# makes exit near-instant (there's normally nothing left to push) and means
+# a crash or a closed terminal no longer strands a whole session's work.
+#
+# Writers (/new-note, /edit, /upload, quiz SRS saves, ...) just call
+# notify(); a burst of writes coalesces into a single batch once things
+# have been quiet for DEBOUNCE_SECONDS. Failures retry with exponential
+# backoff. Rebase conflicts are NOT retried - they need a human, so the
+# toolbar points at /sync, which explains how to resolve them.
+#
+# Only the fixed-layout TUI starts a worker: it never prints (its status
+# goes to the TUI toolbar), and the classic REPL is what scripted/piped use
+# drives, where a background push would make output timing-dependent.
+import os
+import threading
+import time
+from datetime import datetime
+
+from study_cli_hub import contribute, github_auth, sync
+
+AUTOSYNC_ENV = "STUDY_HUB_AUTOSYNC"  # set to "off" to only sync at /sync and exit
+DEBOUNCE_SECONDS = 20
+BASE_BACKOFF_SECONDS = 15
+MAX_BACKOFF_SECONDS = 300
+
+_worker = None
+
+
+class AutoSyncWorker:
+    def __init__(self, cwd=None, debounce=DEBOUNCE_SECONDS):
+        self.cwd = cwd or os.getcwd()
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._due_at = None
+        self._stopping = False
+        self._failures = 0
+        self._state = "idle"  # idle | waiting | syncing | synced | retrying | conflict
+        self._last_synced = None
+        self._thread = threading.Thread(target=self._run, name="study-hub-autosync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """A note was written: (re)start the quiet-period countdown. While
+        retrying after a failed push, the backoff still decides when the
+        next attempt is - it can only be pushed later, not earlier."""
+        with self._cond:
+            self._pending += 1
+            if self._state == "retrying":
+                self._due_at = max(self._due_at or 0, time.monotonic() + self.debounce)
+            elif self._state != "conflict":
+                self._due_at = time.monotonic() + self.debounce
+                self._state = "waiting"
+            self._cond.notify()
+
+    def resume(self):
+        """Leaves the conflict/retry state after a manual /sync, picking any
+        changes queued meanwhile back up."""
+        with self._cond:
+            if self._state not in ("conflict", "retrying"):
+                return
+            self._failures = 0
+            self._due_at = None
+            self._state = "idle"
+            if self._pending:
+                self._due_at = time.monotonic() + self.debounce
+                self._state = "waiting"
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+    def status_text(self):
+        with self._cond:
+            state, pending = self._state, self._pending
+            due_at, last_synced = self._due_at, self._last_synced
+        if state == "waiting":
+            return f"☁ {pending} change(s) waiting to sync"
+        if state == "syncing":
+            return "☁ syncing…"
+        if state == "retrying" and due_at is not None:
+            return f"☁ sync failed - retrying in {max(0, round(due_at - time.monotonic()))}s"
+        if state == "conflict":
+            return "☁ sync needs you - run /sync"
+        if state == "synced" and last_synced:
+            return f"☁ synced {last_synced.strftime('%H:%M')}"
+        return ""
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping and (self._due_at is None or self._due_at > time.monotonic()):
+                    timeout = None if self._due_at is None else self._due_at - time.monotonic()
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+                batch, self._pending, self._due_at = self._pending, 0, None
+                self._state = "syncing"
+
+            outcome = self._sync_once()
+
+            with self._cond:
+                if outcome == "ok":
+                    self._failures = 0
+                    self._last_synced = datetime.now()
+                    self._state = "waiting" if self._pending else "synced"
+                elif outcome == "conflict":
+                    self._pending += batch
+                    self._state = "conflict"
+                else:
+                    self._failures += 1
+                    self._pending += batch
+                    backoff = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (self._failures - 1))
+                    # A note written meanwhile shouldn't pull the retry earlier.
+                    self._due_at = max(self._due_at or 0, time.monotonic() + backoff)
+                    self._state = "retrying"
+
+    def _sync_once(self):
+        """One quiet commit+push pass. Returns "ok", "conflict" or "error"."""
+        try:
+            with sync.LOCK:
+                pending = sync.commit_pending(cwd=self.cwd)
+                if pending is None:
+                    return "error"
+                if not pending["needs_push"]:
+                    return "ok"
+                if contribute.has_push_access() is False:
+                    _, err = contribute.contribute_via_fork(cwd=self.cwd)
+                    return "error" if err else "ok"
+
+                result = github_auth.git_push(cwd=self.cwd)
+                if result.returncode == 0:
+                    return "ok"
+                stderr = result.stderr or ""
+                if contribute.is_permission_rejection(stderr):
+                    # The cached permission answer was stale - re-check for
+                    # real, and go through a fork if it's now a "no".
+                    if contribute.has_push_access(refresh=True) is False:
+                        _, err = contribute.contribute_via_fork(cwd=self.cwd)
+                        return "error" if err else "ok"
+                    return "error"
+                if not any(marker in stderr for marker in ("rejected", "fetch first", "non-fast-forward")):
+                    return "error"
+                pull = github_auth.git_pull(cwd=self.cwd)
+                if sync.has_unmerged_paths(cwd=self.cwd):
+                    return "conflict"
+                if pull.returncode != 0:
+                    return "error"  # e.g. offline: worth retrying, unlike a conflict
+                return "ok" if github_auth.git_push(cwd=self.cwd).returncode == 0 else "error"
+        except Exception:
+            return "error"
+
+
+def start(cwd=None):
+    """Starts the process-wide worker unless STUDY_HUB_AUTOSYNC=off or this
+    isn't a git checkout. Safe to call more than once."""
+    global _worker
+    if _worker is not None:
+        return _worker
+    if os.environ.get(AUTOSYNC_ENV, "").strip().lower() == "off":
+        return None
+    if not sync.is_git_repo(cwd=cwd):
+        return None
+    _worker = AutoSyncWorker(cwd=cwd).start()
+    return _worker
+
+
+def notify():
+    """Call after any write under subjects/. A no-op when no worker runs."""
+    if _worker is not None:
+        _worker.notify()
+
+
+def resume():
+    if _worker is not None:
+        _worker.resume()
+
+
+def status_text():
+    return _worker.status_text() if _worker is not None else ""
+
+
+def shutdown():
+    """Stops the worker without waiting out its debounce - whatever is
+    still pending is picked up by the exit auto-push right after."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
@@ -0,0 +1,78 @@
+# cache.py - per-device cache for data derived from note files (CSV row
+# indexes, extracted document text, ...), kept under
+# $XDG_CACHE_HOME/study-cli-hub (~/.cache/study-cli-hub by default).
+# Nothing here is git-synced or precious: every entry can be rebuilt from
+# the note itself, so deleting the folder is always safe.
+#
+# Entries are keyed by the note's absolute path plus its current version
+# (size + mtime), so editing, re-uploading or pulling a new revision of a
+# note simply misses the cache instead of serving stale data.
+import hashlib
+import os
+
+
+def cache_dir(namespace):
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "study-cli-hub", namespace)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _digest(text, length):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:length]
+
+
+def entry_path(namespace, source_path, suffix=""):
+    """Cache file for the *current* version of source_path, named
+    <path hash>-<version hash><suffix> so prune_stale() can find the
+    entries left behind by older versions of the same note."""
+    source_path = os.path.abspath(source_path)
+    name = f"{_digest(source_path, 16)}-{_digest(file_version(source_path), 12)}{suffix}"
+    return os.path.join(cache_dir(namespace), name)
+
+
+def read_bytes(entry):
+    try:
+        with open(entry, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_bytes(entry, data):
+    """Atomic (write + rename), so a crash or a second viewer on the same
+    note never leaves a half-written entry behind. Best-effort: a
+    read-only or full disk just means no caching."""
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, entry)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+    prune_stale(entry)
+
+
+def prune_stale(entry):
+    """Removes entries for older versions of the same note."""
+    directory, name = os.path.split(entry)
+    prefix = name.split("-", 1)[0] + "-"
+    try:
+        others = os.listdir(directory)
+    except OSError:
+        return
+    for other in others:
+        if other.startswith(prefix) and other != name and not other.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass
@@ -1,11 +1,14 @@
 # cli.py - Study CLI Hub v5.0 entry point
 import atexit
 import difflib
+import heapq
+import itertools
 import os
 import random
 import signal
 import subprocess
 import sys
+import time
 from datetime import datetime, timezone
 
 from prompt_toolkit import PromptSession
@@ -16,7 +19,7 @@ from rich.prompt import Prompt
 from rich.table import Table
 from rich.text import Text
 
-from study_cli_hub import __version__, animations, community, contribute, exporter, github_auth, local_state, pomodoro, quiz, search, srs, stats
+from study_cli_hub import __version__, animations, autosync, community, contribute, exporter, git_maintenance, github_auth, fsrs, local_state, pomodoro, quiz, review_queue, search, sparse, srs, stats, sync
 from study_cli_hub.animations import cli_panel as Panel
 from study_cli_hub.completer import SlashCompleter
 from study_cli_hub.doc_repair import repair_document
@@ -47,6 +50,9 @@ MAIN_COMMANDS = [
     ("/explore", "", "Explore other users' study content"),
     ("/search", "what to search for", "Full-text search your and others' notes"),
     ("/quiz", "a subject name or number", "Quiz yourself (flashcards or AI-generated)"),
+    ("/review", "", "Review the flashcards due today across all your subjects"),
+    ("/srs-optimize", "a subject name or number", "Fit the FSRS scheduler to your review history"),
+    ("/quiz-stats", "", "Retention, ease and the next 30 days' review load"),
     ("/stats", "", "Show your subjects/notes/streak dashboard"),
     ("/leaderboard", "", "Rank all known users by streak/activity"),
     ("/digest", "", "See what's new since your last visit"),
@@ -58,6 +64,7 @@ MAIN_COMMANDS = [
     ("/logout", "", "Disconnect your GitHub account"),
     ("/whoami", "", "Show the connected GitHub account"),
     ("/sync", "", "Pull + push notes with GitHub now"),
+    ("/sparse", "on, off or status (default status)", "Only check out your own + global notes"),
     ("/help", "", "Show available commands"),
     ("/exit", "", "Exit (auto-syncs with GitHub)"),
 ]
@@ -101,6 +108,7 @@ FEED_COMMANDS = [
 
 SEARCH_COMMANDS = [
     ("/open", "a result number", "Open a result in the reader"),
+    ("/search-all", "", "Check out every user's notes (sparse mode) and search again"),
     ("/help", "", "Show available commands"),
     ("/back", "", "Return to the main menu"),
 ]
@@ -153,6 +161,7 @@ class SlashPrompt:
 def cleanup_and_push():
     """Cleanup function to auto-push on exit"""
     global auto_push_done
+    autosync.shutdown()
     if not auto_push_done:
         try:
             console.print("\n[yellow]Auto-saving changes...[/yellow]")
@@ -208,32 +217,20 @@ def auto_git_sync():
         pull_result = animations.with_spinner(console, "📥 Pulling latest changes...", github_auth.git_pull)
         if pull_result.returncode == 0:
             console.print("[green]✅ Successfully pulled latest changes[/green]")
+            git_maintenance.refresh_after_pull()
+            sparse.refresh()
         else:
             console.print("[yellow]⚠️ Pull failed (normal if no remote exists, or run /login)[/yellow]")
+            # Nothing new was pulled, but an offline/remote-less clone still
+            # deserves fast /stats - build the graph once if it's missing.
+            if not git_maintenance.commit_graph_status()["bloom_filters"]:
+                git_maintenance.refresh_after_pull()
     except FileNotFoundError:
         console.print("[yellow]⚠️ Git not found - GitHub sync features disabled[/yellow]")
     except Exception as e:
         console.print(f"[yellow]⚠️ GitHub sync error: {e}[/yellow]")
 
 
-def _has_unmerged_paths(cwd=None):
-    result = subprocess.run(
-        ["git", "diff", "--name-only", "--diff-filter=U"], capture_output=True, text=True, cwd=cwd or os.getcwd()
-    )
-    return bool(result.stdout.strip())
-
-
-def _has_unpushed_commits(cwd=None):
-    result = subprocess.run(
-        ["git", "rev-list", "@{u}..HEAD", "--count"], capture_output=True, text=True, cwd=cwd or os.getcwd()
-    )
-    if result.returncode != 0:
-        # No upstream tracking configured (e.g. this is the very first push) -
-        # can't prove there's nothing to push, so assume there is.
-        return True
-    return result.stdout.strip() not in ("", "0")
-
-
 def auto_git_push(max_attempts=3):
     """Commit and push changes to GitHub, using a stored login token if
     present. If the push is rejected because someone else pushed first
@@ -250,43 +247,54 @@ def auto_git_push(max_attempts=3):
     If the logged-in user isn't a collaborator (no direct push access),
     this falls back to forking the repo under their account and opening a
     PR instead - that's what makes using the app hassle-free for literally
-    anyone, while code changes still require a maintainer-reviewed PR."""
+    anyone, while code changes still require a maintainer-reviewed PR.
+
+    Only the subjects/ folders this session wrote to are staged (see
+    sync.py), and a dim per-step timing line is printed at the end."""
+    timer = sync.StepTimer()
     try:
-        status = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, cwd=os.getcwd())
-        if status.returncode != 0:
-            return
+        with sync.LOCK:
+            _auto_git_push(timer, max_attempts)
+    finally:
+        if timer.steps:
+            console.print(f"[dim]⏱ {timer.summary()}[/dim]")
+        autosync.resume()
 
-        if status.stdout.strip():
-            subprocess.run(["git", "add", "."], capture_output=True, text=True, cwd=os.getcwd())
-            commit_message = f"Auto-sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            subprocess.run(["git", "commit", "-m", commit_message], capture_output=True, text=True, cwd=os.getcwd())
 
-        if not _has_unpushed_commits():
+def _auto_git_push(timer, max_attempts):
+    try:
+        pending = sync.commit_pending(timer=timer)
+        if pending is None:
+            return
+
+        if not pending["needs_push"]:
             console.print("[green]✅ No changes to push[/green]")
             return
 
-        access = contribute.has_push_access()
+        with timer.step("permission check"):
+            access = contribute.has_push_access()
         if access is False:
-            pr_url, err = animations.with_spinner(
-                console, "🍴 No direct push access - syncing via your fork...", contribute.contribute_via_fork
-            )
-            if err:
-                console.print(f"[red]❌ {err}[/red]")
-            else:
-                console.print(
-                    f"[green]✅ Synced! Since this only touches your notes, it'll auto-merge shortly:[/green]\n{pr_url}"
-                )
+            _sync_via_fork(timer)
             return
 
         console.print(Panel("[bold cyan]🔄 Auto Push to GitHub[/bold cyan]", expand=False))
 
         for attempt in range(1, max_attempts + 1):
-            push_result = animations.with_spinner(console, "📤 Pushing to GitHub...", github_auth.git_push)
+            with timer.step("push"):
+                push_result = animations.with_spinner(console, "📤 Pushing to GitHub...", github_auth.git_push)
             if push_result.returncode == 0:
                 console.print("[green]✅ Successfully pushed to GitHub[/green]")
                 return
 
             stderr = push_result.stderr or ""
+            if contribute.is_permission_rejection(stderr):
+                # The cached permission answer was stale (e.g. collaborator
+                # access was revoked) - re-check for real before giving up.
+                with timer.step("permission re-check"):
+                    access = contribute.has_push_access(refresh=True)
+                if access is False:
+                    _sync_via_fork(timer)
+                    return
             if not any(marker in stderr for marker in ("rejected", "fetch first", "non-fast-forward")):
                 reason = stderr.strip() or "check your GitHub login (/login) or remote permissions"
                 console.print(f"[red]❌ Push failed: {reason}[/red]")
@@ -296,8 +304,9 @@ def auto_git_push(max_attempts=3):
                 f"[yellow]⚠️ Push rejected (attempt {attempt}/{max_attempts}) - someone else pushed first. "
                 "Pulling + rebasing and retrying...[/yellow]"
             )
-            pull_result = animations.with_spinner(console, "📥 Pulling + rebasing...", github_auth.git_pull)
-            if pull_result.returncode != 0 or _has_unmerged_paths():
+            with timer.step("pull --rebase"):
+                pull_result = animations.with_spinner(console, "📥 Pulling + rebasing...", github_auth.git_pull)
+            if pull_result.returncode != 0 or sync.has_unmerged_paths():
                 console.print(Panel(
                     "[bold red]⚠️ Manual merge conflict during rebase[/bold red]\n\n"
                     "Someone else edited the exact same file/lines you did - this "
@@ -317,6 +326,19 @@ def auto_git_push(max_attempts=3):
         console.print(f"[yellow]⚠️ Auto push error: {e}[/yellow]")
 
 
+def _sync_via_fork(timer):
+    with timer.step("fork + PR"):
+        pr_url, err = animations.with_spinner(
+            console, "🍴 No direct push access - syncing via your fork...", contribute.contribute_via_fork
+        )
+    if err:
+        console.print(f"[red]❌ {err}[/red]")
+    else:
+        console.print(
+            f"[green]✅ Synced! Since this only touches your notes, it'll auto-merge shortly:[/green]\n{pr_url}"
+        )
+
+
 def check_git_status():
     """Check if we're in a git repository and show status"""
     try:
@@ -324,7 +346,7 @@ def check_git_status():
         if result.returncode == 0:
             if result.stdout.strip():
                 console.print("[yellow]You have uncommitted changes[/yellow]")
-                console.print("[dim]These will be auto-committed and pushed on exit or /sync[/dim]")
+                console.print("[dim]Changes under subjects/ will be auto-committed and pushed on exit or /sync[/dim]")
             else:
                 console.print("[green]Working directory is clean[/green]")
         else:
@@ -402,6 +424,7 @@ def create_subject(user_folder):
             f.write(description)
         if user_folder:
             set_visibility(user_folder, name, visibility)
+        autosync.notify()
 
         if is_first_subject:
             animations.rocket_launch(console, f"Your first subject, '{name}', is live!")
@@ -436,6 +459,7 @@ def create_new_note(user_folder, subject):
         content = open_in_editor("")
         with open(path, "w", encoding="utf-8") as f:
             f.write(content)
+        autosync.notify()
         console.print(f"[green]✅ Created new note: {filename}[/green]")
     except Exception as e:
         handle_error(e)
@@ -505,6 +529,8 @@ def main():
 
     user = Prompt.ask("[yellow]Enter your username (press Enter for Global mode)[/yellow]").strip()
     user_folder = user if user else None
+    sync.add_scope(user_folder)
+    sparse.materialize([user_folder])
     console.print(f"[green]✅ Using {'user folder: ' + user_folder if user_folder else 'global mode'}[/green]")
     console.print()
     input("Press Enter to continue...")
@@ -515,10 +541,15 @@ def main():
     # a plain pipe. Piped/scripted/non-tty use (including this project's
     # own automated testing) falls back to the classic scrolling REPL,
     # unchanged.
-    if sys.stdin.isatty():
-        _main_menu_tui(user_folder)
-    else:
-        _main_menu_classic(user_folder)
+    try:
+        if sys.stdin.isatty():
+            _main_menu_tui(user_folder)
+        else:
+            _main_menu_classic(user_folder)
+    finally:
+        # Background question generation would otherwise keep the
+        # interpreter from exiting until its streams finish.
+        quiz.cancel_generation()
 
 
 def _main_menu_tui(user_folder):
@@ -575,6 +606,8 @@ def _main_menu_tui(user_folder):
             def _switch_user():
                 new_user = Prompt.ask("[yellow]Enter new username (or press Enter for Global)[/yellow]").strip()
                 state["user_folder"] = new_user if new_user else None
+                sync.add_scope(state["user_folder"])
+                sparse.materialize([state["user_folder"]])
                 console.print(f"[green]✅ Switched to {'user: ' + state['user_folder'] if state['user_folder'] else 'global mode'}[/green]")
                 input("Press Enter to continue...")
             run_classic(shell, _switch_user)
@@ -597,6 +630,9 @@ def _main_menu_tui(user_folder):
         elif name == "/sync":
             run_classic(shell, lambda: (auto_git_sync(), auto_git_push(), input("Press Enter to continue...")))
 
+        elif name == "/sparse":
+            run_classic(shell, lambda: sparse_flow(state["user_folder"], arg))
+
         elif name == "/help":
             run_classic(shell, lambda: (print_help(MAIN_COMMANDS, "Main Menu Commands"), input("Press Enter to continue...")))
 
@@ -638,6 +674,25 @@ def _main_menu_tui(user_folder):
             else:
                 render_main_screen(shell)
 
+        elif name == "/review":
+            run_classic(shell, lambda: review_menu(state["user_folder"]))
+
+        elif name == "/quiz-stats":
+            run_classic(shell, lambda: (show_quiz_stats(state["user_folder"]), input("Press Enter to continue...")))
+
+        elif name == "/srs-optimize":
+            if not arg:
+                run_classic(shell, lambda: (
+                    console.print("[red]Type /srs-optimize followed by a subject name or number[/red]"),
+                    input("Press Enter to continue..."),
+                ))
+                return
+            subject = resolve_choice(state["subjects"], arg, kind="subject")
+            if subject:
+                run_classic(shell, lambda: srs_optimize_flow(state["user_folder"], subject))
+            else:
+                render_main_screen(shell)
+
         elif name == "/stats":
             if not state["user_folder"]:
                 run_classic(shell, lambda: (
@@ -689,9 +744,12 @@ def _main_menu_tui(user_folder):
         on_submit=lambda raw: handle_submit(shell, raw),
         header_text=header_text(),
         hint_text=" Ctrl+C Exit  ·  / Commands  ·  /help Help ",
+        status_text=autosync.status_text,
     )
+    autosync.start()
     render_main_screen(shell)
     shell.run()
+    autosync.shutdown()
 
     clear_screen()
     animations.typewriter(console, "👋 Thanks for using CLI Study Hub!", style="bold green")
@@ -729,6 +787,8 @@ def _main_menu_classic(user_folder):
             elif name == "/switch-user":
                 user = Prompt.ask("[yellow]Enter new username (or press Enter for Global)[/yellow]").strip()
                 user_folder = user if user else None
+                sync.add_scope(user_folder)
+                sparse.materialize([user_folder])
                 console.print(f"[green]✅ Switched to {'user: ' + user_folder if user_folder else 'global mode'}[/green]")
                 input("Press Enter to continue...")
 
@@ -756,6 +816,9 @@ def _main_menu_classic(user_folder):
                 auto_git_push()
                 input("Press Enter to continue...")
 
+            elif name == "/sparse":
+                sparse_flow(user_folder, arg)
+
             elif name == "/help":
                 print_help(MAIN_COMMANDS, "Main Menu Commands")
                 input("Press Enter to continue...")
@@ -788,6 +851,22 @@ def _main_menu_classic(user_folder):
                 if subject:
                     quiz_menu(user_folder, subject)
 
+            elif name == "/review":
+                review_menu(user_folder)
+
+            elif name == "/quiz-stats":
+                show_quiz_stats(user_folder)
+                input("Press Enter to continue...")
+
+            elif name == "/srs-optimize":
+                if not arg:
+                    console.print("[red]Type /srs-optimize followed by a subject name or number[/red]")
+                    input("Press Enter to continue...")
+                    continue
+                subject = resolve_choice(subjects, arg, kind="subject")
+                if subject:
+                    srs_optimize_flow(user_folder, subject)
+
             elif name == "/stats":
                 if not user_folder:
                     console.print("[yellow]Stats/streaks need a personal user folder - /switch-user to one first.[/yellow]")
@@ -915,12 +994,18 @@ def explore_menu(current_user_folder):
         # heuristic alone - explicitly exclude the current user's own
         # folder so it never shows up as something to "explore".
         globals_ = [g for g in list_global_subjects() if g != current_user_folder]
+        # In sparse mode, other users' folders aren't on disk until opened -
+        # list them from git's own tree instead of dropping them.
+        not_checked_out = sparse.unmaterialized_users(exclude=current_user_folder)
+        users = sorted(set(users) | set(not_checked_out))
         return [("user", u) for u in users] + [("global", g) for g in globals_]
 
     def argument_provider():
         candidates = []
         for kind, name_ in combined_entries():
-            if kind == "user":
+            if kind == "user" and not sparse.is_materialized(name_):
+                candidates.append((name_, "👤 user - not checked out yet"))
+            elif kind == "user":
                 candidates.append((name_, f"👤 user - {len(list_visible_subjects(name_))} subject(s)"))
             else:
                 candidates.append((name_, f"🌍 global subject - {len(list_notes(None, name_))} note(s)"))
@@ -946,7 +1031,11 @@ def explore_menu(current_user_folder):
                     user_table.add_column("Name", width=20)
                     user_table.add_column("Subjects", justify="right", width=10)
                     user_table.add_column("About", width=40)
+                    not_checked_out = set(sparse.unmaterialized_users(exclude=current_user_folder))
                     for i, name_ in users:
+                        if name_ in not_checked_out:
+                            user_table.add_row(str(i), name_, "?", "[dim]not checked out yet - /open fetches it[/dim]")
+                            continue
                         visible = list_visible_subjects(name_)
                         about = ", ".join(visible[:3]) + ("…" if len(visible) > 3 else "") if visible else "[dim]nothing public yet[/dim]"
                         user_table.add_row(str(i), name_, str(len(visible)), about)
@@ -984,6 +1073,13 @@ def explore_menu(current_user_folder):
                 if target:
                     kind_by_name = dict((n, k) for k, n in entries)
                     if kind_by_name[target] == "user":
+                        ok, err = animations.with_spinner(
+                            console, f"📥 Checking out @{target}'s notes...", sparse.materialize, [target]
+                        )
+                        if not ok:
+                            console.print(f"[red]❌ {err}[/red]")
+                            input("Press Enter to continue...")
+                            continue
                         explore_user_menu(target)
                     else:
                         explore_subject_menu(None, target)
@@ -1200,6 +1296,30 @@ def pomodoro_flow(minutes):
     input("Press Enter to continue...")
 
 
+def sparse_flow(user_folder, arg):
+    """/sparse on|off|status - opt in/out of only checking out your own
+    folder plus the global subjects (see sparse.py)."""
+    action = (arg or "status").strip().lower()
+    if action == "on":
+        ok, err = animations.with_spinner(console, "🪶 Switching to a sparse checkout...", sparse.enable, user_folder)
+        if not ok:
+            console.print(f"[red]❌ {err}[/red]")
+    elif action == "off":
+        ok, err = animations.with_spinner(console, "📥 Checking out everything again...", sparse.disable)
+        if not ok:
+            console.print(f"[red]❌ {err}[/red]")
+    elif action != "status":
+        console.print("[red]Type /sparse on, /sparse off, or /sparse status[/red]")
+
+    summary = sparse.checkout_summary()
+    mode = "[green]on[/green]" if sparse.is_enabled() else "[dim]off[/dim]"
+    line = f"Sparse checkout: {mode}"
+    if summary:
+        line += f" - {summary['checked_out']:,} of {summary['tracked']:,} tracked file(s) checked out"
+    console.print(line)
+    input("Press Enter to continue...")
+
+
 def export_flow(user_folder, fmt):
     data = exporter.build_export(user_folder)
     who = user_folder or "global"
@@ -1217,6 +1337,10 @@ def export_flow(user_folder, fmt):
 
 def search_menu(user_folder, term):
     prompt = SlashPrompt(SEARCH_COMMANDS)
+    # In sparse mode, only what's checked out is searched - checking
+    # everyone else out is an explicit /search-all, since it undoes the
+    # sparse checkout for good.
+    others = sparse.unmaterialized_users(exclude=user_folder)
     results, truncated = search.search_notes(term, user_folder)
 
     while True:
@@ -1239,6 +1363,11 @@ def search_menu(user_folder, term):
                 console.print(table)
                 if truncated:
                     console.print("[dim]Results truncated - refine your search term for more precise matches.[/dim]")
+            if others:
+                console.print(
+                    f"[dim]{len(others)} other user folder(s) aren't checked out (sparse mode) and weren't searched - "
+                    "/search-all checks them out and searches again.[/dim]"
+                )
             console.print()
             print_help(SEARCH_COMMANDS, "Commands (type / for live suggestions)")
 
@@ -1251,6 +1380,19 @@ def search_menu(user_folder, term):
             elif name == "/help":
                 print_help(SEARCH_COMMANDS, "Search Commands")
                 input("Press Enter to continue...")
+            elif name == "/search-all":
+                if not others:
+                    console.print("[green]Every user's notes are already checked out and searched.[/green]")
+                    input("Press Enter to continue...")
+                    continue
+                ok, err = animations.with_spinner(
+                    console, f"📥 Checking out {len(others)} other user folder(s)...", sparse.materialize, others
+                )
+                if not ok:
+                    console.print(f"[red]❌ {err}[/red]")
+                    input("Press Enter to continue...")
+                others = sparse.unmaterialized_users(exclude=user_folder)
+                results, truncated = search.search_notes(term, user_folder)
             elif name == "/open":
                 if not arg.isdigit() or not (1 <= int(arg) <= len(results)):
                     console.print(f"[red]Invalid result number! Choose 1-{len(results)}[/red]")
@@ -1294,11 +1436,22 @@ def quiz_menu(user_folder, subject):
         mode = "ai"
 
     questions = flashcards
+    streamed = None
     if mode == "ai":
-        notes_text = quiz.collect_notes_text(user_folder, subject)
-        generated, err = animations.with_spinner(
-            console, "🤖 Generating quiz questions...", quiz.generate_ai_questions, subject, notes_text
-        )
+        # A few chunks of the subject's notes, ones not quizzed on yet first.
+        chunks = quiz.pick_chunks(quiz.collect_note_chunks(user_folder, subject))
+        more = False
+        pooled = quiz.pooled_question_count(chunks)
+        if pooled:
+            console.print(f"[cyan]💾 {pooled} question(s) already generated from these notes.[/cyan]")
+            more = Prompt.ask(
+                "[yellow]Quiz on those, or generate more?[/yellow]", choices=["cached", "more"], default="cached"
+            ) == "more"
+        # Streamed: the quiz starts as soon as the first question has been
+        # written, while the rest are still being generated.
+        streamed = quiz.QuestionStream(subject, chunks, more=more)
+        first = animations.with_spinner(console, "🤖 Generating quiz questions...", streamed.next)
+        generated, err = ([first], None) if first else (None, streamed.error)
         if err:
             console.print(f"[red]❌ {err}[/red]")
             if not flashcards:
@@ -1318,7 +1471,8 @@ def quiz_menu(user_folder, subject):
     srs_state = None
     if mode == "flashcards":
         srs_state = srs.load_state(user_folder, subject)
-        all_ids = [srs.card_id(q["question"]) for q in questions]
+        srs_config = srs.load_config(user_folder, subject)
+        all_ids = [q["id"] for q in questions]
         due_ids = set(srs.due_card_ids(srs_state, all_ids))
         due_questions = [q for q, cid in zip(questions, all_ids) if cid in due_ids]
         if due_questions and len(due_questions) < len(questions):
@@ -1328,51 +1482,72 @@ def quiz_menu(user_folder, subject):
         elif due_questions:
             questions = due_questions
 
-    questions = list(questions)
-    random.shuffle(questions)
-    total = len(questions)
+    if mode == "ai" and streamed is not None:
+        questions = itertools.chain(questions, _streamed_questions(streamed))
+        total = streamed.count
+    else:
+        questions = list(questions)
+        random.shuffle(questions)
+        total = len(questions)
     score = 0
+    asked = 0
 
     console.print(Panel(f"[bold cyan]🎮 Quiz: {subject}[/bold cyan] ({mode}, {total} question(s))", expand=False))
     input("Press Enter to start...")
 
-    for i, q in enumerate(questions, 1):
-        clear_screen()
-        console.print(Panel(f"[bold cyan]Question {i}/{total}[/bold cyan]", expand=False))
-        console.print(q["question"])
-        console.print()
-
-        if mode == "ai":
-            for idx, choice_text in enumerate(q["choices"], 1):
-                console.print(f"  {idx}. {choice_text}")
+    # Every grade is logged the moment it's given (see srs.ReviewLog), so
+    # quitting halfway through keeps the cards already reviewed.
+    review_log = srs.ReviewLog(user_folder, subject, srs_state) if srs_state is not None else None
+    try:
+        for i, q in enumerate(questions, 1):
+            asked = i
+            clear_screen()
+            console.print(Panel(f"[bold cyan]Question {i}/{total}[/bold cyan]", expand=False))
+            console.print(q["question"])
             console.print()
-            answer = Prompt.ask("[yellow]Your answer[/yellow]", choices=[str(n) for n in range(1, len(q["choices"]) + 1)])
-            if int(answer) - 1 == q["answer_index"]:
-                score += 1
-                animations.celebrate(console, "Correct!")
+
+            if mode == "ai":
+                for idx, choice_text in enumerate(q["choices"], 1):
+                    console.print(f"  {idx}. {choice_text}")
+                console.print()
+                answer = Prompt.ask("[yellow]Your answer[/yellow]", choices=[str(n) for n in range(1, len(q["choices"]) + 1)])
+                if int(answer) - 1 == q["answer_index"]:
+                    score += 1
+                    animations.celebrate(console, "Correct!")
+                else:
+                    console.print(f"[red]❌ Not quite - the answer was: {q['choices'][q['answer_index']]}[/red]")
+                    input("Press Enter to continue...")
             else:
-                console.print(f"[red]❌ Not quite - the answer was: {q['choices'][q['answer_index']]}[/red]")
+                shown = time.monotonic()
+                input("[dim]Press Enter to reveal the answer...[/dim]")
+                answer_seconds = time.monotonic() - shown
+                console.print(f"[cyan]A:[/cyan] {q['answer']}")
+                quality = int(Prompt.ask(
+                    "[yellow]How well did you recall it?[/yellow] (1=blackout, 3=hesitated, 5=perfect)",
+                    choices=["1", "2", "3", "4", "5"], default="4",
+                ))
+                if srs_state is not None:
+                    record = srs.review_card(srs_state, q["id"], quality, config=srs_config, answer_seconds=answer_seconds)
+                    review_log.record(q["id"])
+                    console.print(f"[dim]Next review: {record['next_review_date']}[/dim]")
+                if quality >= 3:
+                    score += 1
+                    console.print("[green]✅ Nice![/green]")
+                else:
+                    console.print("[yellow]No worries - it'll come up again sooner next time.[/yellow]")
                 input("Press Enter to continue...")
-        else:
-            input("[dim]Press Enter to reveal the answer...[/dim]")
-            console.print(f"[cyan]A:[/cyan] {q['answer']}")
-            quality = int(Prompt.ask(
-                "[yellow]How well did you recall it?[/yellow] (1=blackout, 3=hesitated, 5=perfect)",
-                choices=["1", "2", "3", "4", "5"], default="4",
-            ))
-            if srs_state is not None:
-                cid = srs.card_id(q["question"])
-                record = srs.review_card(srs_state, cid, quality)
-                console.print(f"[dim]Next review: {record['next_review_date']}[/dim]")
-            if quality >= 3:
-                score += 1
-                console.print("[green]✅ Nice![/green]")
-            else:
-                console.print("[yellow]No worries - it'll come up again sooner next time.[/yellow]")
+    finally:
+        if review_log is not None:
+            review_log.close()
+            if review_log.reviews:
+                autosync.notify()
+
+    if asked < total:
+        # A streamed quiz that came up short: score what was asked.
+        if streamed is not None and streamed.error:
+            console.print(f"[yellow]Only {asked} question(s) could be generated: {streamed.error}[/yellow]")
             input("Press Enter to continue...")
-
-    if srs_state is not None:
-        srs.save_state(user_folder, subject, srs_state)
+        total = asked
 
     clear_screen()
     pct = round(100 * score / total) if total else 0
@@ -1385,6 +1560,193 @@ def quiz_menu(user_folder, subject):
     input("Press Enter to continue...")
 
 
+def _streamed_questions(stream):
+    """The rest of a quiz.QuestionStream, with a spinner whenever the next
+    question hasn't been written yet."""
+    while True:
+        if stream.ready():
+            q = stream.next()
+        else:
+            q = animations.with_spinner(console, "🤖 Writing the next question...", stream.next)
+        if q is None:
+            return
+        yield q
+
+
+def _review_cards(user_folder, subjects):
+    """The due-card heap for /review and {subject: {card id: card}} for the
+    subjects in it, without the cards whose note was edited or deleted
+    since they were scheduled - they can't be shown, so they aren't
+    counted."""
+    queue = review_queue.build_queue(user_folder, subjects)
+    cards = {
+        subject: {card["id"]: card for card in quiz.collect_flashcards(user_folder, subject)}
+        for subject in {subject for _, subject, _ in queue}
+    }
+    queue = [entry for entry in queue if entry[2] in cards[entry[1]]]
+    heapq.heapify(queue)
+    return queue, cards
+
+
+def review_menu(user_folder):
+    """Works through every flashcard due today across all of the user's
+    subjects, most overdue first (see review_queue.py)."""
+    subjects = list_subjects(user_folder)
+    queue, cards = animations.with_spinner(console, "📅 Gathering due cards...", _review_cards, user_folder, subjects)
+    if not queue:
+        upcoming = review_queue.next_due_date(user_folder, subjects)
+        console.print("[green]🎉 Nothing due for review today.[/green]")
+        if upcoming:
+            console.print(f"[dim]Next card comes due on {upcoming}.[/dim]")
+        else:
+            console.print("[dim]Cards are scheduled once you've studied them with /quiz.[/dim]")
+        input("Press Enter to continue...")
+        return
+
+    total = len(queue)
+    console.print(Panel(f"[bold cyan]📅 Review[/bold cyan] ({total} card(s) due across your subjects)", expand=False))
+    if input("Press Enter to start (q to cancel)... ").strip().lower() == "q":
+        return
+
+    states = {}  # subject -> SRS state, loaded when first needed
+    configs = {}  # subject -> scheduler settings
+    logs = {}    # subject -> srs.ReviewLog, each grade is logged as it's given
+    reviewed = score = 0
+    try:
+        while queue:
+            _, subject, cid = heapq.heappop(queue)
+            if subject not in states:
+                states[subject] = srs.load_state(user_folder, subject)
+                configs[subject] = srs.load_config(user_folder, subject)
+                logs[subject] = srs.ReviewLog(user_folder, subject, states[subject])
+            card = cards[subject][cid]
+
+            clear_screen()
+            console.print(Panel(f"[bold cyan]Card {reviewed + 1}/{total}[/bold cyan] | {subject}", expand=False))
+            console.print(card["question"])
+            console.print()
+            shown = time.monotonic()
+            if input("Press Enter to reveal the answer (q to stop)... ").strip().lower() == "q":
+                break
+            answer_seconds = time.monotonic() - shown
+            console.print(f"[cyan]A:[/cyan] {card['answer']}")
+            quality = int(Prompt.ask(
+                "[yellow]How well did you recall it?[/yellow] (1=blackout, 3=hesitated, 5=perfect)",
+                choices=["1", "2", "3", "4", "5"], default="4",
+            ))
+            record = srs.review_card(states[subject], cid, quality, config=configs[subject], answer_seconds=answer_seconds)
+            logs[subject].record(cid)
+            reviewed += 1
+            if quality >= 3:
+                score += 1
+            console.print(f"[dim]Next review: {record['next_review_date']}[/dim]")
+            input("Press Enter to continue...")
+    finally:
+        for review_log in logs.values():
+            review_log.close()
+        if reviewed:
+            autosync.notify()
+
+    clear_screen()
+    console.print(Panel("[bold cyan]🏁 Review session over[/bold cyan]", expand=False))
+    console.print(f"Reviewed {reviewed} card(s), recalled {score}.")
+    if not queue and reviewed:
+        animations.celebrate(console, "Backlog cleared!")
+    input("Press Enter to continue...")
+
+
+_SPARK_BLOCKS = " ▁▂▃▄▅▆▇█"
+
+
+def show_quiz_stats(user_folder):
+    """/quiz-stats - retention, ease and answer times from the review
+    history of all the user's subjects, and the review load for the next
+    30 days (see review_queue.review_stats)."""
+    data = animations.with_spinner(
+        console, "📈 Adding up your reviews...", review_queue.review_stats, user_folder, list_subjects(user_folder)
+    )
+    console.print(Panel(f"[bold cyan]📈 Quiz Stats[/bold cyan] ({data['cards']} scheduled card(s))", expand=False))
+    if not data["cards"]:
+        console.print("[dim]Cards are scheduled once you've studied them with /quiz.[/dim]")
+        return
+
+    forecast = data["forecast"]
+    peak = max(forecast)
+    console.print(f"[bold]Due[/bold]  today {forecast[0]}  ·  tomorrow {forecast[1]}  ·  "
+                  f"next 7 days {sum(forecast[:7])}  ·  next {len(forecast)} days {sum(forecast)}")
+    spark = "".join(_SPARK_BLOCKS[-(-count * (len(_SPARK_BLOCKS) - 1) // peak)] if peak else " " for count in forecast)
+    console.print(f"[cyan]{spark}[/cyan]  [dim](peak {peak}/day)[/dim]")
+    console.print()
+
+    table = Table(title="Recall by days since the previous review", show_header=True, header_style="bold magenta")
+    table.add_column("Gap", width=10)
+    table.add_column("Reviews", justify="right")
+    table.add_column("Recalled", width=30)
+    for label, reviews, recalled in data["retention"]:
+        if reviews:
+            table.add_row(label, str(reviews), f"{render_bar(recalled, reviews, width=20)} {round(100 * recalled / reviews)}%")
+    if table.row_count:
+        console.print(table)
+    else:
+        console.print("[dim]No repeat reviews yet - recall rates show up once cards come back.[/dim]")
+
+    table = Table(title="Ease factors", show_header=True, header_style="bold magenta")
+    table.add_column("Ease", width=10)
+    table.add_column("Cards", width=30)
+    top = max(count for _, count in data["ease"])
+    for label, count in data["ease"]:
+        table.add_row(label, f"{render_bar(count, top, width=20)} {count}")
+    console.print(table)
+
+    answered = [(grade, average, answers) for grade, average, answers in data["seconds"] if answers]
+    if answered:
+        table = Table(title="Time to recall the answer", show_header=True, header_style="bold magenta")
+        table.add_column("Grade", justify="right")
+        table.add_column("Average", justify="right")
+        table.add_column("Reviews", justify="right")
+        for grade, average, answers in answered:
+            table.add_row(str(grade), f"{average:.1f}s", str(answers))
+        console.print(table)
+
+
+def srs_optimize_flow(user_folder, subject):
+    """/srs-optimize - fits FSRS weights to the subject's review history
+    and lets you pick the scheduler the subject uses (see fsrs.py)."""
+    state = srs.load_state(user_folder, subject)
+    config = srs.load_config(user_folder, subject)
+    histories, seeded = srs.fit_histories(state)
+    console.print(Panel(f"[bold cyan]📈 Scheduler for {subject}[/bold cyan] (currently {config['scheduler'].upper()})", expand=False))
+    if seeded:
+        console.print(
+            f"[dim]{seeded} card(s) were reviewed before review histories were kept: they're left out of the fit, "
+            "and FSRS picks them up from their current SM-2 interval rather than starting over.[/dim]"
+        )
+
+    weights = config.get("weights")
+    reviews = fsrs.reviews_to_fit(histories)
+    try:
+        weights, before, after = animations.with_spinner(
+            console, f"📈 Fitting FSRS to {reviews} review(s)...", fsrs.fit, histories, weights
+        )
+        console.print(f"[green]✅ Fitted on {reviews} review(s)[/green] - prediction log loss {before:.4f} → {after:.4f}")
+        config["weights"] = weights
+        config["fitted_reviews"] = reviews
+        config["fitted_on"] = datetime.now().date().isoformat()
+    except (ImportError, ValueError) as e:
+        console.print(Text(str(e), style="yellow"))  # not markup: the hint contains "[fsrs]"
+        console.print("[dim]FSRS can still be used with its default weights, and re-fitted later.[/dim]")
+
+    choice = Prompt.ask("[yellow]Scheduler for this subject[/yellow]", choices=["fsrs", "sm2"], default="fsrs")
+    config["scheduler"] = choice
+    if choice == "fsrs":
+        config.setdefault("weights", fsrs.DEFAULT_WEIGHTS)
+        config.setdefault("desired_retention", fsrs.DEFAULT_DESIRED_RETENTION)
+    srs.save_config(user_folder, subject, config)
+    autosync.notify()
+    console.print(f"[green]✅ {subject} now schedules reviews with {choice.upper()}.[/green]")
+    input("Press Enter to continue...")
+
+
 def format_reactions(groups):
     parts = []
     for g in groups or []:
@@ -9,33 +9,59 @@ import time
 
 import requests
 
-from study_cli_hub import github_auth
+from study_cli_hub import github_auth, local_state
 
 API_URL = "https://api.github.com"
 REPO_OWNER = "govindmehta15"
 REPO_NAME = "study-cli-hub"
 BASE_BRANCH = "main"
 
+# Collaborator status almost never changes, so /sync and the exit push reuse
+# the last answer instead of making a blocking API call before every push.
+# A push rejected for permissions re-checks immediately (refresh=True). A
+# "no" is only trusted briefly: someone just added as a collaborator should
+# stop being routed through a fork within minutes, not the next day.
+PUSH_ACCESS_TTL_SECONDS = 24 * 60 * 60
+PUSH_ACCESS_DENIED_TTL_SECONDS = 10 * 60
+
 
 def _headers(token):
     return {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
 
 
-def has_push_access():
+def has_push_access(refresh=False):
     """Does the logged-in user have push access to the upstream repo? None
     means we couldn't tell (not logged in, or the API call failed) - callers
-    should treat that like "no", since we can't prove otherwise."""
+    should treat that like "no", since we can't prove otherwise.
+
+    Definite answers are cached per account in local_state - True for
+    PUSH_ACCESS_TTL_SECONDS, False for PUSH_ACCESS_DENIED_TTL_SECONDS;
+    refresh=True skips the cache."""
     token_data = github_auth.load_token()
     if not token_data:
         return None
+    cache_key = f"push_access_{token_data.get('login') or 'unknown'}"
+    if not refresh:
+        cached = local_state.get_cached(cache_key, PUSH_ACCESS_TTL_SECONDS)
+        if cached or (cached is False and local_state.get_cached(cache_key, PUSH_ACCESS_DENIED_TTL_SECONDS) is not None):
+            return cached
     try:
         resp = requests.get(
             f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}", headers=_headers(token_data["access_token"]), timeout=15
         )
         resp.raise_for_status()
-        return bool(resp.json().get("permissions", {}).get("push"))
+        access = bool(resp.json().get("permissions", {}).get("push"))
     except requests.RequestException:
         return None
+    local_state.set_cached(cache_key, access)
+    return access
+
+
+def is_permission_rejection(stderr):
+    """Does a failed `git push`'s stderr say the account isn't allowed to
+    push (as opposed to a network error or a non-fast-forward)?"""
+    text = (stderr or "").lower()
+    return any(marker in text for marker in ("permission to", "403", "permission denied", "not allowed to push"))
 
 
 def sync_branch_name(username):
@@ -0,0 +1,98 @@
+# csv_index.py - random access to the records of a large CSV without
+# loading it. One pass over the file records the byte offset where every
+# STRIDE-th record starts; showing a page then means seeking to the nearest
+# checkpoint and parsing forward at most STRIDE records. Memory stays flat
+# (8 bytes per STRIDE records, ~80 KB for a million rows) however big the
+# file is, and the checkpoints are persisted in the cache (see cache.py) so
+# a note is only ever scanned once per version.
+#
+# Record boundaries come from the csv module itself, not from counting
+# newlines, so quoted fields with embedded newlines are handled exactly the
+# way the viewer will later parse them.
+import csv
+import io
+from array import array
+
+from study_cli_hub import cache
+
+STRIDE = 64
+_NAMESPACE = "csv-index"
+_FORMAT_VERSION = 1
+
+
+def _scan(path):
+    """Returns (record_count, checkpoints) for the file as it is now."""
+    checkpoints = array("Q")
+    consumed = [0]  # bytes handed to the csv reader so far
+
+    def lines(f):
+        for raw in f:
+            # Binary iteration only splits on \n; split lone \r line endings
+            # too, the way a newline="" text stream (what csv expects) does.
+            pieces = raw.splitlines(keepends=True) if b"\r" in raw[:-2] else (raw,)
+            for piece in pieces:
+                consumed[0] += len(piece)
+                yield piece.decode("utf-8", errors="ignore")
+
+    records = 0
+    record_start = 0
+    with open(path, "rb") as f:
+        # The reader pulls exactly the lines that make up one record before
+        # returning it, so `consumed` is then where the next record starts.
+        for _ in csv.reader(lines(f)):
+            if records % STRIDE == 0:
+                checkpoints.append(record_start)
+            records += 1
+            record_start = consumed[0]
+    return records, checkpoints
+
+
+class CsvIndex:
+    def __init__(self, path):
+        self.path = path
+        entry = cache.entry_path(_NAMESPACE, path, ".idx")
+        loaded = self._load(entry)
+        if loaded is None:
+            loaded = _scan(path)
+            cache.write_bytes(entry, self._dump(*loaded))
+        self.records, self._checkpoints = loaded
+
+    @staticmethod
+    def _dump(records, checkpoints):
+        return array("Q", [_FORMAT_VERSION, STRIDE, records]).tobytes() + checkpoints.tobytes()
+
+    @staticmethod
+    def _load(entry):
+        data = cache.read_bytes(entry)
+        if not data or len(data) % 8:
+            return None
+        values = array("Q")
+        values.frombytes(data)
+        if len(values) < 3 or values[0] != _FORMAT_VERSION or values[1] != STRIDE:
+            return None
+        records, checkpoints = values[2], values[3:]
+        if len(checkpoints) != (records + STRIDE - 1) // STRIDE:
+            return None
+        return records, checkpoints
+
+    def iter_records(self, start=0):
+        """Yields (record_number, fields) from `start` (0 = the header row)
+        to the end of the file, parsing nothing before the checkpoint."""
+        if start >= self.records:
+            return
+        block = start // STRIDE
+        with open(self.path, "rb") as raw:
+            raw.seek(self._checkpoints[block])
+            text = io.TextIOWrapper(raw, encoding="utf-8", errors="ignore", newline="")
+            for number, fields in enumerate(csv.reader(text), block * STRIDE):
+                if number >= start:
+                    yield number, fields
+
+    def read(self, start, count):
+        """Records [start, start + count) as lists of fields."""
+        rows = []
+        for number, fields in self.iter_records(start):
+            if number >= start + count:
+                break
+            rows.append(fields)
+        return rows
@@ -0,0 +1,300 @@
+# csv_ops.py - sort, filter and group-by for the CSV viewer that work on
+# files far bigger than memory. Nothing here ever holds the rows themselves:
+#
+# * A sorted or filtered view is just a sequence of record numbers, kept in
+#   a temp file (RowOrder) and paged through the viewer's CsvIndex.
+# * sort_view() is an external merge sort: the file is read in chunks of
+#   CHUNK_ROWS, each chunk's keys are sorted in memory - numbers in typed
+#   array('d') / array('Q') buffers rather than lists of Python floats - and
+#   spilled to a temp file, then all the spilled runs are merged lazily.
+# * group_by() aggregates in a dict until it holds GROUP_SPILL_LIMIT
+#   distinct values, spills it as a sorted run, and merges the runs at the
+#   end - so a column with millions of distinct values still works.
+#
+# Values that parse as numbers compare numerically; everything else
+# compares as case-insensitive text.
+import heapq
+import math
+import operator
+import pickle
+import tempfile
+from array import array
+
+CHUNK_ROWS = 200_000
+GROUP_SPILL_LIMIT = 250_000
+GROUP_DISPLAY_LIMIT = 1000
+_BLOCK = 8192
+
+FILTER_OPS = ("=", "!=", ">", ">=", "<", "<=", "~")
+
+
+def _number(text):
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return None if math.isnan(value) else value
+
+
+def resolve_column(header, token):
+    """Column index for a header name (case-insensitive) or a 1-based
+    column number; None if neither matches."""
+    for i, name in enumerate(header):
+        if name.strip().casefold() == token.strip().casefold():
+            return i
+    if token.isdigit() and 1 <= int(token) <= len(header):
+        return int(token) - 1
+    return None
+
+
+def _cell(fields, column):
+    return fields[column].strip() if column < len(fields) else ""
+
+
+class RowOrder:
+    """An ordered sequence of record numbers backed by a temp file, so a
+    view over millions of rows costs no memory."""
+
+    def __init__(self, description):
+        self.description = description
+        self.count = 0
+        self._file = tempfile.TemporaryFile(prefix="study-hub-view-")
+        self._buffer = array("Q")
+
+    def append(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= _BLOCK:
+            self._flush()
+
+    def _flush(self):
+        self._file.seek(0, 2)
+        self._file.write(self._buffer.tobytes())
+        self.count += len(self._buffer)
+        self._buffer = array("Q")
+
+    def finish(self):
+        self._flush()
+        return self
+
+    def slice(self, start, count):
+        self._file.seek(start * 8)
+        records = array("Q")
+        records.frombytes(self._file.read(max(0, min(count, self.count - start)) * 8))
+        return records
+
+    def __iter__(self):
+        for start in range(0, self.count, _BLOCK):
+            yield from self.slice(start, _BLOCK)
+
+    def close(self):
+        self._file.close()
+
+
+# -- sort ---------------------------------------------------------------------
+
+def _spill_numeric(values, records, descending):
+    """Sorts one chunk's numeric keys and writes them out as alternating
+    blocks of raw doubles and record numbers."""
+    order = sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+    run = tempfile.TemporaryFile(prefix="study-hub-sort-")
+    for start in range(0, len(order), _BLOCK):
+        block = order[start:start + _BLOCK]
+        run.write(array("d", (values[i] for i in block)).tobytes())
+        run.write(array("Q", (records[i] for i in block)).tobytes())
+    run.seek(0)
+    return run, len(order)
+
+
+def _read_numeric(run, count):
+    for start in range(0, count, _BLOCK):
+        n = min(_BLOCK, count - start)
+        values, records = array("d"), array("Q")
+        values.frombytes(run.read(n * 8))
+        records.frombytes(run.read(n * 8))
+        yield from zip(values, records)
+    run.close()
+
+
+def _spill_pickled(items):
+    run = tempfile.TemporaryFile(prefix="study-hub-sort-")
+    for start in range(0, len(items), _BLOCK):
+        pickle.dump(items[start:start + _BLOCK], run, protocol=pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run, len(items)
+
+
+def _read_pickled(run, count):
+    seen = 0
+    while seen < count:
+        batch = pickle.load(run)
+        seen += len(batch)
+        yield from batch
+    run.close()
+
+
+def sort_view(index, column, descending=False, chunk_rows=CHUNK_ROWS):
+    """RowOrder of every data row sorted by `column`: numbers first, then
+    text, then empty cells (in file order), numbers and text each ascending
+    or descending. Ties keep file order when ascending."""
+    numeric_runs, text_runs = [], []
+    empties = RowOrder("empty")
+    values, records, texts = array("d"), array("Q"), []
+
+    def spill():
+        if values:
+            numeric_runs.append(_spill_numeric(values, records, descending))
+        if texts:
+            texts.sort(reverse=descending)
+            text_runs.append(_spill_pickled(texts))
+
+    try:
+        for record, fields in index.iter_records(1):
+            value = _cell(fields, column)
+            number = _number(value) if value else None
+            if not value:
+                empties.append(record)
+            elif number is not None:
+                values.append(number)
+                records.append(record)
+            else:
+                texts.append((value.casefold(), record))
+            if len(values) + len(texts) >= chunk_rows:
+                spill()
+                values, records, texts = array("d"), array("Q"), []
+        spill()
+        empties.finish()
+
+        direction = "descending" if descending else "ascending"
+        order = RowOrder(f"sorted by {index.read(0, 1)[0][column]} ({direction})")
+        for _, record in heapq.merge(*(_read_numeric(*run) for run in numeric_runs), reverse=descending):
+            order.append(record)
+        for _, record in heapq.merge(*(_read_pickled(*run) for run in text_runs), reverse=descending):
+            order.append(record)
+        for record in empties:
+            order.append(record)
+        return order.finish()
+    finally:
+        empties.close()
+        for run, _ in numeric_runs + text_runs:
+            run.close()
+
+
+# -- filter -------------------------------------------------------------------
+
+def _matcher(op, target):
+    target_number = _number(target)
+    folded = target.casefold()
+
+    if op == "~":
+        return lambda cell: folded in cell.casefold()
+    if op in ("=", "!="):
+        def equal(cell):
+            number = _number(cell) if target_number is not None and cell else None
+            return number == target_number if number is not None else cell.casefold() == folded
+        return equal if op == "=" else (lambda cell: not equal(cell))
+
+    compare = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}[op]
+    if target_number is not None:
+        def numeric(cell):
+            number = _number(cell) if cell else None
+            return number is not None and compare(number, target_number)
+        return numeric
+    return lambda cell: bool(cell) and compare(cell.casefold(), folded)
+
+
+def filter_view(index, column, op, target):
+    """RowOrder of the data rows (in file order) whose `column` satisfies
+    `op` (one of FILTER_OPS) against `target`. Comparisons are numeric when
+    `target` is a number and the cell parses as one; `~` is "contains"."""
+    matches = _matcher(op, target)
+    order = RowOrder(f"{index.read(0, 1)[0][column]} {op} {target}")
+    for record, fields in index.iter_records(1):
+        if matches(_cell(fields, column)):
+            order.append(record)
+    return order.finish()
+
+
+# -- group by -----------------------------------------------------------------
+
+def _merge_groups(runs):
+    """Merges key-sorted (key, totals) runs, adding up the totals of equal
+    keys. totals is array('d'): [rows, sum col 0, count col 0, sum col 1, ...]."""
+    current_key, current = None, None
+    for key, totals in heapq.merge(*runs, key=lambda group: group[0]):
+        if current is not None and current_key == key:
+            for i in range(len(totals)):
+                current[i] += totals[i]
+            continue
+        if current is not None:
+            yield current_key, current
+        current_key, current = key, array("d", totals)
+    if current is not None:
+        yield current_key, current
+
+
+def group_by(index, column, limit=GROUP_DISPLAY_LIMIT):
+    """Row counts per distinct value of `column`, plus the mean of every
+    column that's numeric throughout the file. Returns {"column",
+    "distinct", "numeric_columns", "groups"}, groups being the `limit`
+    largest as (value, count, {column name: mean}) - most rows first."""
+    header = index.read(0, 1)[0]
+    width = len(header)
+    numeric = [True] * width  # stays True while every non-empty value parses
+    empty_totals = bytes(8 * (1 + 2 * width))
+    groups = {}
+    spilled = []
+
+    def spill():
+        spilled.append(_spill_pickled(sorted(groups.items())))
+        groups.clear()
+
+    try:
+        for _, fields in index.iter_records(1):
+            key = _cell(fields, column)
+            totals = groups.get(key)
+            if totals is None:
+                if len(groups) >= GROUP_SPILL_LIMIT:
+                    spill()
+                totals = groups[key] = array("d", empty_totals)
+            totals[0] += 1
+            for i in range(min(width, len(fields))):
+                if not numeric[i]:
+                    continue
+                value = fields[i].strip()
+                if not value:
+                    continue
+                number = _number(value)
+                if number is None:
+                    numeric[i] = False
+                    continue
+                totals[1 + 2 * i] += number
+                totals[2 + 2 * i] += 1
+
+        in_memory = sorted(groups.items())
+        groups.clear()
+        runs = [_read_pickled(*run) for run in spilled] + [iter(in_memory)]
+
+        numeric_columns = [i for i in range(width) if numeric[i] and i != column]
+        distinct = 0
+        top = []
+        for key, totals in _merge_groups(runs):
+            distinct += 1
+            item = (totals[0], -distinct, key, totals)  # -distinct: earlier keys win ties
+            if len(top) < limit:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+
+        def means(totals):
+            return {header[i]: (totals[1 + 2 * i] / totals[2 + 2 * i] if totals[2 + 2 * i] else None)
+                    for i in numeric_columns}
+
+        return {
+            "column": header[column],
+            "distinct": distinct,
+            "numeric_columns": [header[i] for i in numeric_columns],
+            "groups": [(key, int(totals[0]), means(totals)) for _, _, key, totals in sorted(top, reverse=True)],
+        }
+    finally:
+        for run, _ in spilled:
+            run.close()
@@ -0,0 +1,192 @@
+# csv_stats.py - per-column summary of a CSV note (the viewer's `s` key),
+# computed in a single streaming pass with memory that doesn't grow with the
+# file: type inference, null count, min/max, mean and standard deviation
+# (Welford's online algorithm), an approximate distinct count (HyperLogLog)
+# and the most frequent values (a space-saving sketch). The result is cached
+# per file version (see cache.py), so a big dataset is only summarized once.
+import heapq
+import json
+import math
+
+from study_cli_hub import cache
+
+_NAMESPACE = "csv-stats"
+_FORMAT_VERSION = 1
+
+HLL_PRECISION = 14  # 16 KB of registers per column, ~0.8% standard error
+TOP_K = 5
+TOP_K_CAPACITY = 100  # counters kept per column; more = more accurate top-k
+
+NULL_TOKENS = {"", "null", "none", "na", "n/a", "nan", "-"}
+_BOOLEAN_TOKENS = {"true", "false", "yes", "no"}
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._rest_bits = 64 - precision
+
+    def add(self, value):
+        # str hashes are randomized per process, which is fine: a sketch
+        # only needs to be consistent within the one pass that builds it.
+        h = hash(value) & 0xFFFFFFFFFFFFFFFF
+        bucket = h >> self._rest_bits
+        rest = h & ((1 << self._rest_bits) - 1)
+        rank = self._rest_bits - rest.bit_length() + 1
+        if rank > self.registers[bucket]:
+            self.registers[bucket] = rank
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # linear counting for small sets
+        return round(raw)
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in `capacity` counters (Metwally et al.). Each
+    reported count may overestimate by at most its `error`."""
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # One entry per monitored value; counts in it may be stale (low),
+        # and are refreshed lazily when looking for the minimum.
+        self._heap = []
+
+    def add(self, value):
+        if value in self.counts:
+            self.counts[value] += 1
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[value] = 1
+            self.errors[value] = 0
+            heapq.heappush(self._heap, (1, value))
+            return
+        while True:
+            count, smallest = self._heap[0]
+            if self.counts[smallest] == count:
+                break
+            heapq.heapreplace(self._heap, (self.counts[smallest], smallest))
+        heapq.heapreplace(self._heap, (count + 1, value))
+        del self.counts[smallest], self.errors[smallest]
+        self.counts[value] = count + 1
+        self.errors[value] = count
+
+    def top(self, k=TOP_K):
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(value, count, self.errors[value]) for value, count in ranked]
+
+
+class ColumnSummary:
+    def __init__(self, name):
+        self.name = name
+        self.nulls = 0
+        self.kinds = {"integer": 0, "float": 0, "boolean": 0, "text": 0}
+        self.numeric_min = self.numeric_max = None
+        self.text_min = self.text_max = None
+        self.n = 0  # numeric values seen, for mean/stddev
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.distinct = HyperLogLog()
+        self.frequent = SpaceSaving()
+
+    def add(self, raw):
+        value = raw.strip()
+        if value.lower() in NULL_TOKENS:
+            self.nulls += 1
+            return
+        self.distinct.add(value)
+        self.frequent.add(value)
+
+        if self.text_min is None or value < self.text_min:
+            self.text_min = value
+        if self.text_max is None or value > self.text_max:
+            self.text_max = value
+
+        if self.kinds["text"]:
+            # Already text whatever comes next - skip the (exception-heavy)
+            # number parsing for the rest of the column.
+            self.kinds["text"] += 1
+            return
+        try:
+            number = int(value) if not self.kinds["float"] else float(value)
+            kind = "integer" if isinstance(number, int) else "float" if math.isfinite(number) else "text"
+        except ValueError:
+            try:
+                number = float(value)
+                kind = "float" if math.isfinite(number) else "text"
+            except ValueError:
+                number = None
+                kind = "boolean" if value.lower() in _BOOLEAN_TOKENS else "text"
+        self.kinds[kind] += 1
+        if kind in ("integer", "float"):
+            if self.numeric_min is None or number < self.numeric_min:
+                self.numeric_min = number
+            if self.numeric_max is None or number > self.numeric_max:
+                self.numeric_max = number
+            # Welford: numerically stable running mean/variance.
+            self.n += 1
+            delta = number - self.mean
+            self.mean += delta / self.n
+            self._m2 += delta * (number - self.mean)
+
+    def inferred_type(self):
+        seen = {kind for kind, count in self.kinds.items() if count}
+        if not seen:
+            return "empty"
+        if seen == {"integer"}:
+            return "integer"
+        if seen <= {"integer", "float"}:
+            return "float"
+        if seen == {"boolean"}:
+            return "boolean"
+        return "text"
+
+    def result(self):
+        kind = self.inferred_type()
+        numeric = kind in ("integer", "float")
+        return {
+            "name": self.name,
+            "type": kind,
+            "nulls": self.nulls,
+            "min": self.numeric_min if numeric else self.text_min,
+            "max": self.numeric_max if numeric else self.text_max,
+            "mean": self.mean if numeric else None,
+            "stddev": math.sqrt(self._m2 / (self.n - 1)) if numeric and self.n > 1 else None,
+            "distinct": self.distinct.estimate(),
+            "top": self.frequent.top(),
+        }
+
+
+def summarize(index):
+    """{"rows", "columns": [per-column dicts]} for a CsvIndex'd file, from
+    the cache when this version of the file has been summarized before."""
+    entry = cache.entry_path(_NAMESPACE, index.path, ".json")
+    data = cache.read_bytes(entry)
+    if data:
+        try:
+            cached = json.loads(data)
+            if cached.get("format") == _FORMAT_VERSION:
+                return cached["summary"]
+        except (ValueError, KeyError):
+            pass
+
+    header = index.read(0, 1)[0] if index.records else []
+    columns = [ColumnSummary(name or f"Column {i + 1}") for i, name in enumerate(header)]
+    rows = 0
+    for _, fields in index.iter_records(1):
+        rows += 1
+        for column, value in zip(columns, fields):
+            column.add(value)
+        for column in columns[len(fields):]:
+            column.nulls += 1  # short rows: missing trailing cells are nulls
+
+    summary = {"rows": rows, "columns": [column.result() for column in columns]}
+    cache.write_bytes(entry, json.dumps({"format": _FORMAT_VERSION, "summary": summary}).encode("utf-8"))
+    return summary
@@ -29,20 +29,18 @@ def check_document_issues(file_path):
         if not file_path.lower().endswith(('.doc', '.docx')):
             issues.append("File doesn't have .doc or .docx extension")
         
-        # Try to import python-docx
-        try:
-            import docx
-        except ImportError:
-            issues.append("python-docx library not installed")
+        from study_cli_hub import docx_text
+        if docx_text.etree is None:
+            issues.append("lxml library not installed")
             return issues
         
-        # Try to open the document
+        # Try to read the document
         try:
-            doc = docx.Document(file_path)
+            paragraphs, tables = docx_text.read_document(file_path)
             
             # Check for content
-            has_text = any(para.text.strip() for para in doc.paragraphs)
-            has_tables = len(doc.tables) > 0
+            has_text = bool(paragraphs)
+            has_tables = len(tables) > 0
             
             if not has_text and not has_tables:
                 issues.append("Document appears to be empty")
@@ -50,8 +48,8 @@ def check_document_issues(file_path):
                 issues.append("Document has tables but no text content")
             
             # Check for very long paragraphs (might indicate corruption)
-            for para in doc.paragraphs:
-                if len(para.text) > 10000:
+            for text in paragraphs:
+                if len(text) > 10000:
                     issues.append("Document has unusually long paragraphs (possible corruption)")
                     break
                     
@@ -74,9 +72,7 @@ def suggest_repairs(issues):
     suggestions = []
     
     for issue in issues:
-        if "python-docx" in issue:
-            suggestions.append("Install python-docx: pip install python-docx")
-        elif "lxml" in issue:
+        if "lxml" in issue:
             suggestions.append("Install lxml: pip install lxml")
         elif "empty" in issue.lower():
             suggestions.append("Document might be empty - check if it has content in Word")
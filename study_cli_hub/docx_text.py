@@ -0,0 +1,150 @@
+# docx_text.py - lightweight DOCX text extraction. Reads the main document
+# part straight out of the zip with lxml's iterparse and clears each
+# top-level paragraph/table as soon as it has been turned into text, instead
+# of building python-docx's full object tree for the whole document just to
+# read paragraph text. Memory stays proportional to one paragraph/table,
+# and big reports open noticeably faster.
+#
+# The text rules mirror python-docx (Document.paragraphs / Document.tables,
+# Paragraph.text, _Cell.text, Row.cells) so paragraph N here is paragraph N
+# everywhere: the viewer, /search jump targets and /repair all number the
+# non-empty body paragraphs the same way they did before.
+import posixpath
+import zipfile
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _TBL, _BODY = _W + "p", _W + "tbl", _W + "body"
+_R, _HYPERLINK, _TR, _TC = _W + "r", _W + "hyperlink", _W + "tr", _W + "tc"
+_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_OFFICE_DOCUMENT = "/officeDocument"
+
+
+class DocxError(Exception):
+    """The file isn't a readable .docx (not a zip, no document part, or
+    malformed XML) - typically corrupted, encrypted or an old binary .doc."""
+
+
+def _run_text(run):
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag in (_W + "tab", _W + "ptab"):
+            parts.append("\t")
+        elif tag == _W + "br":
+            # Only line breaks are text; page/column breaks are layout.
+            if child.get(_W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _W + "cr":
+            parts.append("\n")
+        elif tag == _W + "noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    """Same as python-docx's Paragraph.text: direct runs and hyperlinked
+    runs only."""
+    parts = []
+    for child in p:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == _R)
+    return "".join(parts)
+
+
+def _cell_props(tc):
+    span, continues = 1, False
+    props = tc.find(_W + "tcPr")
+    if props is not None:
+        grid_span = props.find(_W + "gridSpan")
+        if grid_span is not None:
+            try:
+                span = max(1, int(grid_span.get(_W + "val", "1")))
+            except ValueError:
+                pass
+        v_merge = props.find(_W + "vMerge")
+        continues = v_merge is not None and v_merge.get(_W + "val", "continue") == "continue"
+    return span, continues
+
+
+def table_rows(tbl):
+    """Rows as lists of cell text, like [[c.text for c in row.cells] for
+    row in table.rows]: a horizontally merged cell repeats once per grid
+    column it spans, and a vertically merged one repeats the text of the
+    cell it continues."""
+    rows = []
+    above = {}  # grid column -> text of the cell there in the previous row
+    for tr in tbl.iterchildren(_TR):
+        row, column = [], 0
+        for tc in tr.iterchildren(_TC):
+            span, continues = _cell_props(tc)
+            if continues:
+                text = above.get(column, "")
+            else:
+                text = "\n".join(paragraph_text(p) for p in tc.iterchildren(_P))
+            for offset in range(span):
+                row.append(text)
+                above[column + offset] = text
+            column += span
+        rows.append(row)
+    return rows
+
+
+def _main_part(archive):
+    """The document part's path inside the zip, from the package rels
+    (almost always word/document.xml)."""
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"))
+        for rel in rels.iter(_RELS_NS + "Relationship"):
+            if rel.get("Type", "").endswith(_OFFICE_DOCUMENT):
+                return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    except (KeyError, etree.XMLSyntaxError):
+        pass
+    return "word/document.xml"
+
+
+def iter_blocks(path):
+    """Yields ("paragraph", text) for each non-empty body paragraph and
+    ("table", rows) for each body table, in document order. Paragraphs
+    inside tables belong to their table. Raises DocxError for files that
+    can't be read as a .docx."""
+    if etree is None:
+        raise ImportError("lxml is required to read .docx files (pip install lxml)")
+    try:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(_main_part(archive)) as stream:
+                for _, elem in etree.iterparse(stream, events=("end",), tag=(_P, _TBL), resolve_entities=False):
+                    parent = elem.getparent()
+                    if parent is None or parent.tag != _BODY:
+                        continue  # a table's own paragraphs, handled with the table
+                    if elem.tag == _P:
+                        text = paragraph_text(elem)
+                        if text.strip():
+                            yield "paragraph", text
+                    else:
+                        yield "table", table_rows(elem)
+                    # Drop everything parsed so far at body level.
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise DocxError(f"Package not found or damaged: {e}") from e
+    except etree.XMLSyntaxError as e:
+        raise DocxError(f"Malformed document XML: {e}") from e
+
+
+def read_document(path):
+    """(paragraphs, tables) - non-empty body paragraph texts and body
+    tables' rows - collected in one streaming pass."""
+    paragraphs, tables = [], []
+    for kind, content in iter_blocks(path):
+        (paragraphs if kind == "paragraph" else tables).append(content)
+    return paragraphs, tables
@@ -0,0 +1,75 @@
+# extract.py - the plain text inside PDF and DOCX notes, extracted once per
+# note version and kept in the per-device cache (see cache.py). PyPDF2 has
+# to re-parse every page's content stream and a DOCX has to be unzipped and
+# walked, which is far too slow to redo every time /search scans a subject
+# or a quiz needs the subject's full text; a cache hit is one small file
+# read.
+#
+# Text is kept as blocks - one per PDF page, one per non-empty DOCX body
+# paragraph - numbered the same way the viewers number them, so a location
+# found in the extracted text is a valid jump target.
+import json
+
+from study_cli_hub import cache, docx_text
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+DOCUMENT_EXTENSIONS = {"pdf", "docx"}
+
+_NAMESPACE = "text"
+_FORMAT_VERSION = 1
+_KINDS = {"pdf": "page", "docx": "paragraph"}
+
+
+def block_kind(ext):
+    """What one block of a document with this extension is ("page" or
+    "paragraph")."""
+    return _KINDS[ext]
+
+
+def _extract(path, ext):
+    if ext == "pdf":
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            return [page.extract_text() or "" for page in reader.pages]
+    paragraphs, _ = docx_text.read_document(path)
+    return paragraphs
+
+
+def document_blocks(path, ext):
+    """The text blocks of a PDF or DOCX note, or None when they can't be
+    read here (PyPDF2/lxml not installed, or the file can't be opened). A
+    damaged document is cached as having no text, so it isn't re-parsed
+    until it changes."""
+    if (ext == "pdf" and PyPDF2 is None) or (ext == "docx" and docx_text.etree is None):
+        return None
+    try:
+        entry = cache.entry_path(_NAMESPACE, path, ".json")
+    except OSError:
+        return None
+    data = cache.read_bytes(entry)
+    if data:
+        try:
+            cached = json.loads(data)
+            if cached.get("format") == _FORMAT_VERSION:
+                return cached["blocks"]
+        except (ValueError, KeyError):
+            pass
+
+    try:
+        blocks = _extract(path, ext)
+    except OSError:
+        return None
+    except Exception:
+        blocks = []  # damaged/encrypted: nothing extractable in this version
+    cache.write_bytes(entry, json.dumps({"format": _FORMAT_VERSION, "blocks": blocks}).encode("utf-8"))
+    return blocks
+
+
+def document_text(path, ext):
+    """A PDF or DOCX note's text as one string ("" when there's none to be
+    had)."""
+    return "\n\n".join(block for block in document_blocks(path, ext) or [] if block.strip())
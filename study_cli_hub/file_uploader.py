@@ -5,6 +5,7 @@ from rich.table import Table
 from rich.prompt import Prompt
 from rich.panel import Panel
 from rich.text import Text
+from study_cli_hub import autosync
 from study_cli_hub.animations import glitch_reveal
 from study_cli_hub.error_handler import handle_error
 from study_cli_hub.paths import subject_path
@@ -292,6 +293,7 @@ def upload_file(user_folder, subject):
             console.print(f"[yellow]⚠️ File exists, saving as: {os.path.basename(dest_path)}[/yellow]")
         
         shutil.copy2(path, dest_path)
+        autosync.notify()
         glitch_reveal(console, f"✅ Uploaded: {os.path.basename(dest_path)}", style="bold green")
         
     except Exception as e:
@@ -1,12 +1,17 @@
 # file_viewer.py
-import os, csv, sys, subprocess, tempfile
+import os, re, shlex, subprocess, tempfile
 from rich.console import Console
 from rich.table import Table
-from rich.text import Text
 from rich.prompt import Prompt
+from rich.segment import SegmentLines
 from datetime import datetime
-from study_cli_hub.animations import cli_panel as Panel
+from study_cli_hub import autosync, csv_ops, csv_stats, docx_text
+from study_cli_hub.animations import cli_panel as Panel, with_spinner
+from study_cli_hub.csv_index import CsvIndex
 from study_cli_hub.error_handler import handle_error
+from study_cli_hub.line_index import LineIndex
+from study_cli_hub.pdf_pages import PageTextCache
+from study_cli_hub.viewer_screen import ViewerScreen
 from study_cli_hub.paths import note_path
 
 console = Console()
@@ -21,11 +26,6 @@ try:
 except:
     PyPDF2 = None
 
-try:
-    import docx
-except:
-    docx = None
-
 _ZIP_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
 
 
@@ -105,93 +105,31 @@ def open_in_editor(initial_content=""):
     return "\n".join(lines) if lines else initial_content
 
 
-def print_nav_table(items, extra=None):
+_nav_tables = {}  # (items, width) -> rendered lines
+
+
+def print_nav_table(items, extra=None, out=None):
     """Renders a viewer's key bindings as a compact table, meant to be
     printed last so it sits pinned at the bottom of the screen right above
     the key-press prompt. `items` is a list of (key, action) pairs; `extra`
-    is an optional trailing status line (e.g. active search term)."""
-    table = Table(show_header=False, box=None, padding=(0, 1, 0, 0))
-    table.add_column(style="bold yellow", no_wrap=True)
-    table.add_column(style="dim")
-    for key, action in items:
-        table.add_row(key, action)
-    console.print(table)
+    is an optional trailing status line (e.g. active search term). `out`
+    is the console to print to - a ViewerScreen frame, or the terminal.
+
+    The table is the same on every frame of a viewer, so it's only laid
+    out once per terminal width."""
+    out = out or console
+    cache_key = (tuple(items), out.width)
+    lines = _nav_tables.get(cache_key)
+    if lines is None:
+        table = Table(show_header=False, box=None, padding=(0, 1, 0, 0))
+        table.add_column(style="bold yellow", no_wrap=True)
+        table.add_column(style="dim")
+        for key, action in items:
+            table.add_row(key, action)
+        lines = _nav_tables[cache_key] = out.render_lines(table, pad=False, new_lines=True)
+    out.print(SegmentLines(lines))
     if extra:
-        console.print(extra)
-
-def get_key():
-    """Cross-platform key input with improved navigation"""
-    try:
-        import msvcrt
-        if msvcrt.kbhit():
-            key = msvcrt.getch()
-            if key == b'\xe0':  # Special key
-                key = msvcrt.getch()
-                if key == b'H': return '\x1b[A'  # Up arrow
-                elif key == b'P': return '\x1b[B'  # Down arrow
-                elif key == b'K': return '\x1b[D'  # Left arrow
-                elif key == b'M': return '\x1b[C'  # Right arrow
-                elif key == b'G': return '\x1b[H'  # Home
-                elif key == b'O': return '\x1b[F'  # End
-                elif key == b'I': return '\x1b[5~'  # Page Up
-                elif key == b'Q': return '\x1b[6~'  # Page Down
-            elif key == b' ': return ' '
-            elif key == b'q': return 'q'
-            elif key == b'/': return '/'
-            elif key == b':': return ':'
-            elif key == b'h': return 'h'
-            elif key == b'n': return 'n'
-            elif key == b'p': return 'p'
-            elif key == b't': return 't'
-            elif key == b'g': return 'g'
-            elif key == b'G': return 'G'
-            elif key == b'j': return 'j'
-            elif key == b'k': return 'k'
-            elif key == b'l': return 'l'
-            elif key == b'?': return '?'
-            elif key == b'\r': return '\r'
-    except ImportError:
-        # Unix/Linux/Mac
-        import termios, tty
-        if not sys.stdin.isatty():
-            return None
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':  # ESC sequence
-                seq = sys.stdin.read(1)
-                if seq != '[':
-                    return None
-                third = sys.stdin.read(1)
-                if third in 'ABCDHF':
-                    # 3-byte sequences: ESC [ A/B/C/D/H/F
-                    return '\x1b[' + third
-                elif third in '56':
-                    # 4-byte sequences: ESC [ 5/6 ~  (Page Up/Down)
-                    fourth = sys.stdin.read(1)
-                    if fourth == '~':
-                        return '\x1b[' + third + fourth
-                return None
-            elif ch == ' ': return ' '
-            elif ch == 'q': return 'q'
-            elif ch == '/': return '/'
-            elif ch == ':': return ':'
-            elif ch == 'h': return 'h'
-            elif ch == 'n': return 'n'
-            elif ch == 'p': return 'p'
-            elif ch == 't': return 't'
-            elif ch == 'g': return 'g'
-            elif ch == 'G': return 'G'
-            elif ch == 'j': return 'j'
-            elif ch == 'k': return 'k'
-            elif ch == 'l': return 'l'
-            elif ch == '?': return '?'
-            elif ch == '\r': return '\r'
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    return None
+        out.print(extra)
 
 def interactive_text_reader(path, filename, start_line=0):
     """Interactive text file reader with navigation and highlighting"""
@@ -208,114 +146,176 @@ def interactive_text_reader(path, filename, start_line=0):
         return
 
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
+        # Memory-mapped and indexed lazily, so huge files open instantly and
+        # only the visible window is ever decoded (see line_index.py).
+        index = LineIndex(path)
+    except (OSError, ValueError) as e:
+        handle_error(e)
+        return
 
+    try:
         highlighted = set()
-        search_results = []
-        search_index = 0
-        current_line = max(0, min(start_line, len(lines) - 1)) if lines else 0
+        # The search runs in a worker (see LineSearch) and its hits keep
+        # arriving while you read; `jump_from` is set until the first hit at
+        # or after that line has been found and jumped to.
+        search = None
+        search_regex = False
+        search_case = False
+        jump_from = None
+        index.ensure(start_line)
+        current_line = max(0, min(start_line, index.known - 1))
         lines_per_page = 20
 
-        while True:
-            console.clear()
-
-            # Header
-            header = f"[bold cyan]{filename}[/bold cyan] | Line {current_line + 1}/{len(lines)}"
-            if search_results:
-                header += f" | Search: {len(search_results)} results"
-            console.print(Panel(header, expand=False))
-            console.print()
-
-            # Display lines
-            start_line = max(0, current_line - lines_per_page // 2)
-            end_line = min(len(lines), start_line + lines_per_page)
-
-            for i in range(start_line, end_line):
-                line_no = f"{i+1:>4}"
-                line_text = lines[i].rstrip()
-
-                # Highlighting
-                if i in highlighted:
-                    console.print(f"[bold black on yellow]{line_no} {line_text}[/bold black on yellow]")
-                elif i == current_line:
-                    console.print(f"[bold white on blue]{line_no} {line_text}[/bold white on blue]")
-                else:
-                    console.print(f"[green]{line_no}[/green] {line_text}")
+        def search_modes():
+            modes = (["regex"] if search_regex else []) + (["match case"] if search_case else [])
+            return f" ({', '.join(modes)})" if modes else ""
 
-            # Footer
-            if current_line >= len(lines) - 1:
-                console.print("\n[bold yellow]End of file[/bold yellow]")
+        def start_search(term):
+            try:
+                return index.search(term, regex=search_regex, case_sensitive=search_case)
+            except re.error as e:
+                screen.notify(f"[red]Invalid regex: {e}[/red]")
+                return None
 
-            console.print()
-            print_nav_table([
-                ("↑/↓ k/j", "Scroll line by line"),
-                ("PgUp/PgDn u/d", "Jump a page"),
-                ("g / G", "Go to beginning / end"),
-                (":", "Go to a specific line number"),
-                ("Space / h", "Highlight/unhighlight line"),
-                ("/", "Search in file"),
-                ("n / p", "Next / previous search result"),
-                ("?", "Help"),
-                ("q", "Quit"),
-            ])
-
-            # Get user input
-            key = get_key()
-            if not key:
-                continue
-                
-            if key == '\x1b[A' or key == 'k':  # Up arrow or k
-                current_line = max(0, current_line - 1)
-            elif key == '\x1b[B' or key == 'j':  # Down arrow or j
-                current_line = min(len(lines) - 1, current_line + 1)
-            elif key == '\x1b[5~' or key == 'u':  # Page Up or u
-                current_line = max(0, current_line - lines_per_page)
-            elif key == '\x1b[6~' or key == 'd':  # Page Down or d
-                current_line = min(len(lines) - 1, current_line + lines_per_page)
-            elif key == ' ' or key == 'h':  # Space or h for highlight
-                # Toggle highlight for current line
-                if current_line in highlighted:
-                    highlighted.remove(current_line)
-                else:
-                    highlighted.add(current_line)
-            elif key == '/':  # Search
-                search_term = Prompt.ask("[yellow]Enter search term[/yellow]").strip()
-                if search_term:
-                    search_results = []
-                    for i, line in enumerate(lines):
-                        if search_term.lower() in line.lower():
-                            search_results.append(i)
-                    if search_results:
-                        current_line = search_results[0]
-                        console.print(f"[green]Found {len(search_results)} results[/green]")
+        with ViewerScreen() as screen:
+            while True:
+                # Read once per pass: the worker may finish at any moment,
+                # and a pass that saw it running must poll again.
+                searching = search is not None and not search.done
+                if search and jump_from is not None:
+                    hit = search.next_after(jump_from - 1)
+                    if hit is None and not searching:
+                        hit = search.first()  # wrap around to the top
+                        if hit is None:
+                            screen.notify("[red]No results found[/red]")
+                            jump_from = None
+                    if hit is not None:
+                        index.ensure(hit)
+                        current_line = hit
+                        jump_from = None
+
+                with screen.frame() as out:
+                    # Display lines
+                    start_line = max(0, current_line - lines_per_page // 2)
+                    index.ensure(start_line + lines_per_page)
+                    end_line = min(index.known, start_line + lines_per_page)
+
+                    # Header - the total isn't known until the whole file is indexed.
+                    total = f"{index.known}" if index.complete else f"{index.known}+"
+                    header = f"[bold cyan]{filename}[/bold cyan] | Line {current_line + 1}/{total}"
+                    if search:
+                        header += f" | Search{search_modes()}: {search.count()} results"
+                        if not search.done:
+                            header += f" so far ({search.progress:.0%})"
+                    out.print(Panel(header, expand=False))
+                    out.print()
+
+                    rows = []
+                    for i in range(start_line, end_line):
+                        line_no = f"{i+1:>4}"
+                        line_text = index.line(i)
+
+                        # Highlighting
+                        if i in highlighted:
+                            rows.append(f"[bold black on yellow]{line_no} {line_text}[/bold black on yellow]")
+                        elif i == current_line:
+                            rows.append(f"[bold white on blue]{line_no} {line_text}[/bold white on blue]")
+                        else:
+                            rows.append(f"[green]{line_no}[/green] {line_text}")
+                    # One print for the whole window: far cheaper per frame
+                    # than one per line.
+                    if rows:
+                        out.print("\n".join(rows))
+
+                    # Footer
+                    if index.complete and current_line >= index.known - 1:
+                        out.print("\n[bold yellow]End of file[/bold yellow]")
+
+                    out.print()
+                    print_nav_table([
+                        ("↑/↓ k/j", "Scroll line by line"),
+                        ("PgUp/PgDn u/d", "Jump a page"),
+                        ("g / G", "Go to beginning / end"),
+                        (":", "Go to a specific line number"),
+                        ("Space / h", "Highlight/unhighlight line"),
+                        ("/", "Search in file"),
+                        ("n / p", "Next / previous search result"),
+                        ("r / c", "Toggle regex / match case"),
+                        ("?", "Help"),
+                        ("q", "Quit"),
+                    ], out=out)
+
+                # While a search is still running, redraw a few times a
+                # second so its progress and result count stay current.
+                key = screen.key(timeout=0.25 if searching else None)
+                if not key:
+                    continue
+
+                if key == '\x1b[A' or key == 'k':  # Up arrow or k
+                    current_line = max(0, current_line - 1)
+                elif key == '\x1b[B' or key == 'j':  # Down arrow or j
+                    if index.ensure(current_line + 1):
+                        current_line += 1
+                elif key == '\x1b[5~' or key == 'u':  # Page Up or u
+                    current_line = max(0, current_line - lines_per_page)
+                elif key == '\x1b[6~' or key == 'd':  # Page Down or d
+                    index.ensure(current_line + lines_per_page)
+                    current_line = max(0, min(index.known - 1, current_line + lines_per_page))
+                elif key == ' ' or key == 'h':  # Space or h for highlight
+                    # Toggle highlight for current line
+                    if current_line in highlighted:
+                        highlighted.remove(current_line)
                     else:
-                        console.print("[red]No results found[/red]")
-                        input("Press Enter to continue...")
-            elif key == ':':  # Go to line
-                target = Prompt.ask("[yellow]Go to line number[/yellow]").strip()
-                if target.isdigit() and 1 <= int(target) <= len(lines):
-                    current_line = int(target) - 1
-                else:
-                    console.print(f"[red]Invalid line number! Choose 1-{len(lines)}[/red]")
-                    input("Press Enter to continue...")
-            elif key == '?':  # Help
-                show_reader_help()
-            elif key == 'q':  # Quit
-                break
-            elif key == 'n' and search_results:  # Next search result
-                search_index = (search_index + 1) % len(search_results)
-                current_line = search_results[search_index]
-            elif key == 'p' and search_results:  # Previous search result
-                search_index = (search_index - 1) % len(search_results)
-                current_line = search_results[search_index]
-            elif key == 'g':  # Go to beginning
-                current_line = 0
-            elif key == 'G':  # Go to end
-                current_line = len(lines) - 1
-                
+                        highlighted.add(current_line)
+                elif key == '/':  # Search
+                    search_term = screen.ask(f"Search{search_modes()}")
+                    if search_term:
+                        search = start_search(search_term)
+                        jump_from = current_line
+                elif key in ('r', 'c'):  # Toggle regex / match case
+                    if key == 'r':
+                        search_regex = not search_regex
+                    else:
+                        search_case = not search_case
+                    if search:
+                        # Same term, new options: search again from here.
+                        search = start_search(search.term)
+                        jump_from = current_line
+                    screen.notify(f"[cyan]Search mode: {search_modes().strip(' ()') or 'plain text'}[/cyan]")
+                elif key == ':':  # Go to line
+                    target = screen.ask("Go to line number")
+                    if target.isdigit() and int(target) >= 1 and index.ensure(int(target) - 1):
+                        current_line = int(target) - 1
+                    else:
+                        screen.notify(f"[red]Invalid line number! Choose 1-{index.count()}[/red]")
+                elif key == '?':  # Help
+                    with screen.suspended():
+                        show_reader_help()
+                elif key == 'q':  # Quit
+                    break
+                elif key in ('n', 'p') and search:  # Next / previous search result
+                    if key == 'n':
+                        hit = search.next_after(current_line)
+                        wrapped = search.first
+                    else:
+                        hit = search.previous_before(current_line)
+                        wrapped = search.last
+                    if hit is None and search.done:
+                        hit = wrapped()
+                    if hit is not None:
+                        index.ensure(hit)
+                        current_line = hit
+                    elif not search.done:
+                        screen.notify("[yellow]No more matches yet - still searching[/yellow]")
+                elif key == 'g':  # Go to beginning
+                    current_line = 0
+                elif key == 'G':  # Go to end
+                    current_line = max(0, index.count() - 1)
+
     except Exception as e:
         handle_error(e)
+    finally:
+        index.close()
 
 def show_reader_help():
     """Show help for the interactive reader"""
@@ -328,8 +328,10 @@ def show_reader_help():
         ("g / G", "Go to beginning / end"),
         (":", "Go to a specific line number"),
         ("Space / h", "Highlight/unhighlight current line"),
-        ("/", "Search for text in file"),
+        ("/", "Search for text in file (runs in the background)"),
         ("n / p", "Next / previous search result"),
+        ("r", "Toggle regex search (Python syntax)"),
+        ("c", "Toggle case-sensitive search"),
         ("?", "Show this help"),
         ("q", "Quit reader"),
     ])
@@ -376,7 +378,8 @@ def edit_file_with_reason(user_folder, subject, filename):
         with open(log_path, "a", encoding="utf-8") as f:
             f.write(f"[{datetime.now()}] Edited {filename} - Reason: {reason}\n")
             f.write(f"Backup saved as: {os.path.basename(backup_path)}\n\n")
-        
+        autosync.notify()
+
         console.print(f"[green]✅ File edited successfully![/green]")
         console.print(f"[dim]Backup saved as: {os.path.basename(backup_path)}[/dim]")
         
@@ -448,25 +451,28 @@ def view_archive_info(path, filename, ext):
         input("Press Enter to continue...")
 
 def validate_word_document(path):
-    """Validate if a Word document can be read"""
+    """Validate if a Word document can be read. The last item is the
+    extracted (paragraphs, tables) - None if invalid - so the viewer can
+    reuse it instead of reading the document a second time."""
     try:
-        # Try to open the document
-        doc = docx.Document(path)
+        # Try to read the document
+        document = docx_text.read_document(path)
+        paragraphs, tables = document
         
         # Check if document has any content
-        has_text = any(para.text.strip() for para in doc.paragraphs)
-        has_tables = len(doc.tables) > 0
+        has_text = bool(paragraphs)
+        has_tables = len(tables) > 0
         
-        return True, "Valid document", has_text, has_tables
+        return True, "Valid document", has_text, has_tables, document
         
     except Exception as e:
         error_msg = str(e)
         if "Package not found" in error_msg:
-            return False, "Document structure corrupted or encrypted", False, False
+            return False, "Document structure corrupted or encrypted", False, False, None
         elif "lxml" in error_msg.lower():
-            return False, "Missing lxml dependency", False, False
+            return False, "Missing lxml dependency", False, False, None
         else:
-            return False, f"Document error: {error_msg}", False, False
+            return False, f"Document error: {error_msg}", False, False, None
 
 def interactive_pdf_viewer(path, filename, start_page=0):
     """Interactive PDF viewer with navigation and search"""
@@ -480,125 +486,129 @@ def interactive_pdf_viewer(path, filename, start_page=0):
                 input("Press Enter to continue...")
                 return
 
-            current_page = max(0, min(start_page, total_pages - 1))
-            search_term = ""
-            search_results = []
-            search_index = 0
-            
-            while True:
-                clear_screen()
-                console.print(Panel(f"[bold cyan]📄 Interactive PDF Viewer[/bold cyan]", expand=False))
-                console.print(f"[yellow]File:[/yellow] {filename}")
-                console.print(f"[yellow]Page:[/yellow] {current_page + 1} of {total_pages}")
-                
-                if search_term:
-                    console.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results)")
-                
-                console.print()
-                
-                # Display current page
-                try:
-                    page = reader.pages[current_page]
-                    text = page.extract_text()
-                    
-                    if text.strip():
-                        # Highlight search results if searching
-                        if search_term and search_results:
-                            lines = text.split('\n')
-                            for i, line in enumerate(lines):
-                                if search_term.lower() in line.lower():
-                                    # Highlight the line
-                                    highlighted = line.replace(
-                                        search_term, f"[bold red]{search_term}[/bold red]"
-                                    )
-                                    lines[i] = highlighted
-                            text = '\n'.join(lines)
-                        
-                        # Display text with pagination
-                        lines = text.split('\n')
-                        start_line = 0
-                        lines_per_page = 20
-                        
-                        while start_line < len(lines):
-                            console.print(f"[bold]Page {current_page + 1} (lines {start_line + 1}-{min(start_line + lines_per_page, len(lines))}):[/bold]")
-                            console.print()
-                            
-                            for i in range(start_line, min(start_line + lines_per_page, len(lines))):
-                                console.print(lines[i])
-                            
-                            if start_line + lines_per_page < len(lines):
-                                console.print()
-                                console.print("[dim]Press Enter for more lines, 'q' to quit, or use navigation keys[/dim]")
-                                key = get_key()
-                                if key == 'q':
-                                    return
-                                elif key == '\r':  # Enter
-                                    start_line += lines_per_page
-                                    continue
-                                else:
-                                    break
+            # Extracted page text is cached, the neighbouring pages are
+            # extracted in the background while this one is read, and the
+            # rest of the document is indexed for `/` behind that.
+            with PageTextCache(reader) as pages, ViewerScreen() as screen:
+                current_page = max(0, min(start_page, total_pages - 1))
+                start_line = 0  # first shown line of a page longer than the screen
+                lines_per_page = 20
+                more_lines = False
+                search_term = ""
+                search_results = []
+                indexed = total_pages
+
+                while True:
+                    with screen.frame() as out:
+                        out.print(Panel(f"[bold cyan]📄 Interactive PDF Viewer[/bold cyan]", expand=False))
+                        out.print(f"[yellow]File:[/yellow] {filename}")
+                        out.print(f"[yellow]Page:[/yellow] {current_page + 1} of {total_pages}")
+
+                        if search_term:
+                            # Re-run against the pages indexed since, so matches
+                            # further into the document stream in.
+                            if indexed < total_pages:
+                                search_results, indexed = pages.search(search_term)
+                            progress = "" if indexed == total_pages else f", indexed {indexed}/{total_pages} pages so far"
+                            out.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results{progress})")
+
+                        out.print()
+
+                        # Display current page
+                        more_lines = False
+                        try:
+                            text = pages.get(current_page)
+                            pages.prefetch(current_page)
+
+                            if text.strip():
+                                # Highlight search results if searching
+                                if search_term and search_results:
+                                    lines = text.split('\n')
+                                    for i, line in enumerate(lines):
+                                        if search_term.lower() in line.lower():
+                                            # Highlight the line
+                                            highlighted = line.replace(
+                                                search_term, f"[bold red]{search_term}[/bold red]"
+                                            )
+                                            lines[i] = highlighted
+                                    text = '\n'.join(lines)
+
+                                # Display text with pagination
+                                lines = text.split('\n')
+                                start_line = min(start_line, max(0, len(lines) - 1))
+                                end_line = min(start_line + lines_per_page, len(lines))
+                                out.print(f"[bold]Page {current_page + 1} (lines {start_line + 1}-{end_line}):[/bold]")
+                                out.print()
+                                out.print("\n".join(lines[start_line:end_line]))
+
+                                more_lines = end_line < len(lines)
+                                if more_lines:
+                                    out.print()
+                                    out.print("[dim]Press Enter for more lines of this page[/dim]")
                             else:
-                                break
-                    else:
-                        console.print("[yellow]No text content found on this page[/yellow]")
-                        console.print("[dim]This page might contain only images or be blank[/dim]")
-                
-                except Exception as e:
-                    console.print(f"[red]Error reading page: {e}[/red]")
-                
-                console.print()
-                print_nav_table([
-                    ("←/→ h/l", "Previous / next page"),
-                    ("Home/End g/G", "First / last page"),
-                    (":", "Go to a specific page number"),
-                    ("/", "Search in document"),
-                    ("n / p", "Next / previous search result"),
-                    ("q", "Quit"),
-                ])
-
-                key = get_key()
-
-                if key == 'q':
-                    break
-                elif key == '\x1b[D' or key == 'h':  # Left arrow or h
-                    current_page = max(0, current_page - 1)
-                elif key == '\x1b[C' or key == 'l':  # Right arrow or l
-                    current_page = min(total_pages - 1, current_page + 1)
-                elif key == '\x1b[H' or key == 'g':  # Home or g
-                    current_page = 0
-                elif key == '\x1b[F' or key == 'G':  # End or G
-                    current_page = total_pages - 1
-                elif key == ':':
-                    target = Prompt.ask("[yellow]Go to page number[/yellow]").strip()
-                    if target.isdigit() and 1 <= int(target) <= total_pages:
-                        current_page = int(target) - 1
-                    else:
-                        console.print(f"[red]Invalid page number! Choose 1-{total_pages}[/red]")
-                        input("Press Enter to continue...")
-                elif key == '/':
-                    search_term = Prompt.ask("[yellow]Enter search term[/yellow]").strip()
-                    if search_term:
-                        search_results = []
-                        for i, page in enumerate(reader.pages):
-                            try:
-                                text = page.extract_text()
-                                if search_term.lower() in text.lower():
-                                    search_results.append(i)
-                            except:
-                                pass
-                        search_index = 0
-                        if search_results:
-                            current_page = search_results[0]
+                                out.print("[yellow]No text content found on this page[/yellow]")
+                                out.print("[dim]This page might contain only images or be blank[/dim]")
+
+                        except Exception as e:
+                            out.print(f"[red]Error reading page: {e}[/red]")
+
+                        out.print()
+                        print_nav_table([
+                            ("←/→ h/l", "Previous / next page"),
+                            ("Enter", "More lines of a long page"),
+                            ("Home/End g/G", "First / last page"),
+                            (":", "Go to a specific page number"),
+                            ("/", "Search in document"),
+                            ("n / p", "Next / previous search result"),
+                            ("q", "Quit"),
+                        ], out=out)
+
+                    # While the search index is still filling in, redraw every
+                    # half second so the result count keeps up.
+                    key = screen.key(timeout=0.5 if search_term and indexed < total_pages else None)
+                    page_before = current_page
+
+                    if key == 'q':
+                        break
+                    elif key == '\r':  # Enter
+                        start_line = start_line + lines_per_page if more_lines else 0
+                    elif key == '\x1b[D' or key == 'h':  # Left arrow or h
+                        current_page = max(0, current_page - 1)
+                    elif key == '\x1b[C' or key == 'l':  # Right arrow or l
+                        current_page = min(total_pages - 1, current_page + 1)
+                    elif key == '\x1b[H' or key == 'g':  # Home or g
+                        current_page = 0
+                    elif key == '\x1b[F' or key == 'G':  # End or G
+                        current_page = total_pages - 1
+                    elif key == ':':
+                        target = screen.ask("Go to page number")
+                        if target.isdigit() and 1 <= int(target) <= total_pages:
+                            current_page = int(target) - 1
                         else:
-                            console.print(f"[yellow]No results found for '{search_term}'[/yellow]")
-                            input("Press Enter to continue...")
-                elif key == 'n' and search_results:
-                    search_index = (search_index + 1) % len(search_results)
-                    current_page = search_results[search_index]
-                elif key == 'p' and search_results:
-                    search_index = (search_index - 1) % len(search_results)
-                    current_page = search_results[search_index]
-    
+                            screen.notify(f"[red]Invalid page number! Choose 1-{total_pages}[/red]")
+                    elif key == '/':
+                        search_term = screen.ask("Enter search term")
+                        if search_term:
+                            search_results, indexed = pages.search(search_term)
+                            if search_results:
+                                current_page = search_results[0]
+                            elif indexed < total_pages:
+                                screen.notify(
+                                    f"[yellow]No results in the first {indexed}/{total_pages} pages yet - "
+                                    "still indexing, matches will appear as it goes (n to jump)[/yellow]"
+                                )
+                            else:
+                                screen.notify(f"[yellow]No results found for '{search_term}'[/yellow]")
+                    # n/p move relative to the current page rather than a
+                    # fixed position, since the result list keeps growing.
+                    elif key == 'n' and search_results:
+                        current_page = next((p for p in search_results if p > current_page), search_results[0])
+                    elif key == 'p' and search_results:
+                        current_page = next((p for p in reversed(search_results) if p < current_page), search_results[-1])
+
+                    if current_page != page_before:
+                        start_line = 0
+
     except Exception as e:
         console.print(f"[red]Error reading PDF: {e}[/red]")
         console.print()
@@ -610,12 +620,14 @@ def interactive_pdf_viewer(path, filename, start_page=0):
         console.print("[cyan]Try updating PyPDF2: pip install --upgrade PyPDF2[/cyan]")
         input("Press Enter to continue...")
 
-def interactive_docx_viewer(path, filename, start_para=0):
-    """Interactive DOCX viewer with navigation and search"""
+def interactive_docx_viewer(path, filename, start_para=0, document=None):
+    """Interactive DOCX viewer with navigation and search. `document` is
+    (paragraphs, tables) as already extracted by validate_word_document();
+    the file is only read here when it isn't given."""
     try:
-        doc = docx.Document(path)
-        paragraphs = [para for para in doc.paragraphs if para.text.strip()]
-        tables = doc.tables
+        # Paragraph texts and table rows, streamed out of the XML without
+        # python-docx's object model (see docx_text.py).
+        paragraphs, tables = document if document is not None else docx_text.read_document(path)
 
         if not paragraphs and not tables:
             console.print("[yellow]Document appears to be empty[/yellow]")
@@ -629,147 +641,145 @@ def interactive_docx_viewer(path, filename, start_para=0):
         search_results = []
         search_index = 0
         
-        while True:
-            clear_screen()
-            console.print(Panel(f"[bold cyan]📝 Interactive DOCX Viewer[/bold cyan]", expand=False))
-            console.print(f"[yellow]File:[/yellow] {filename}")
+        with ViewerScreen() as screen:
+            while True:
+                with screen.frame() as out:
+                    out.print(Panel(f"[bold cyan]📝 Interactive DOCX Viewer[/bold cyan]", expand=False))
+                    out.print(f"[yellow]File:[/yellow] {filename}")
             
-            if view_mode == "paragraphs":
-                console.print(f"[yellow]Paragraph:[/yellow] {current_para + 1} of {len(paragraphs)}")
-            else:
-                console.print(f"[yellow]Table:[/yellow] {current_table + 1} of {len(tables)}")
+                    if view_mode == "paragraphs":
+                        out.print(f"[yellow]Paragraph:[/yellow] {current_para + 1} of {len(paragraphs)}")
+                    else:
+                        out.print(f"[yellow]Table:[/yellow] {current_table + 1} of {len(tables)}")
             
-            if search_term:
-                console.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results)")
+                    if search_term:
+                        out.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results)")
             
-            console.print()
+                    out.print()
             
-            # Display current content
-            if view_mode == "paragraphs" and paragraphs:
-                para = paragraphs[current_para]
-                text = para.text
+                    # Display current content
+                    if view_mode == "paragraphs" and paragraphs:
+                        text = paragraphs[current_para]
                 
-                # Highlight search results
-                if search_term and search_term.lower() in text.lower():
-                    text = text.replace(
-                        search_term, f"[bold red]{search_term}[/bold red]"
-                    )
+                        # Highlight search results
+                        if search_term and search_term.lower() in text.lower():
+                            text = text.replace(
+                                search_term, f"[bold red]{search_term}[/bold red]"
+                            )
                 
-                console.print(f"[bold]Paragraph {current_para + 1}:[/bold]")
-                console.print(text)
+                        out.print(f"[bold]Paragraph {current_para + 1}:[/bold]")
+                        out.print(text)
                 
-            elif view_mode == "tables" and tables:
-                table = tables[current_table]
-                console.print(f"[bold]Table {current_table + 1}:[/bold]")
-                console.print()
+                    elif view_mode == "tables" and tables:
+                        table = tables[current_table]
+                        out.print(f"[bold]Table {current_table + 1}:[/bold]")
+                        out.print()
                 
-                # Display table in a simple format
-                for i, row in enumerate(table.rows):
-                    row_text = []
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()[:20]  # Limit cell width
-                        if len(cell.text.strip()) > 20:
-                            cell_text += "..."
-                        row_text.append(cell_text)
-                    console.print(f"Row {i+1}: {' | '.join(row_text)}")
+                        # Display table in a simple format
+                        for i, row in enumerate(table):
+                            row_text = []
+                            for cell in row:
+                                cell_text = cell.strip()[:20]  # Limit cell width
+                                if len(cell.strip()) > 20:
+                                    cell_text += "..."
+                                row_text.append(cell_text)
+                            out.print(f"Row {i+1}: {' | '.join(row_text)}")
             
-            console.print()
-            print_nav_table([
-                ("←/→ h/l", "Previous / next paragraph/table"),
-                ("t", "Toggle paragraphs / tables"),
-                ("Home/End g/G", "First / last"),
-                (":", "Go to a specific paragraph/table number"),
-                ("/", "Search in document"),
-                ("n / p", "Next / previous search result"),
-                ("q", "Quit"),
-            ])
-
-            key = get_key()
-
-            if key == 'q':
-                break
-            elif key == '\x1b[D' or key == 'h':  # Left arrow or h
-                if view_mode == "paragraphs":
-                    current_para = max(0, current_para - 1)
-                else:
-                    current_table = max(0, current_table - 1)
-            elif key == '\x1b[C' or key == 'l':  # Right arrow or l
-                if view_mode == "paragraphs":
-                    current_para = min(len(paragraphs) - 1, current_para + 1)
-                else:
-                    current_table = min(len(tables) - 1, current_table + 1)
-            elif key == '\x1b[H' or key == 'g':  # Home or g
-                if view_mode == "paragraphs":
-                    current_para = 0
-                else:
-                    current_table = 0
-            elif key == '\x1b[F' or key == 'G':  # End or G
-                if view_mode == "paragraphs":
-                    current_para = len(paragraphs) - 1
-                else:
-                    current_table = len(tables) - 1
-            elif key == ':':
-                count = len(paragraphs) if view_mode == "paragraphs" else len(tables)
-                label = "paragraph" if view_mode == "paragraphs" else "table"
-                target = Prompt.ask(f"[yellow]Go to {label} number[/yellow]").strip()
-                if target.isdigit() and 1 <= int(target) <= count:
+                    out.print()
+                    print_nav_table([
+                        ("←/→ h/l", "Previous / next paragraph/table"),
+                        ("t", "Toggle paragraphs / tables"),
+                        ("Home/End g/G", "First / last"),
+                        (":", "Go to a specific paragraph/table number"),
+                        ("/", "Search in document"),
+                        ("n / p", "Next / previous search result"),
+                        ("q", "Quit"),
+                    ], out=out)
+
+                key = screen.key()
+
+                if key == 'q':
+                    break
+                elif key == '\x1b[D' or key == 'h':  # Left arrow or h
                     if view_mode == "paragraphs":
-                        current_para = int(target) - 1
+                        current_para = max(0, current_para - 1)
                     else:
-                        current_table = int(target) - 1
-                else:
-                    console.print(f"[red]Invalid {label} number! Choose 1-{count}[/red]")
-                    input("Press Enter to continue...")
-            elif key == 't':
-                view_mode = "tables" if view_mode == "paragraphs" else "paragraphs"
-                if view_mode == "paragraphs":
-                    current_para = 0
-                else:
-                    current_table = 0
-            elif key == '/':
-                search_term = Prompt.ask("[yellow]Enter search term[/yellow]").strip()
-                if search_term:
-                    search_results = []
-                    for i, para in enumerate(paragraphs):
-                        if search_term.lower() in para.text.lower():
-                            search_results.append(("paragraph", i))
-                    for i, table in enumerate(tables):
-                        for row in table.rows:
-                            for cell in row.cells:
-                                if search_term.lower() in cell.text.lower():
-                                    search_results.append(("table", i))
-                                    break
+                        current_table = max(0, current_table - 1)
+                elif key == '\x1b[C' or key == 'l':  # Right arrow or l
+                    if view_mode == "paragraphs":
+                        current_para = min(len(paragraphs) - 1, current_para + 1)
+                    else:
+                        current_table = min(len(tables) - 1, current_table + 1)
+                elif key == '\x1b[H' or key == 'g':  # Home or g
+                    if view_mode == "paragraphs":
+                        current_para = 0
+                    else:
+                        current_table = 0
+                elif key == '\x1b[F' or key == 'G':  # End or G
+                    if view_mode == "paragraphs":
+                        current_para = len(paragraphs) - 1
+                    else:
+                        current_table = len(tables) - 1
+                elif key == ':':
+                    count = len(paragraphs) if view_mode == "paragraphs" else len(tables)
+                    label = "paragraph" if view_mode == "paragraphs" else "table"
+                    target = screen.ask(f"Go to {label} number")
+                    if target.isdigit() and 1 <= int(target) <= count:
+                        if view_mode == "paragraphs":
+                            current_para = int(target) - 1
+                        else:
+                            current_table = int(target) - 1
+                    else:
+                        screen.notify(f"[red]Invalid {label} number! Choose 1-{count}[/red]")
+                elif key == 't':
+                    view_mode = "tables" if view_mode == "paragraphs" else "paragraphs"
+                    if view_mode == "paragraphs":
+                        current_para = 0
+                    else:
+                        current_table = 0
+                elif key == '/':
+                    search_term = screen.ask("Enter search term")
+                    if search_term:
+                        search_results = []
+                        for i, para in enumerate(paragraphs):
+                            if search_term.lower() in para.lower():
+                                search_results.append(("paragraph", i))
+                        for i, table in enumerate(tables):
+                            for row in table:
+                                for cell in row:
+                                    if search_term.lower() in cell.lower():
+                                        search_results.append(("table", i))
+                                        break
                     
-                    search_index = 0
-                    if search_results:
-                        result_type, result_index = search_results[0]
-                        if result_type == "paragraph":
-                            view_mode = "paragraphs"
-                            current_para = result_index
+                        search_index = 0
+                        if search_results:
+                            result_type, result_index = search_results[0]
+                            if result_type == "paragraph":
+                                view_mode = "paragraphs"
+                                current_para = result_index
+                            else:
+                                view_mode = "tables"
+                                current_table = result_index
                         else:
-                            view_mode = "tables"
-                            current_table = result_index
+                            screen.notify(f"[yellow]No results found for '{search_term}'[/yellow]")
+                elif key == 'n' and search_results:
+                    search_index = (search_index + 1) % len(search_results)
+                    result_type, result_index = search_results[search_index]
+                    if result_type == "paragraph":
+                        view_mode = "paragraphs"
+                        current_para = result_index
                     else:
-                        console.print(f"[yellow]No results found for '{search_term}'[/yellow]")
-                        input("Press Enter to continue...")
-            elif key == 'n' and search_results:
-                search_index = (search_index + 1) % len(search_results)
-                result_type, result_index = search_results[search_index]
-                if result_type == "paragraph":
-                    view_mode = "paragraphs"
-                    current_para = result_index
-                else:
-                    view_mode = "tables"
-                    current_table = result_index
-            elif key == 'p' and search_results:
-                search_index = (search_index - 1) % len(search_results)
-                result_type, result_index = search_results[search_index]
-                if result_type == "paragraph":
-                    view_mode = "paragraphs"
-                    current_para = result_index
-                else:
-                    view_mode = "tables"
-                    current_table = result_index
+                        view_mode = "tables"
+                        current_table = result_index
+                elif key == 'p' and search_results:
+                    search_index = (search_index - 1) % len(search_results)
+                    result_type, result_index = search_results[search_index]
+                    if result_type == "paragraph":
+                        view_mode = "paragraphs"
+                        current_para = result_index
+                    else:
+                        view_mode = "tables"
+                        current_table = result_index
     
     except Exception as e:
         console.print(f"[red]Error reading DOCX: {e}[/red]")
@@ -789,105 +799,133 @@ def interactive_csv_viewer(path, filename, start_row=0):
         input("Press Enter to continue...")
         return
 
+    view = None  # a sorted/filtered csv_ops.RowOrder, or None for file order
     try:
-        with open(path, "r", newline="", encoding="utf-8", errors="ignore") as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-
-            if not rows:
-                console.print("[yellow]CSV file is empty[/yellow]")
-                input("Press Enter to continue...")
-                return
+        # Only record offsets are kept in memory (and cached per file
+        # version); each page is parsed straight from disk - see csv_index.py.
+        if os.path.getsize(path) > 4 * 1024 * 1024:
+            index = with_spinner(console, f"📇 Indexing {filename}...", CsvIndex, path)
+        else:
+            index = CsvIndex(path)
+        if not index.records:
+            console.print("[yellow]CSV file is empty[/yellow]")
+            input("Press Enter to continue...")
+            return
 
-            header = rows[0]
-            data_rows = rows[1:] if len(rows) > 1 else []
+        header = index.read(0, 1)[0]
+        total_rows = index.records - 1
 
-            rows_per_page = 10
-            current_row = 0
-            if data_rows and start_row:
-                current_row = (max(0, min(start_row - 1, len(data_rows) - 1)) // rows_per_page) * rows_per_page
-            search_term = ""
-            search_results = []
-            search_index = 0
+        rows_per_page = 10
+        current_row = 0
+        if total_rows and start_row:
+            current_row = (max(0, min(start_row - 1, total_rows - 1)) // rows_per_page) * rows_per_page
+        search_term = ""
+        search_results = []
+        search_index = 0
 
+        with ViewerScreen() as screen:
             while True:
-                clear_screen()
-                console.print(Panel(f"[bold cyan]📊 Interactive CSV Viewer[/bold cyan]", expand=False))
-                console.print(f"[yellow]File:[/yellow] {filename}")
-                console.print(f"[yellow]Total data rows:[/yellow] {len(data_rows)} (+1 header row)")
-                if data_rows:
-                    console.print(f"[yellow]Showing rows:[/yellow] {current_row + 1}-{min(current_row + rows_per_page, len(data_rows))}")
-
-                if search_term:
-                    console.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results)")
-
-                console.print()
-
-                table = Table(show_header=True, header_style="bold magenta")
-                table.add_column("Row", justify="right", width=6)
-                for col_idx, col_name in enumerate(header):
-                    table.add_column(col_name or f"Column {col_idx + 1}", overflow="fold")
-
-                for i in range(current_row, min(current_row + rows_per_page, len(data_rows))):
-                    row = data_rows[i]
-                    is_hit = bool(search_term) and any(search_term.lower() in str(c).lower() for c in row)
-                    row_label = f"[bold red]{i + 1}[/bold red]" if is_hit else str(i + 1)
+                shown_rows = view.count if view else total_rows
+                with screen.frame() as out:
+                    out.print(Panel(f"[bold cyan]📊 Interactive CSV Viewer[/bold cyan]", expand=False))
+                    out.print(f"[yellow]File:[/yellow] {filename}")
+                    out.print(f"[yellow]Total data rows:[/yellow] {total_rows} (+1 header row)")
+                    if view:
+                        out.print(f"[yellow]View:[/yellow] {view.description} - {view.count} row(s) [dim](:reset for all rows)[/dim]")
+                    if shown_rows:
+                        out.print(f"[yellow]Showing rows:[/yellow] {current_row + 1}-{min(current_row + rows_per_page, shown_rows)}")
 
-                    cells = []
-                    for col_idx in range(len(header)):
-                        cell = row[col_idx] if col_idx < len(row) else ""
-                        cell_text = str(cell)
-                        if search_term and search_term.lower() in cell_text.lower():
-                            cell_text = cell_text.replace(search_term, f"[bold red]{search_term}[/bold red]")
-                        cells.append(cell_text)
-                    table.add_row(row_label, *cells)
+                    if search_term:
+                        out.print(f"[yellow]Search:[/yellow] '{search_term}' ({len(search_results)} results)")
 
-                console.print(table)
+                    out.print()
 
-                console.print()
-                print_nav_table([
-                    ("↑/↓ k/j", "Previous / next page"),
-                    ("Home/End g/G", "First / last page"),
-                    (":", "Go to a specific row number"),
-                    ("/", "Search in CSV"),
-                    ("n / p", "Next / previous search result"),
-                    ("q", "Quit"),
-                ])
+                    table = Table(show_header=True, header_style="bold magenta")
+                    table.add_column("Row", justify="right", width=6)
+                    for col_idx, col_name in enumerate(header):
+                        table.add_column(col_name or f"Column {col_idx + 1}", overflow="fold")
 
-                key = get_key()
+                    if view:
+                        page = [(record, index.read(record, 1)[0]) for record in view.slice(current_row, rows_per_page)]
+                    else:
+                        page = list(enumerate(index.read(current_row + 1, rows_per_page), current_row + 1))
+
+                    # Rows are always labelled with their row number in the file.
+                    for record, row in page:
+                        is_hit = bool(search_term) and any(search_term.lower() in str(c).lower() for c in row)
+                        row_label = f"[bold red]{record}[/bold red]" if is_hit else str(record)
+
+                        cells = []
+                        for col_idx in range(len(header)):
+                            cell = row[col_idx] if col_idx < len(row) else ""
+                            cell_text = str(cell)
+                            if search_term and search_term.lower() in cell_text.lower():
+                                cell_text = cell_text.replace(search_term, f"[bold red]{search_term}[/bold red]")
+                            cells.append(cell_text)
+                        table.add_row(row_label, *cells)
+
+                    out.print(table)
+
+                    out.print()
+                    print_nav_table([
+                        ("↑/↓ k/j", "Previous / next page"),
+                        ("Home/End g/G", "First / last page"),
+                        (":", "Go to a row number, or a command:"),
+                        ("", "sort <col> \\[desc] · filter <col> <op> <value> · group <col> · reset"),
+                        ("/", "Search in CSV"),
+                        ("n / p", "Next / previous search result"),
+                        ("s", "Column statistics"),
+                        ("q", "Quit"),
+                    ], out=out)
+
+                key = screen.key()
 
                 if key == 'q':
                     break
+                elif key == 's':
+                    with screen.suspended():
+                        summary = with_spinner(console, f"📈 Summarizing {filename}...", csv_stats.summarize, index)
+                        show_csv_stats(filename, summary)
                 elif key == '\x1b[A' or key == 'k':  # Up arrow or k
                     current_row = max(0, current_row - rows_per_page)
                 elif key == '\x1b[B' or key == 'j':  # Down arrow or j
-                    current_row = min(max(0, len(data_rows) - rows_per_page), current_row + rows_per_page)
+                    current_row = min(max(0, shown_rows - rows_per_page), current_row + rows_per_page)
                 elif key == '\x1b[H' or key == 'g':  # Home or g
                     current_row = 0
                 elif key == '\x1b[F' or key == 'G':  # End or G
-                    current_row = max(0, len(data_rows) - rows_per_page)
+                    current_row = max(0, shown_rows - rows_per_page)
                 elif key == ':':
-                    target = Prompt.ask("[yellow]Go to row number[/yellow]").strip()
-                    if target.isdigit() and 1 <= int(target) <= len(data_rows):
+                    target = screen.ask("Go to row number (or sort/filter/group/reset)")
+                    if target.isdigit() and 1 <= int(target) <= shown_rows:
                         current_row = ((int(target) - 1) // rows_per_page) * rows_per_page
+                    elif target and not target.isdigit():
+                        with screen.suspended():
+                            new_view = csv_view_command(index, header, target)
+                        if new_view is not None:
+                            if view:
+                                view.close()
+                            view = new_view or None  # False: back to file order
+                            current_row = 0
+                            search_term, search_results = "", []
                     else:
-                        console.print(f"[red]Invalid row number! Choose 1-{len(data_rows)}[/red]")
-                        input("Press Enter to continue...")
+                        screen.notify(f"[red]Invalid row number! Choose 1-{shown_rows}[/red]")
                 elif key == '/':
-                    search_term = Prompt.ask("[yellow]Enter search term[/yellow]").strip()
+                    search_term = screen.ask("Enter search term")
                     if search_term:
                         search_results = []
-                        for i, row in enumerate(data_rows):
-                            for cell in row:
-                                if search_term.lower() in str(cell).lower():
-                                    search_results.append(i)
-                                    break
+                        needle = search_term.lower()
+                        for number, row in index.iter_records(1):
+                            if any(needle in str(cell).lower() for cell in row):
+                                search_results.append(number - 1)
+                        if view:
+                            # Hits as positions within the sorted/filtered view.
+                            hits = {number + 1 for number in search_results}
+                            search_results = [position for position, record in enumerate(view) if record in hits]
                         search_index = 0
                         if search_results:
                             current_row = (search_results[0] // rows_per_page) * rows_per_page
                         else:
-                            console.print(f"[yellow]No results found for '{search_term}'[/yellow]")
-                            input("Press Enter to continue...")
+                            screen.notify(f"[yellow]No results found for '{search_term}'[/yellow]")
                 elif key == 'n' and search_results:
                     search_index = (search_index + 1) % len(search_results)
                     current_row = (search_results[search_index] // rows_per_page) * rows_per_page
@@ -898,6 +936,104 @@ def interactive_csv_viewer(path, filename, start_row=0):
     except Exception as e:
         console.print(f"[red]Error reading CSV: {e}[/red]")
         input("Press Enter to continue...")
+    finally:
+        if view:
+            view.close()
+
+def csv_view_command(index, header, command):
+    """Runs one CSV viewer command (see csv_ops.py). Returns a new RowOrder
+    for sort/filter, False for reset, or None when the view stays as is
+    (group, which just shows a summary, or an invalid command)."""
+    try:
+        parts = shlex.split(command)
+    except ValueError:
+        parts = command.split()
+    name, args = parts[0].lower(), parts[1:]
+
+    def column(token):
+        col = csv_ops.resolve_column(header, token)
+        if col is None:
+            console.print(f"[red]No column '{token}' - use a header name or a column number 1-{len(header)}[/red]")
+        return col
+
+    if name == "reset":
+        return False
+    if name == "sort" and args:
+        descending = args[-1].lower() in ("desc", "descending") and len(args) > 1
+        col = column(" ".join(args[:-1] if descending else args))
+        if col is not None:
+            return with_spinner(console, f"🔃 Sorting by {header[col]}...", csv_ops.sort_view, index, col, descending)
+    elif name == "filter" and len(args) >= 3 and args[-2] in csv_ops.FILTER_OPS:
+        col = column(" ".join(args[:-2]))
+        if col is not None:
+            return with_spinner(console, "🔎 Filtering...", csv_ops.filter_view, index, col, args[-2], args[-1])
+    elif name == "group" and args:
+        col = column(" ".join(args))
+        if col is not None:
+            result = with_spinner(console, f"🧮 Grouping by {header[col]}...", csv_ops.group_by, index, col)
+            show_csv_groups(result)
+            return None
+    else:
+        console.print(
+            "[red]Commands: sort <col> \\[desc] · filter <col> <op> <value> "
+            f"(op: {' '.join(csv_ops.FILTER_OPS)}) · group <col> · reset[/red]"
+        )
+    input("Press Enter to continue...")
+    return None
+
+def _stat(value):
+    if value is None:
+        return "[dim]-[/dim]"
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+def show_csv_stats(filename, summary):
+    clear_screen()
+    console.print(Panel(f"[bold cyan]📈 Column statistics - {filename}[/bold cyan]", expand=False))
+    console.print(f"[yellow]Data rows:[/yellow] {summary['rows']}")
+    console.print()
+    table = Table(show_header=True, header_style="bold magenta")
+    for name, justify in (("Column", "left"), ("Type", "left"), ("Nulls", "right"), ("Min", "right"),
+                          ("Max", "right"), ("Mean", "right"), ("Std dev", "right"),
+                          ("~Distinct", "right"), ("Most common", "left")):
+        table.add_column(name, justify=justify, overflow="fold")
+    for column in summary["columns"]:
+        # Space-saving counts can overestimate by `error`; only list values
+        # that certainly occur more than once.
+        common = [
+            f"{value} ×{count}" if not error else f"{value} ~{count}"
+            for value, count, error in column["top"]
+            if count - error > 1
+        ]
+        table.add_row(
+            column["name"], column["type"], str(column["nulls"]),
+            _stat(column["min"]), _stat(column["max"]), _stat(column["mean"]), _stat(column["stddev"]),
+            f"{column['distinct']:,}", ", ".join(common[:3]) or "[dim]all distinct-ish[/dim]",
+        )
+    console.print(table)
+    console.print("[dim]~Distinct and ~counts are estimates (HyperLogLog / space-saving sketches).[/dim]")
+    console.print()
+    input("Press Enter to continue...")
+
+def show_csv_groups(result, limit=30):
+    clear_screen()
+    console.print(Panel(f"[bold cyan]🧮 Grouped by {result['column']}[/bold cyan]", expand=False))
+    console.print(f"[yellow]Distinct values:[/yellow] {result['distinct']}")
+    console.print()
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column(result["column"] or "Value", overflow="fold")
+    table.add_column("Rows", justify="right")
+    for name in result["numeric_columns"]:
+        table.add_column(f"avg {name}", justify="right")
+    for value, count, means in result["groups"][:limit]:
+        averages = ["" if means[name] is None else f"{means[name]:.4g}" for name in result["numeric_columns"]]
+        table.add_row(value or "[dim](empty)[/dim]", str(count), *averages)
+    console.print(table)
+    if result["distinct"] > limit:
+        console.print(f"[dim]Showing the {limit} most common of {result['distinct']} values[/dim]")
+    console.print()
+    input("Press Enter to continue...")
 
 def view_file_rich(user_folder, subject, filename, editable=False, jump_to=None):
     """Main file viewer function - handles ALL file types in CLI.
@@ -939,22 +1075,20 @@ def view_file_rich(user_folder, subject, filename, editable=False, jump_to=None)
 
         # Word documents
         elif ext in ["doc", "docx"]:
-            if not docx:
-                console.print("[red]python-docx not installed - showing file info instead[/red]")
+            if not docx_text.etree:
+                console.print("[red]lxml not installed - showing file info instead[/red]")
                 file_size = os.path.getsize(path)
                 console.print(f"[cyan]Word document: {filename}[/cyan]")
                 console.print(f"[cyan]Size: {file_size:,} bytes[/cyan]")
                 console.print()
                 console.print("[yellow]To view Word document content:[/yellow]")
-                console.print("[cyan]pip install python-docx lxml[/cyan]")
-                console.print()
-                console.print("[dim]Note: lxml is required for python-docx to work properly[/dim]")
+                console.print("[cyan]pip install lxml[/cyan]")
                 input("\nPress Enter to continue...")
                 return
             
             # Validate document first
             console.print("[yellow]🔍 Validating document...[/yellow]")
-            is_valid, message, has_text, has_tables = validate_word_document(path)
+            is_valid, message, has_text, has_tables, document = validate_word_document(path)
             
             if not is_valid:
                 console.print(f"[red]❌ Document validation failed: {message}[/red]")
@@ -970,7 +1104,7 @@ def view_file_rich(user_folder, subject, filename, editable=False, jump_to=None)
                     console.print("• Document was created with a very old/new version of Word")
                 elif "lxml" in message.lower():
                     console.print("[yellow]🔍 Diagnosis: Missing XML processing library[/yellow]")
-                    console.print("• lxml is required for python-docx to work properly")
+                    console.print("• lxml is required to read the document XML")
                 else:
                     console.print("[yellow]🔍 Diagnosis: General document reading error[/yellow]")
                     console.print("This might be due to:")
@@ -1001,17 +1135,18 @@ def view_file_rich(user_folder, subject, filename, editable=False, jump_to=None)
             
             # Document is valid, use interactive viewer
             console.print(f"[green]✅ Document validated successfully[/green]")
-            console.print(f"[cyan]Document has {len(doc.paragraphs)} paragraphs[/cyan]")
+            paragraphs, tables = document
+            console.print(f"[cyan]Document has {len(paragraphs)} paragraphs[/cyan]")
             
             if has_tables:
-                console.print(f"[cyan]Document has {len(doc.tables)} tables[/cyan]")
+                console.print(f"[cyan]Document has {len(tables)} tables[/cyan]")
             
             console.print()
             console.print("[yellow]Opening interactive DOCX viewer...[/yellow]")
             input("Press Enter to continue...")
             
             # Use interactive DOCX viewer
-            interactive_docx_viewer(path, filename, start_para=(jump_to - 1) if jump_to else 0)
+            interactive_docx_viewer(path, filename, start_para=(jump_to - 1) if jump_to else 0, document=document)
 
         # CSV files
         elif ext == "csv":
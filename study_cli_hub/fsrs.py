@@ -0,0 +1,208 @@
+# fsrs.py - an FSRS scheduler (the FSRS-4.5 memory model) that a subject
+# can use instead of srs.py's simplified SM-2, plus the parameter fitting
+# behind /srs-optimize.
+#
+# FSRS models each card's memory as a stability S (days until recall
+# probability drops to 90%) and a difficulty D (1-10), updated from every
+# review, and schedules the next review for when recall is predicted to
+# fall to the desired retention. Its 17 weights can be fitted to a user's
+# own review history, so intervals follow how *you* actually forget rather
+# than a fixed multiplier - typically fewer reviews for the same retention.
+#
+# Scheduling is plain Python and replays a card's review history (kept in
+# its SRS record) with the subject's weights. Fitting is batched with numpy,
+# an optional dependency only /srs-optimize needs: every card's history is
+# laid out as an (N cards x L reviews) array and the loss is evaluated for
+# the current weights and all 17 finite-difference perturbations at once,
+# a (18 x N) array per review step - no per-card loop.
+import math
+from datetime import date, timedelta
+
+DECAY = -0.5
+FACTOR = 0.9 ** (1 / DECAY) - 1  # 19/81: recall is exactly 90% at t = S
+DEFAULT_DESIRED_RETENTION = 0.9
+MAX_INTERVAL = 36500
+
+DEFAULT_WEIGHTS = [
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+]
+# Bounds the fitted weights are kept within.
+LOWER_BOUNDS = [0.1, 0.1, 0.1, 0.1, 1.0, 0.1, 0.1, 0.0, 0.0, 0.1, 0.01, 0.5, 0.01, 0.01, 0.01, 0.0, 1.0]
+UPPER_BOUNDS = [100.0, 100.0, 100.0, 100.0, 10.0, 5.0, 5.0, 0.75, 4.5, 0.8, 3.5, 5.0, 0.25, 0.9, 4.0, 1.0, 6.0]
+
+MIN_REVIEWS_TO_FIT = 50  # repeat reviews (a card's first review predicts nothing)
+FIT_ITERATIONS = 250
+_LEARNING_RATE = 0.02
+_EPSILON = 1e-4
+
+
+def rating(quality):
+    """The app's 1-5 recall grade as an FSRS rating: 1 again, 2 hard,
+    3 good, 4 easy."""
+    return {1: 1, 2: 1, 3: 2, 4: 3, 5: 4}[quality]
+
+
+def retrievability(elapsed_days, stability):
+    return (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+
+def _initial_difficulty(w, g):
+    return w[4] - (g - 3) * w[5]
+
+
+def _next_difficulty(w, d, g):
+    d = d - w[6] * (g - 3)
+    d = w[7] * _initial_difficulty(w, 3) + (1 - w[7]) * d  # mean reversion
+    return min(10.0, max(1.0, d))
+
+
+def _next_stability(w, s, d, r, g):
+    if g == 1:
+        forgotten = w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * math.exp(w[14] * (1 - r))
+        return max(0.01, min(s, forgotten))
+    hard = w[15] if g == 2 else 1
+    easy = w[16] if g == 4 else 1
+    return s * (1 + math.exp(w[8]) * (11 - d) * s ** -w[9] * (math.exp(w[10] * (1 - r)) - 1) * hard * easy)
+
+
+def seed_from_sm2(interval, ease_factor, next_review_iso):
+    """[stability, difficulty, ISO date of the last review] for a card SM-2
+    scheduled before its review history was kept, so FSRS carries on from
+    what SM-2 had learned instead of treating a mature card as new. SM-2
+    brings a card back around when recall is still likely, so the interval
+    stands in for stability; ease 2.5 (the default) maps to a middling
+    difficulty, lower ease to harder."""
+    last = date.fromisoformat(next_review_iso) - timedelta(days=interval)
+    difficulty = min(10.0, max(1.0, 4 + (2.5 - ease_factor) * 5))
+    return [float(max(interval, 1)), round(difficulty, 4), last.isoformat()]
+
+
+def card_memory(history, weights=None, seed=None):
+    """(stability, difficulty) after replaying a card's history - a list of
+    [ISO date, 1-5 quality, ...] reviews, oldest first - starting from
+    `seed` (see seed_from_sm2) if given; reviews the seed already covers
+    are skipped."""
+    w = weights or DEFAULT_WEIGHTS
+    s = d = last = None
+    if seed:
+        s, d, last = seed[0], seed[1], date.fromisoformat(seed[2])
+    for day_iso, quality, *_ in history:
+        day = date.fromisoformat(day_iso)
+        if seed and day <= last:
+            continue
+        g = rating(quality)
+        if s is None:
+            s = w[g - 1]
+            d = min(10.0, max(1.0, _initial_difficulty(w, g)))
+        else:
+            r = retrievability(max(0, (day - last).days), s)
+            s = _next_stability(w, s, d, r, g)
+            d = _next_difficulty(w, d, g)
+        last = day
+    return s, d
+
+
+def next_interval(stability, desired_retention=DEFAULT_DESIRED_RETENTION):
+    """Days until recall is predicted to drop to `desired_retention`."""
+    days = stability / FACTOR * (desired_retention ** (1 / DECAY) - 1)
+    return min(MAX_INTERVAL, max(1, round(days)))
+
+
+# -- fitting ------------------------------------------------------------------
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "numpy is needed to fit FSRS parameters. Run: "
+            "pip install \"study-cli-hub[fsrs]\" (or: pip install numpy)"
+        ) from None
+    return numpy
+
+
+def reviews_to_fit(histories):
+    """How many repeat reviews the histories hold - what fit() learns from."""
+    return sum(max(0, len(history) - 1) for history in histories)
+
+
+def _arrays(np, histories):
+    """(grades, elapsed days) as (N, L) arrays, rows sorted longest history
+    first so the cards still active at review j are exactly rows [:n[j]]."""
+    histories = sorted((h for h in histories if len(h) >= 2), key=len, reverse=True)
+    length = len(histories[0])
+    grades = np.ones((len(histories), length), dtype=np.int64)
+    elapsed = np.zeros((len(histories), length))
+    for row, history in enumerate(histories):
+        days = [date.fromisoformat(review[0]).toordinal() for review in history]
+        grades[row, :len(history)] = [rating(review[1]) for review in history]
+        elapsed[row, 1:len(history)] = np.maximum(0, np.diff(days))
+    lengths = np.array([len(history) for history in histories])
+    active = (lengths[:, None] > np.arange(length)).sum(axis=0)
+    return grades, elapsed, active
+
+
+def _losses(np, W, grades, elapsed, active):
+    """Mean log loss of predicting each repeat review's recall, for every
+    weight vector (row) of W at once. Returns shape (K,)."""
+    def w(i):
+        return W[:, i:i + 1]  # (K, 1), broadcasts across cards
+
+    g0 = grades[:, 0]
+    S = W[:, g0 - 1]  # initial stability: weight 0-3 by first rating
+    D = np.clip(w(4) - (g0 - 3) * w(5), 1, 10)
+    total = np.zeros(W.shape[0])
+    for j in range(1, grades.shape[1]):
+        n = active[j]
+        g, t = grades[:n, j], elapsed[:n, j]
+        s, d = S[:, :n], D[:, :n]
+        r = np.clip((1 + FACTOR * t / s) ** DECAY, 1e-6, 1 - 1e-6)
+        recalled = g > 1
+        total -= np.where(recalled, np.log(r), np.log(1 - r)).sum(axis=1)
+
+        forgotten = w(11) * d ** -w(12) * ((s + 1) ** w(13) - 1) * np.exp(w(14) * (1 - r))
+        factor = np.where(g == 2, w(15), 1) * np.where(g == 4, w(16), 1)
+        success = s * (1 + np.exp(w(8)) * (11 - d) * s ** -w(9) * (np.exp(w(10) * (1 - r)) - 1) * factor)
+        S[:, :n] = np.maximum(0.01, np.where(recalled, success, np.minimum(s, forgotten)))
+        d = d - w(6) * (g - 3)
+        D[:, :n] = np.clip(w(7) * w(4) + (1 - w(7)) * d, 1, 10)  # w(4) = D0(good)
+    return total / active[1:].sum()
+
+
+def fit(histories, weights=None, iterations=FIT_ITERATIONS):
+    """Fits the 17 weights to the review histories by gradient descent
+    (Adam, finite-difference gradients) on the log loss of predicting
+    whether each repeat review was recalled. Returns (weights, loss with
+    the starting weights, loss with the fitted ones). Raises ValueError
+    with fewer than MIN_REVIEWS_TO_FIT repeat reviews, ImportError without
+    numpy."""
+    np = _numpy()
+    reviews = reviews_to_fit(histories)
+    if reviews < MIN_REVIEWS_TO_FIT:
+        raise ValueError(f"Only {reviews} repeat review(s) so far - at least {MIN_REVIEWS_TO_FIT} are needed to fit.")
+    data = _arrays(np, histories)
+
+    # Optimize in [0, 1]-scaled coordinates so every weight moves at a
+    # comparable rate whatever its range.
+    lower, upper = np.array(LOWER_BOUNDS), np.array(UPPER_BOUNDS)
+    span = upper - lower
+    u = np.clip((np.array(weights or DEFAULT_WEIGHTS) - lower) / span, 0, 1)
+    probes = np.vstack([np.zeros(len(u)), np.eye(len(u)) * _EPSILON])  # base + one nudge per weight
+    m, v = np.zeros(len(u)), np.zeros(len(u))
+    start_loss = best_loss = None
+    best = u
+    for step in range(1, iterations + 1):
+        losses = _losses(np, lower + (u + probes) * span, *data)
+        if start_loss is None:
+            start_loss = losses[0]
+        if best_loss is None or losses[0] < best_loss:
+            best_loss, best = losses[0], u.copy()
+        grad = (losses[1:] - losses[0]) / _EPSILON
+        m = 0.9 * m + 0.1 * grad
+        v = 0.999 * v + 0.001 * grad ** 2
+        u = np.clip(u - _LEARNING_RATE * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8), 0, 1 - _EPSILON)
+    final = _losses(np, (lower + u * span)[None, :], *data)[0]
+    if final < best_loss:
+        best_loss, best = final, u
+    return [round(float(x), 4) for x in lower + best * span], float(start_loss), float(best_loss)
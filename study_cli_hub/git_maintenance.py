@@ -0,0 +1,112 @@
+# git_maintenance.py - keeps this clone's commit-graph (with changed-path
+# Bloom filters) fresh, so the path-limited `git log -- subjects/<user>`
+# queries behind /stats, /leaderboard and the activity graph stay fast as the
+# shared history grows. Without Bloom filters git has to diff every commit's
+# tree against its parent to decide whether it touched the path; with them
+# it can skip almost every commit after a cheap bit test.
+#
+# Everything here is best-effort: a missing or stale commit-graph only makes
+# queries slower, never wrong, so failures are swallowed rather than shown.
+import os
+import subprocess
+
+# "background" (default) refreshes after a pull without delaying startup,
+# "foreground" waits for the write to finish, "off" never touches it.
+COMMIT_GRAPH_MODE_ENV = "STUDY_HUB_COMMIT_GRAPH"
+DEFAULT_COMMIT_GRAPH_MODE = "background"
+
+_GRAPH_SIGNATURE = b"CGPH"
+_BLOOM_CHUNK_IDS = (b"BIDX", b"BDAT")
+
+
+def commit_graph_mode():
+    mode = os.environ.get(COMMIT_GRAPH_MODE_ENV, DEFAULT_COMMIT_GRAPH_MODE).strip().lower()
+    return mode if mode in ("background", "foreground", "off") else DEFAULT_COMMIT_GRAPH_MODE
+
+
+def _objects_info_dir(cwd=None):
+    cwd = cwd or os.getcwd()
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-path", "objects/info"], capture_output=True, text=True, cwd=cwd
+    )
+    if result.returncode != 0:
+        return None
+    return os.path.join(cwd, result.stdout.strip())
+
+
+def _graph_files(info_dir):
+    """The single-file commit-graph, plus every layer of a split chain."""
+    files = []
+    single = os.path.join(info_dir, "commit-graph")
+    if os.path.isfile(single):
+        files.append(single)
+    chain_dir = os.path.join(info_dir, "commit-graphs")
+    try:
+        with open(os.path.join(chain_dir, "commit-graph-chain"), encoding="utf-8") as f:
+            files.extend(os.path.join(chain_dir, f"graph-{line.strip()}.graph") for line in f if line.strip())
+    except OSError:
+        pass
+    return files
+
+
+def _graph_has_bloom_filters(path):
+    """Reads just the header + chunk table of one commit-graph file (a few
+    dozen bytes) and checks for the changed-path Bloom filter chunks -
+    much cheaper than `git commit-graph verify`, which walks every commit."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(8)
+            if len(header) < 8 or header[:4] != _GRAPH_SIGNATURE:
+                return False
+            num_chunks = header[6]
+            table = f.read(12 * (num_chunks + 1))
+    except OSError:
+        return False
+    chunk_ids = {table[i:i + 4] for i in range(0, len(table) - 11, 12)}
+    return all(chunk in chunk_ids for chunk in _BLOOM_CHUNK_IDS)
+
+
+def commit_graph_status(cwd=None):
+    """{"present": bool, "bloom_filters": bool} for this clone. bloom_filters
+    is True only when every layer carries them - a layer written without
+    --changed-paths leaves its commits unfiltered."""
+    info_dir = _objects_info_dir(cwd)
+    files = _graph_files(info_dir) if info_dir else []
+    return {
+        "present": bool(files),
+        "bloom_filters": bool(files) and all(_graph_has_bloom_filters(p) for p in files),
+    }
+
+
+def _write_args():
+    # --split appends a small layer for just the newly pulled commits
+    # instead of rewriting the whole graph; git merges layers on its own
+    # once they pile up.
+    return ["git", "commit-graph", "write", "--reachable", "--changed-paths", "--split"]
+
+
+def write_commit_graph(cwd=None, background=False):
+    """Writes (or incrementally extends) the commit-graph with changed-path
+    Bloom filters. In the background, returns the Popen handle right away;
+    otherwise waits and returns True/False for success. Concurrent writers
+    are safe - git takes its own lock and the loser just fails."""
+    cwd = cwd or os.getcwd()
+    try:
+        if background:
+            return subprocess.Popen(
+                _write_args(), cwd=cwd,
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        result = subprocess.run(_write_args(), capture_output=True, text=True, cwd=cwd)
+        return result.returncode == 0
+    except (FileNotFoundError, OSError):
+        return None if background else False
+
+
+def refresh_after_pull(cwd=None):
+    """Called after every successful pull: folds the new commits into the
+    commit-graph according to STUDY_HUB_COMMIT_GRAPH."""
+    mode = commit_graph_mode()
+    if mode == "off":
+        return None
+    return write_commit_graph(cwd=cwd, background=(mode == "background"))
@@ -209,8 +209,11 @@ def whoami(console):
 
 
 def git_pull(cwd=None):
-    """Pull latest changes, using the stored GitHub token if available."""
-    return _run_authenticated(["git", "pull", "--rebase"], cwd)
+    """Pull latest changes, using the stored GitHub token if available.
+    Sync only commits the user's own folders, so anything else that's
+    modified is stashed around the rebase (--autostash) instead of making
+    git refuse to pull."""
+    return _run_authenticated(["git", "pull", "--rebase", "--autostash"], cwd)
 
 
 def git_push(cwd=None):
@@ -0,0 +1,218 @@
+# line_index.py - random access to the lines of an arbitrarily large text
+# file without reading it into memory. The file is memory-mapped and a
+# compact array('Q') of line-start offsets (8 bytes per line) is built
+# lazily, a chunk at a time, only as far as the reader has actually
+# scrolled - so opening a multi-hundred-MB log is instant, and only the
+# handful of lines on screen are ever decoded.
+#
+# Once a line is indexed, fetching it (jump-to-line, search hits, `G`) is a
+# constant-time slice of the mapping. Searches (LineSearch) scan the mapping
+# in a background thread and stream matching line numbers as they go.
+import mmap
+import operator
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, islice, repeat
+
+CHUNK_BYTES = 1 << 20
+# Smaller than CHUNK_BYTES: a regex scan of one chunk holds the GIL, and
+# the reader should stay responsive while a search runs.
+SEARCH_CHUNK_BYTES = 1 << 18
+
+
+class LineIndex:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files can't be mapped
+            self._data = b""
+        self.size = len(self._data)
+        self._starts = array("Q", [0])
+        self._scanned = 0  # every newline before this byte offset is indexed
+        self._search = None
+        self.complete = self.size == 0
+        if self.complete:
+            self._starts.pop()
+
+    def close(self):
+        if self._search:
+            self._search.cancel()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scan_chunk(self):
+        """Indexes the next CHUNK_BYTES of the file. split() + accumulate()
+        keep the per-line work in C, which matters at millions of lines."""
+        end = min(self.size, self._scanned + CHUNK_BYTES)
+        pieces = self._data[self._scanned:end].split(b"\n")
+        # Every piece but the last ended in a newline, so the next line
+        # starts len(piece) + 1 bytes later.
+        lengths = map(operator.add, map(len, pieces[:-1]), repeat(1))
+        # Seeded with the chunk's own offset, which is mid-line - skip it.
+        self._starts.extend(islice(accumulate(chain([self._scanned], lengths)), 1, None))
+        self._scanned = end
+        if end == self.size:
+            self.complete = True
+            if self._starts[-1] == self.size:  # trailing newline: no empty last line
+                self._starts.pop()
+
+    @property
+    def known(self):
+        """Lines indexed so far - the full count once `complete`."""
+        return len(self._starts)
+
+    def ensure(self, line_no):
+        """Indexes up to `line_no` (0-based) if needed. False past EOF."""
+        while line_no >= len(self._starts) and not self.complete:
+            self._scan_chunk()
+        return line_no < len(self._starts)
+
+    def count(self):
+        while not self.complete:
+            self._scan_chunk()
+        return len(self._starts)
+
+    def line(self, line_no):
+        start = self._starts[line_no]
+        end = self._starts[line_no + 1] if line_no + 1 < len(self._starts) else self._line_end(start)
+        return self._data[start:end].decode("utf-8", errors="ignore").rstrip()
+
+    def _line_end(self, start):
+        newline = self._data.find(b"\n", start)
+        return self.size if newline == -1 else newline
+
+    def line_at_offset(self, offset):
+        return bisect_right(self._starts, offset) - 1
+
+    def search(self, term, regex=False, case_sensitive=False):
+        """Starts a background LineSearch for `term` (a regular expression
+        when `regex`), cancelling any search already running on this index.
+        Raises re.error for an invalid pattern."""
+        if self._search:
+            self._search.cancel()
+        self._search = LineSearch(self, term, regex, case_sensitive)
+        return self._search
+
+
+class LineSearch:
+    """Scans the mapped file for lines matching a pattern in a worker
+    thread. Hits stream into a sorted array('Q') of line numbers as the
+    scan goes, so the reader can show and jump between the first matches
+    of a multi-GB file while the rest is still being searched.
+
+    The worker counts lines itself rather than using the LineIndex, whose
+    offsets the UI thread is still extending as you scroll."""
+
+    def __init__(self, index, term, regex=False, case_sensitive=False):
+        self.term = term
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        if regex:
+            flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+            self._pattern = re.compile(term, flags)
+            self._needle = None
+        else:
+            # Plain text is a lower() + find() per chunk - both C loops,
+            # several times faster than an IGNORECASE regex. ASCII terms
+            # are matched against the raw bytes, skipping the decode.
+            self._pattern = None
+            needle = term if case_sensitive else term.lower()
+            self._needle = needle.encode() if needle.isascii() else needle
+        self._binary = isinstance(self._needle, bytes)
+        self._data = index._data
+        self.size = index.size
+        self._hits = array("Q")
+        self._lock = threading.Lock()
+        self.scanned = 0
+        self.done = False
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="study-hub-line-search", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stops the scan (waiting for the worker) - required before the
+        index's mapping is closed."""
+        self._cancelled = True
+        self._thread.join()
+
+    def _run(self):
+        newline = b"\n" if self._binary else "\n"
+        pos, line_no = 0, 0
+        while pos < self.size and not self._cancelled:
+            # Cut chunks at a newline so a line never straddles two chunks.
+            end = min(self.size, pos + SEARCH_CHUNK_BYTES)
+            if end < self.size:
+                next_newline = self._data.find(b"\n", end)
+                end = self.size if next_newline == -1 else next_newline + 1
+            chunk = self._data[pos:end]
+            if not self._binary:
+                chunk = chunk.decode("utf-8", errors="ignore")
+                if "\r" in chunk and self._pattern:
+                    # So `$` matches at the end of CRLF lines too.
+                    chunk = chunk.replace("\r\n", "\n")
+            if self._needle is not None and not self.case_sensitive:
+                chunk = chunk.lower()  # never adds or drops a newline
+            found = array("Q")
+            counted_to, lines_before = 0, 0
+            start = self._find(chunk, 0)
+            # A match at the very end of the chunk (an empty-matching regex
+            # like `^$` after the last newline) isn't on any line.
+            while start != -1 and start < len(chunk):
+                lines_before += chunk.count(newline, counted_to, start)
+                counted_to = start
+                found.append(line_no + lines_before)
+                # One hit per line: carry on from the next line.
+                line_end = chunk.find(newline, start)
+                if line_end == -1 or line_end + 1 >= len(chunk):
+                    break  # the chunk's last line: nothing left to search
+                start = self._find(chunk, line_end + 1)
+            line_no += chunk.count(newline)
+            with self._lock:
+                self._hits.extend(found)
+                self.scanned = end
+            pos = end
+        self.done = not self._cancelled
+
+    def _find(self, chunk, start):
+        if self._pattern is None:
+            return chunk.find(self._needle, start)
+        match = self._pattern.search(chunk, start)
+        return match.start() if match else -1
+
+    @property
+    def progress(self):
+        """Fraction of the file scanned so far."""
+        return self.scanned / self.size if self.size else 1.0
+
+    def count(self):
+        with self._lock:
+            return len(self._hits)
+
+    def first(self):
+        with self._lock:
+            return self._hits[0] if self._hits else None
+
+    def last(self):
+        with self._lock:
+            return self._hits[-1] if self._hits else None
+
+    def next_after(self, line_no):
+        """The first hit after `line_no`, or None (none found yet)."""
+        with self._lock:
+            i = bisect_right(self._hits, line_no)
+            return self._hits[i] if i < len(self._hits) else None
+
+    def previous_before(self, line_no):
+        with self._lock:
+            i = bisect_left(self._hits, line_no)
+            return self._hits[i - 1] if i else None
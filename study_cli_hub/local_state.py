@@ -2,11 +2,20 @@
 # for /digest). Deliberately NOT git-synced: syncing one person's read-receipts
 # into everyone else's clone would create pointless conflicts on the same file
 # every user touches every run.
+#
+# The background autosync worker caches lookups here too, so every
+# read-modify-write happens under one lock and the file is replaced
+# atomically - two threads updating different keys never lose one another's
+# write or leave a half-written file.
 import json
 import os
+import threading
+import time
 
 from study_cli_hub import github_auth
 
+_LOCK = threading.Lock()
+
 
 def _state_file():
     return os.path.join(github_auth.config_dir(), "state.json")
@@ -24,8 +33,18 @@ def load_state():
 
 
 def save_state(data):
-    with open(_state_file(), "w", encoding="utf-8") as f:
+    path = _state_file()
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _update(key, value):
+    with _LOCK:
+        state = load_state()
+        state[key] = value
+        save_state(state)
 
 
 def get_last_seen(key):
@@ -33,6 +52,18 @@ def get_last_seen(key):
 
 
 def set_last_seen(key, when_iso):
-    state = load_state()
-    state[f"last_seen_{key}"] = when_iso
-    save_state(state)
+    _update(f"last_seen_{key}", when_iso)
+
+
+def get_cached(key, max_age_seconds):
+    """A value stored by set_cached() no older than max_age_seconds, else
+    None - for slow lookups (e.g. GitHub API calls) whose answer rarely
+    changes and is cheap to re-check when it turns out to be wrong."""
+    entry = load_state().get(f"cached_{key}")
+    if not isinstance(entry, dict) or time.time() - entry.get("checked_at", 0) > max_age_seconds:
+        return None
+    return entry.get("value")
+
+
+def set_cached(key, value):
+    _update(f"cached_{key}", {"value": value, "checked_at": time.time()})
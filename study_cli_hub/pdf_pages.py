@@ -0,0 +1,132 @@
+# pdf_pages.py - extracted-text cache for the PDF viewer. PyPDF2's
+# extract_text() re-parses a page's content stream on every call, which is
+# slow on text-heavy pages and used to run again on every redraw. Pages are
+# now extracted once into a small LRU, and a background thread extracts the
+# pages either side of the one on screen while you read, so flipping back
+# and forth is instant after the first page.
+#
+# When it has nothing to prefetch, the same thread works through the rest
+# of the document building a page-level search index (lower-cased text per
+# page), so `/` answers straight away from whatever has been indexed so far
+# and matches on later pages stream in as indexing catches up - instead of
+# freezing the viewer while every page is extracted.
+import threading
+from collections import OrderedDict
+
+PAGE_CACHE_SIZE = 32
+
+
+class PageTextCache:
+    def __init__(self, reader, capacity=PAGE_CACHE_SIZE):
+        self.reader = reader
+        self.capacity = capacity
+        self.total_pages = len(reader.pages)
+        self._pages = OrderedDict()
+        # A PdfReader reads through one shared file handle, so only one
+        # thread may touch it at a time.
+        self._reader_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._wanted = []
+        self._search_text = {}  # page -> lower-cased text, for every page seen
+        self._index_cursor = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker_loop, name="study-hub-pdf-pages", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stops the background thread - call before the PDF file is closed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _cached(self, page_no):
+        with self._cond:
+            if page_no in self._pages:
+                self._pages.move_to_end(page_no)
+                return self._pages[page_no]
+        return None
+
+    def get(self, page_no):
+        """The page's text, extracting it on a miss. Extraction errors are
+        raised (and not cached) so the viewer can report them."""
+        # A cached page never waits for the reader lock, which the
+        # background thread may be holding for a slow page of its own.
+        text = self._cached(page_no)
+        if text is not None:
+            return text
+        with self._reader_lock:
+            # Re-checked under the lock: the prefetcher may have just
+            # finished this very page.
+            text = self._cached(page_no)
+            if text is not None:
+                return text
+            text = self.reader.pages[page_no].extract_text() or ""
+        with self._cond:
+            self._search_text[page_no] = text.lower()
+            self._pages[page_no] = text
+            self._pages.move_to_end(page_no)
+            while len(self._pages) > self.capacity:
+                self._pages.popitem(last=False)
+        return text
+
+    def prefetch(self, page_no):
+        """Queues the pages either side of `page_no` (next first - that's
+        where readers usually go). Replaces any older, unstarted request."""
+        with self._cond:
+            self._wanted = [p for p in (page_no + 1, page_no - 1) if 0 <= p < self.total_pages]
+            self._cond.notify()
+
+    def _index_page(self, page_no):
+        with self._reader_lock:
+            if page_no in self._search_text:
+                return
+            try:
+                text = self.reader.pages[page_no].extract_text() or ""
+            except Exception:
+                text = ""  # unreadable pages just never match
+        with self._cond:
+            self._search_text[page_no] = text.lower()
+
+    def _next_unindexed(self):
+        while self._index_cursor < self.total_pages and self._index_cursor in self._search_text:
+            self._index_cursor += 1
+        return self._index_cursor if self._index_cursor < self.total_pages else None
+
+    def indexed_pages(self):
+        with self._cond:
+            return len(self._search_text)
+
+    def search(self, term):
+        """Pages (sorted) whose text contains `term`, case-insensitively,
+        among those indexed so far. Returns (pages, indexed_count); call
+        again later for matches on pages indexed since."""
+        needle = term.lower()
+        with self._cond:
+            indexed = list(self._search_text.items())
+        return sorted(page_no for page_no, text in indexed if needle in text), len(indexed)
+
+    def _worker_loop(self):
+        """Prefetch requests first (they're what the reader is about to
+        look at), then the next unindexed page."""
+        while True:
+            with self._cond:
+                while not self._closed and not self._wanted and self._next_unindexed() is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                prefetching = bool(self._wanted)
+                page_no = self._wanted.pop(0) if prefetching else self._next_unindexed()
+            if not prefetching:
+                self._index_page(page_no)
+                continue
+            try:
+                self.get(page_no)
+            except Exception:
+                pass  # the viewer reports it if the page is actually opened
@@ -1,21 +1,61 @@
 # quiz.py - CLI quiz/flashcard game.
 #
 # Flashcards are free and always available: write "Q: ... / A: ..." pairs
-# anywhere in your notes and /quiz picks them up, no setup needed.
+# anywhere in your notes - text notes, PDFs or Word documents - and /quiz
+# picks them up, no setup needed.
 #
 # AI-generated multiple-choice questions are bring-your-own-key (BYOK): each
 # user supplies their own Anthropic API key via the ANTHROPIC_API_KEY env
 # var. There is no shared secret anywhere in this public repo, and no cost
 # to the maintainer - you pay only for your own usage, exactly like any
 # other AI-powered CLI tool.
+#
+# Parsed flashcards are cached per note version (see cache.py), so starting
+# a quiz only re-reads and re-parses the notes that changed since last time.
+# Generated questions are cached too, keyed by a hash of everything that
+# shapes them (notes text, model, count, prompt version): the same notes
+# never cost a second API call, and "generate more" grows the cached pool.
+#
+# Questions are generated map-reduce style over the *whole* subject, not
+# just the first few notes: every note's text (PDF and DOCX included, via
+# extract.py's cache) is split into prompt-sized chunks, note by note so a
+# chunk's cached questions survive edits to other notes; a quiz picks a
+# handful of them - chunks nothing has been generated from yet first - and
+# generates from each in parallel, then merges the results, dropping
+# near-duplicate questions and taking an even share from every chunk.
+import difflib
+import hashlib
 import json
 import os
+import queue
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from study_cli_hub import cache, extract, srs
 from study_cli_hub.paths import list_notes, subject_path
 
 ANTHROPIC_API_KEY_ENV = "ANTHROPIC_API_KEY"
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
-FLASHCARD_EXTENSIONS = {"txt", "md"}
+FLASHCARD_EXTENSIONS = {"txt", "md"} | extract.DOCUMENT_EXTENSIONS
+
+_CARDS_NAMESPACE = "flashcards"
+_CARDS_FORMAT_VERSION = 2
+
+_QUESTIONS_NAMESPACE = "ai-questions"
+PROMPT_VERSION = 1  # bump when the prompt changes, so old pools aren't reused
+AI_CACHE_MAX_BYTES = 5 * 1024 * 1024  # least recently used pools go first
+
+CHUNK_CHARS = 8000  # notes text per generation prompt
+CHUNK_QUESTIONS = 5  # questions generated from each chunk
+QUIZ_QUESTIONS = 10
+MAX_CHUNKS_PER_QUIZ = 5
+AI_CONCURRENCY = 3  # generation requests in flight at once
+SIMILAR_QUESTION_RATIO = 0.85  # normalized questions this alike count as the same one
+
+_streams = set()  # QuestionStreams still generating, for cancel_generation()
+_streams_lock = threading.Lock()
 
 
 def is_ai_configured():
@@ -48,67 +88,303 @@ def extract_flashcards_from_text(text):
     return cards
 
 
-def collect_flashcards(user_folder, subject):
-    """All Q:/A: flashcards found across a subject's text notes."""
+def _extract_wrapped_flashcards(text):
+    """Like extract_flashcards_from_text(), for text whose lines were
+    wrapped by a document's layout rather than by the writer: a question
+    or answer carries on over the following lines until the next Q:/A:
+    line or a blank line, and whitespace is collapsed - so a card reads
+    (and gets the same id) however the document wrapped it."""
     cards = []
+    question = answer = None
+    wrapping = False  # is the line before part of the question/answer?
+    for line in text.splitlines() + ["Q:"]:
+        line = line.strip()
+        tag = line[:2].lower()
+        if tag == "q:":
+            if question and answer:
+                cards.append({"question": " ".join(question.split()), "answer": " ".join(answer.split())})
+            question, answer, wrapping = line[2:], None, True
+        elif tag == "a:" and question is not None and answer is None:
+            answer, wrapping = line[2:], True
+        elif not line or tag == "a:":
+            wrapping = False
+        elif wrapping:
+            if answer is None:
+                question += " " + line
+            else:
+                answer += " " + line
+    return cards
+
+
+def _document_flashcards(path, ext):
+    """Flashcards in a PDF's pages / a DOCX's paragraphs (read through
+    extract.py's cache), or None when the document can't be read here.
+    Pages are joined line to line, so a card can run over a page break;
+    each DOCX paragraph stands on its own."""
+    blocks = extract.document_blocks(path, ext)
+    if blocks is None:
+        return None
+    return _extract_wrapped_flashcards(("\n" if ext == "pdf" else "\n\n").join(blocks))
+
+
+def note_flashcards(path):
+    """The flashcards in one note, each with its SRS `id`
+    (srs.card_id of the question). Served from the cache while the note is
+    unchanged; parsed and cached otherwise. Raises OSError if the note
+    can't be read."""
+    ext = path.rsplit(".", 1)[-1].lower()
+    entry = cache.entry_path(_CARDS_NAMESPACE, path, ".json")
+    data = cache.read_bytes(entry)
+    if data:
+        try:
+            cached = json.loads(data)
+            if cached.get("format") == _CARDS_FORMAT_VERSION:
+                return cached["cards"]
+        except (ValueError, KeyError):
+            pass
+
+    if ext in extract.DOCUMENT_EXTENSIONS:
+        cards = _document_flashcards(path, ext)
+        if cards is None:
+            return []  # PyPDF2/lxml missing: nothing worth caching
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            cards = extract_flashcards_from_text(f.read())
+    for card in cards:
+        card["id"] = srs.card_id(card["question"])
+    cache.write_bytes(entry, json.dumps({"format": _CARDS_FORMAT_VERSION, "cards": cards}).encode("utf-8"))
+    return cards
+
+
+def collect_flashcards(user_folder, subject):
+    """All Q:/A: flashcards found across a subject's notes (text, PDF and
+    DOCX), each {"question", "answer", "id"}. A card that appears in more
+    than one note (say a Markdown note and the PDF exported from it) is the
+    same SRS card, so it's only included once."""
+    cards = {}
     for filename in list_notes(user_folder, subject):
         ext = filename.split(".")[-1].lower() if "." in filename else ""
         if ext not in FLASHCARD_EXTENSIONS:
             continue
         path = os.path.join(subject_path(user_folder, subject), filename)
         try:
-            with open(path, encoding="utf-8", errors="ignore") as f:
-                text = f.read()
+            for card in note_flashcards(path):
+                cards.setdefault(card["id"], card)
         except OSError:
             continue
-        cards.extend(extract_flashcards_from_text(text))
-    return cards
+    return list(cards.values())
+
 
+def _note_text(path, ext):
+    if ext in extract.DOCUMENT_EXTENSIONS:
+        return extract.document_text(path, ext)
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return f.read()
 
-def collect_notes_text(user_folder, subject, max_chars=8000):
-    """Concatenated plain-text note content for a subject, used as source
-    material for AI question generation. Capped to keep prompts small."""
+
+def _split_text(text, limit):
+    """text in pieces of at most `limit` characters, broken at a paragraph
+    break where there is one in the second half of the piece, else at a
+    line break, else at a space."""
+    pieces = []
+    while len(text) > limit:
+        cut = -1
+        for sep in ("\n\n", "\n", " "):
+            cut = text.rfind(sep, limit // 2, limit)
+            if cut != -1:
+                break
+        if cut == -1:
+            cut = limit
+        pieces.append(text[:cut])
+        text = text[cut:].lstrip()
+    if text.strip():
+        pieces.append(text)
+    return pieces
+
+
+def collect_note_chunks(user_folder, subject, chunk_chars=CHUNK_CHARS):
+    """A subject's note text (text notes, PDFs and DOCX) as prompt-sized
+    chunks for AI question generation, each piece headed by the note it
+    came from. Every note is chunked on its own - a big one spans several
+    chunks, a small one is a chunk by itself - so editing or adding a note
+    leaves the other notes' chunks, and their cached questions, as they
+    were."""
     chunks = []
-    total = 0
     for filename in list_notes(user_folder, subject):
         ext = filename.split(".")[-1].lower() if "." in filename else ""
         if ext not in FLASHCARD_EXTENSIONS:
             continue
         path = os.path.join(subject_path(user_folder, subject), filename)
         try:
-            with open(path, encoding="utf-8", errors="ignore") as f:
-                text = f.read()
+            text = _note_text(path, ext)
         except OSError:
             continue
         if not text.strip():
             continue
-        chunks.append(f"--- {filename} ---\n{text}")
-        total += len(text)
-        if total >= max_chars:
-            break
-    return "\n\n".join(chunks)[:max_chars]
+        header = f"--- {filename} ---\n"
+        chunks.extend(header + piece for piece in _split_text(text, chunk_chars - len(header)))
+    return chunks
 
 
-def generate_ai_questions(subject, notes_text, count=5):
-    """BYOK multiple-choice question generation. Returns (questions, error);
-    each question is {"question", "choices": [...], "answer_index"}."""
-    api_key = os.environ.get(ANTHROPIC_API_KEY_ENV)
-    if not api_key:
-        return None, (
-            "No ANTHROPIC_API_KEY set. Export your own Anthropic API key to "
-            "use AI-generated questions - see the README's '/quiz' section."
-        )
+def pick_chunks(chunks, limit=MAX_CHUNKS_PER_QUIZ):
+    """Up to `limit` chunks for one quiz: ones no questions have been
+    generated from yet come first (in random order), then ones that have -
+    so quizzing again and again works its way across the whole subject."""
+    fresh, covered = [], []
+    for chunk in chunks:
+        (covered if os.path.exists(_questions_entry(chunk, CHUNK_QUESTIONS)) else fresh).append(chunk)
+    random.shuffle(fresh)
+    random.shuffle(covered)
+    return (fresh + covered)[:limit]
+
+
+def pooled_question_count(chunks):
+    """How many questions are already cached for these chunks - 0 unless
+    every one of them has a pool (otherwise there's new ground to cover)."""
+    total = 0
+    for chunk in chunks:
+        pool = cached_ai_questions(chunk, CHUNK_QUESTIONS)
+        if not pool:
+            return 0
+        total += len(pool)
+    return total
+
 
+def _ai_model():
+    return os.environ.get("STUDY_HUB_AI_MODEL", DEFAULT_MODEL)
+
+
+def _questions_entry(notes_text, count):
+    key = json.dumps([PROMPT_VERSION, _ai_model(), count, notes_text])
+    return os.path.join(cache.cache_dir(_QUESTIONS_NAMESPACE), hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def cached_ai_questions(notes_text, count=5):
+    """The pool of questions already generated for exactly these notes (and
+    model, count and prompt version), or None."""
+    entry = _questions_entry(notes_text, count)
+    data = cache.read_bytes(entry)
+    if not data:
+        return None
     try:
-        import anthropic
-    except ImportError:
-        return None, (
-            "The 'anthropic' package isn't installed. Run: "
-            "pip install \"study-cli-hub[ai]\" (or: pip install anthropic)"
-        )
+        questions = json.loads(data)
+    except ValueError:
+        return None
+    try:
+        os.utime(entry)  # mtime is the LRU clock
+    except OSError:
+        pass
+    return questions or None
+
+
+def _store_questions(entry, questions):
+    cache.write_bytes(entry, json.dumps(questions).encode("utf-8"))
+    directory = os.path.dirname(entry)
+    try:
+        pools = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+        pools = sorted(((os.stat(path), path) for path in pools), key=lambda item: item[0].st_mtime_ns)
+    except OSError:
+        return
+    total = sum(stat.st_size for stat, _ in pools)
+    for stat, path in pools:
+        if total <= AI_CACHE_MAX_BYTES or path == entry:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= stat.st_size
+
+
+class AIQuestionError(Exception):
+    """Question generation couldn't run or produced nothing usable; the
+    message is meant for the user."""
+
+
+class _QuestionParser:
+    """Pulls each complete object out of a JSON array while it's still
+    being streamed: tracks nesting depth (ignoring brackets inside
+    strings) and hands back an object's text as soon as its closing brace
+    arrives. Anything before the opening `[` (a ```json fence) is skipped."""
+
+    def __init__(self):
+        self.started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+
+    def feed(self, text):
+        """Returns the objects completed by this piece of text."""
+        objects = []
+        for ch in text:
+            if not self.started:
+                if ch == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+            if self._depth >= 2:
+                self._current.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2:
+                    self._current = [ch]
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    objects.append("".join(self._current))
+        return objects
+
+
+def _is_valid_question(q):
+    return (
+        isinstance(q, dict) and q.get("question") and q.get("choices")
+        and isinstance(q.get("answer_index"), int)
+    )
+
+
+def stream_ai_questions(subject, notes_text, count=5, more=False, client=None):
+    """BYOK multiple-choice question generation, yielding each question
+    ({"question", "choices": [...], "answer_index"}) as soon as the model
+    has finished writing it. Answers from the cache when these notes have
+    been used before; with `more`, asks for `count` new questions unlike
+    the cached ones and yields just those. The pool is cached once the
+    response is complete. `client` is anything with the Anthropic client's
+    messages.stream() (a fake one in tests); by default a real client is
+    made from ANTHROPIC_API_KEY. Raises AIQuestionError."""
+    entry = _questions_entry(notes_text, count)
+    pool = cached_ai_questions(notes_text, count) or []
+    if pool and not more:
+        yield from pool
+        return
+
+    if client is None:
+        api_key = os.environ.get(ANTHROPIC_API_KEY_ENV)
+        if not api_key:
+            raise AIQuestionError(
+                "No ANTHROPIC_API_KEY set. Export your own Anthropic API key to "
+                "use AI-generated questions - see the README's '/quiz' section."
+            )
+        try:
+            import anthropic
+        except ImportError:
+            raise AIQuestionError(
+                "The 'anthropic' package isn't installed. Run: "
+                "pip install \"study-cli-hub[ai]\" (or: pip install anthropic)"
+            ) from None
+        client = anthropic.Anthropic(api_key=api_key)
 
     if not notes_text.strip():
-        return None, f"No text notes found in '{subject}' to generate questions from."
+        raise AIQuestionError(f"No text notes found in '{subject}' to generate questions from.")
 
     prompt = (
         f"Based on these study notes about \"{subject}\", write {count} multiple-choice "
@@ -117,29 +393,169 @@ def generate_ai_questions(subject, notes_text, count=5):
         "Respond with ONLY a JSON array, no other text, in this exact shape:\n"
         '[{"question": "...", "choices": ["...", "...", "...", "..."], "answer_index": 0}]'
     )
+    if pool:
+        asked = "\n".join(f"- {q['question']}" for q in pool)
+        prompt += f"\n\nThese questions have already been asked - write different ones:\n{asked}"
 
+    parser = _QuestionParser()
+    seen = {q["question"].strip().lower() for q in pool}
+    new = []
     try:
-        client = anthropic.Anthropic(api_key=api_key)
-        resp = client.messages.create(
-            model=os.environ.get("STUDY_HUB_AI_MODEL", DEFAULT_MODEL),
+        with client.messages.stream(
+            model=_ai_model(),
             max_tokens=2000,
             messages=[{"role": "user", "content": prompt}],
-        )
-        raw = "".join(block.text for block in resp.content if hasattr(block, "text")).strip()
-        if raw.startswith("```"):
-            raw = raw.strip("`")
-            if raw.lower().startswith("json"):
-                raw = raw[4:]
-        questions = json.loads(raw)
-        valid = [
-            q for q in questions
-            if isinstance(q, dict) and q.get("question") and q.get("choices")
-            and isinstance(q.get("answer_index"), int)
-        ]
-        if not valid:
-            return None, "AI response didn't contain any usable questions."
-        return valid, None
-    except json.JSONDecodeError:
-        return None, "AI response wasn't valid JSON - try again."
+        ) as stream:
+            for text in stream.text_stream:
+                for raw in parser.feed(text):
+                    try:
+                        q = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if not _is_valid_question(q) or q["question"].strip().lower() in seen:
+                        continue
+                    seen.add(q["question"].strip().lower())
+                    new.append(q)
+                    yield q
     except Exception as e:
-        return None, f"AI question generation failed: {e}"
+        raise AIQuestionError(f"AI question generation failed: {e}") from e
+
+    if not new:
+        raise AIQuestionError(
+            "AI response didn't contain any usable questions." if parser.started
+            else "AI response wasn't valid JSON - try again."
+        )
+    _store_questions(entry, pool + new)
+
+
+def _question_key(question):
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+def _is_near_duplicate(key, keys):
+    for other in keys:
+        matcher = difflib.SequenceMatcher(None, key, other)
+        if (
+            matcher.real_quick_ratio() >= SIMILAR_QUESTION_RATIO
+            and matcher.quick_ratio() >= SIMILAR_QUESTION_RATIO
+            and matcher.ratio() >= SIMILAR_QUESTION_RATIO
+        ):
+            return True
+    return False
+
+
+class QuestionStream:
+    """Generates a quiz's questions from several note chunks at once (at
+    most AI_CONCURRENCY requests in flight, each a stream_ai_questions())
+    in background threads, so a quiz can show the first question while the
+    model is still writing the rest. Questions are handed out in the order
+    they're finished, skipping near-duplicates of ones already handed out
+    and taking at most an even share of `count` from each chunk; a chunk's
+    cached pool is shuffled first, so reusing it asks a different mix.
+    Chunks still being written when the quiz is full carry on in the
+    background so their pools get cached, until cancel() (or
+    cancel_generation()) stops them - the worker threads aren't daemons,
+    so the interpreter waits for them on exit."""
+
+    def __init__(self, subject, chunks, count=QUIZ_QUESTIONS, more=False, client=None):
+        per_chunk = -(-count // len(chunks)) if chunks else 0
+        self.count = min(count, len(chunks) * min(per_chunk, CHUNK_QUESTIONS))
+        self.error = None
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        with _streams_lock:
+            _streams.add(self)
+        self._thread = threading.Thread(
+            target=self._run, args=(subject, chunks, per_chunk, more, client),
+            name="study-hub-ai-questions", daemon=True,
+        )
+        self._thread.start()
+
+    def cancel(self):
+        """Stops generating: chunks not started yet are skipped, and ones
+        being written stop at their next question, without caching the
+        partial pool."""
+        self._cancelled.set()
+
+    def _generate(self, results, index, subject, chunk, more, client):
+        try:
+            pool = None if more else cached_ai_questions(chunk, CHUNK_QUESTIONS)
+            if pool:
+                for q in random.sample(pool, len(pool)):
+                    results.put((index, q))
+            elif not self._cancelled.is_set():
+                for q in stream_ai_questions(subject, chunk, CHUNK_QUESTIONS, more, client):
+                    if self._cancelled.is_set():
+                        break  # closes the stream; nothing is cached from it
+                    results.put((index, q))
+        except AIQuestionError as e:
+            results.put((index, e))
+        results.put((index, None))
+
+    def _run(self, subject, chunks, per_chunk, more, client):
+        try:
+            self._collect(subject, chunks, per_chunk, more, client)
+        finally:
+            with _streams_lock:
+                _streams.discard(self)
+
+    def _collect(self, subject, chunks, per_chunk, more, client):
+        if not chunks:
+            self.error = f"No notes with text found in '{subject}' to generate questions from."
+            self._queue.put(None)
+            return
+        results = queue.Queue()
+        taken = [0] * len(chunks)
+        keys, errors = [], []
+        running = len(chunks)
+        with ThreadPoolExecutor(max_workers=min(AI_CONCURRENCY, len(chunks)), thread_name_prefix="study-hub-ai-chunk") as pool:
+            for index, chunk in enumerate(chunks):
+                pool.submit(self._generate, results, index, subject, chunk, more, client)
+            while running:
+                index, item = results.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, AIQuestionError):
+                    errors.append(str(item))
+                elif len(keys) < self.count and taken[index] < per_chunk:
+                    key = _question_key(item["question"])
+                    if _is_near_duplicate(key, keys):
+                        continue
+                    keys.append(key)
+                    taken[index] += 1
+                    self._queue.put(item)
+                    if len(keys) == self.count:
+                        self._queue.put(None)  # the quiz is full; the rest only fill the cache
+        if len(keys) < self.count:
+            if errors:
+                self.error = errors[0]
+            self._queue.put(None)
+
+    def ready(self):
+        """True when next() won't block."""
+        return not self._queue.empty()
+
+    def next(self):
+        """The next question, waiting for it if needed; None once there are
+        no more (check `error`)."""
+        q = self._queue.get()
+        if q is None:
+            self._queue.put(None)  # stay finished for later calls
+        return q
+
+    def __iter__(self):
+        while True:
+            q = self.next()
+            if q is None:
+                return
+            yield q
+
+
+def cancel_generation():
+    """cancel() every QuestionStream still generating - called on the way
+    out, so questions being written only to fill the cache don't hold the
+    app open."""
+    with _streams_lock:
+        streams = list(_streams)
+    for stream in streams:
+        stream.cancel()
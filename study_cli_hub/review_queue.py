@@ -0,0 +1,178 @@
+# review_queue.py - the cross-subject due queue behind /review. Every
+# scheduled card's next_review_date, per subject, is kept in a small index
+# in the per-device cache (see cache.py) together with the version of the
+# subject's SRS state it was read from. Building the queue only re-reads the
+# state of subjects that changed since (a quiz, a review, a git pull), then
+# heapifies the due cards by date, so the most overdue card comes first
+# whichever subject it's in.
+#
+# Only cards that have been reviewed at least once are scheduled; new cards
+# are introduced per subject by /quiz.
+#
+# The same pass over a subject's state also sums up its review history
+# (recall by days since the previous review, ease factors, answer times per
+# grade) into a few counters kept in the index, so /quiz-stats adds up
+# small per-subject totals instead of loading every subject's state.
+import bisect
+import hashlib
+import heapq
+import json
+import os
+from datetime import date, timedelta
+
+from study_cli_hub import cache, srs
+from study_cli_hub.paths import subject_path
+
+_NAMESPACE = "review"
+_FORMAT_VERSION = 2
+
+FORECAST_DAYS = 30
+# Days since the previous review, for the retention curve: a review falls
+# in the first bucket whose edge it doesn't exceed, or the last one.
+RETENTION_EDGES = [1, 3, 7, 14, 30, 90]
+RETENTION_LABELS = ["1 day", "2-3 days", "4-7 days", "8-14 days", "15-30 days", "31-90 days", "90+ days"]
+EASE_EDGES = [1.7, 2.1, 2.5, 2.9]
+EASE_LABELS = ["1.3-1.7", "1.7-2.1", "2.1-2.5", "2.5-2.9", "2.9+"]
+MAX_ANSWER_SECONDS = 120  # longer means you walked away, not that it took that long
+
+
+def _index_path(user_folder):
+    folder = os.path.abspath(subject_path(user_folder))
+    return os.path.join(cache.cache_dir(_NAMESPACE), hashlib.sha1(folder.encode("utf-8")).hexdigest()[:16] + ".json")
+
+
+def _load_index(path):
+    data = cache.read_bytes(path)
+    if data:
+        try:
+            index = json.loads(data)
+            if index.get("format") == _FORMAT_VERSION:
+                return index["subjects"]
+        except (ValueError, KeyError):
+            pass
+    return {}
+
+
+def _summarize(state):
+    """A subject's review history as counters: [reviews, recalled] per
+    retention bucket, cards per ease bucket, and [total seconds, answers]
+    per 1-5 grade."""
+    retention = [[0, 0] for _ in RETENTION_LABELS]
+    ease = [0] * len(EASE_LABELS)
+    seconds = [[0.0, 0] for _ in range(5)]
+    for card in state.values():
+        if "ease_factor" in card:
+            ease[bisect.bisect_right(EASE_EDGES, card["ease_factor"])] += 1
+        previous = None
+        for review in card.get("history", []):
+            day, quality = date.fromisoformat(review[0]), review[1]
+            if previous is not None:
+                bucket = retention[bisect.bisect_left(RETENTION_EDGES, max(1, (day - previous).days))]
+                bucket[0] += 1
+                bucket[1] += quality >= 3
+            previous = day
+            if len(review) > 2 and review[2] is not None:
+                seconds[quality - 1][0] += min(review[2], MAX_ANSWER_SECONDS)
+                seconds[quality - 1][1] += 1
+    return {"retention": retention, "ease": ease, "seconds": seconds}
+
+
+def _refreshed_index(user_folder, subjects):
+    """The index's entries for `subjects`, re-reading the SRS state of
+    those that changed since it was last read."""
+    path = _index_path(user_folder)
+    index = _load_index(path)
+    removed = set(index) - set(subjects)
+    for subject in removed:
+        del index[subject]
+    changed = bool(removed)
+    for subject in subjects:
+        version = srs.state_version(user_folder, subject)
+        entry = index.get(subject)
+        if entry and entry["version"] == version:
+            continue
+        state = srs.load_state(user_folder, subject) if version else {}
+        index[subject] = {
+            "version": version,
+            "due": sorted(
+                [card["next_review_date"], cid] for cid, card in state.items() if card.get("next_review_date")
+            ),
+            "stats": _summarize(state),
+        }
+        changed = True
+    if changed:
+        cache.write_bytes(path, json.dumps({"format": _FORMAT_VERSION, "subjects": index}).encode("utf-8"))
+    return {subject: index[subject] for subject in subjects}
+
+
+def due_dates(user_folder, subjects):
+    """{subject: [[next_review_date, card_id], ...]} for every scheduled
+    card, read from the index and refreshed for the subjects whose SRS
+    state has changed since it was last read."""
+    return {subject: entry["due"] for subject, entry in _refreshed_index(user_folder, subjects).items()}
+
+
+def build_queue(user_folder, subjects, today=None):
+    """A heap of (next_review_date, subject, card_id) for every card due by
+    `today` - heapq.heappop() hands them out most overdue first."""
+    today_iso = (today or date.today()).isoformat()
+    queue = []
+    for subject, due in due_dates(user_folder, subjects).items():
+        # Each subject's list is sorted by date: stop at the first future one.
+        for due_date, cid in due:
+            if due_date > today_iso:
+                break
+            queue.append((due_date, subject, cid))
+    heapq.heapify(queue)
+    return queue
+
+
+def next_due_date(user_folder, subjects, today=None):
+    """The earliest date after `today` that any card comes due, or None."""
+    today_iso = (today or date.today()).isoformat()
+    upcoming = [
+        due_date
+        for due in due_dates(user_folder, subjects).values()
+        for due_date, _ in due
+        if due_date > today_iso
+    ]
+    return min(upcoming, default=None)
+
+
+def review_stats(user_folder, subjects, today=None):
+    """/quiz-stats across `subjects`, added up from the index:
+    {"cards": scheduled cards,
+     "forecast": cards due on each of the next FORECAST_DAYS days (overdue
+         ones count as due today),
+     "retention": [(label, reviews, recalled)] by days since the previous
+         review,
+     "ease": [(label, cards)],
+     "seconds": [(grade, average seconds to answer, answers)]}."""
+    today = today or date.today()
+    last_iso = (today + timedelta(days=FORECAST_DAYS - 1)).isoformat()
+    forecast = [0] * FORECAST_DAYS
+    retention = [[0, 0] for _ in RETENTION_LABELS]
+    ease = [0] * len(EASE_LABELS)
+    seconds = [[0.0, 0] for _ in range(5)]
+    cards = 0
+    for entry in _refreshed_index(user_folder, subjects).values():
+        cards += len(entry["due"])
+        for due_date, _ in entry["due"]:
+            if due_date > last_iso:
+                break
+            forecast[max(0, (date.fromisoformat(due_date) - today).days)] += 1
+        summary = entry["stats"]
+        for total, counts in zip(retention, summary["retention"]):
+            total[0] += counts[0]
+            total[1] += counts[1]
+        ease = [total + count for total, count in zip(ease, summary["ease"])]
+        for total, counts in zip(seconds, summary["seconds"]):
+            total[0] += counts[0]
+            total[1] += counts[1]
+    return {
+        "cards": cards,
+        "forecast": forecast,
+        "retention": [(label, reviews, recalled) for label, (reviews, recalled) in zip(RETENTION_LABELS, retention)],
+        "ease": list(zip(EASE_LABELS, ease)),
+        "seconds": [(grade, total / answers if answers else None, answers) for grade, (total, answers) in enumerate(seconds, 1)],
+    }
@@ -2,6 +2,7 @@
 import csv
 import os
 
+from study_cli_hub import docx_text, extract
 from study_cli_hub.file_viewer import TEXT_EXTENSIONS
 from study_cli_hub.paths import (
     list_global_subjects,
@@ -12,15 +13,6 @@ from study_cli_hub.paths import (
     subject_path,
 )
 
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
-
-try:
-    import docx
-except ImportError:
-    docx = None
 
 MAX_FILES_SCANNED = 400
 MAX_RESULTS = 50
@@ -41,16 +33,15 @@ def _extract_chunks(path, ext):
                 rows = list(csv.reader(f))
             data_rows = rows[1:] if len(rows) > 1 else rows
             return [(i + 1, "row", " ".join(str(c) for c in row)) for i, row in enumerate(data_rows)]
-        if ext == "pdf" and PyPDF2:
-            with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                return [(i + 1, "page", page.extract_text() or "") for i, page in enumerate(reader.pages)]
-        if ext in ("doc", "docx") and docx:
-            document = docx.Document(path)
-            # Match interactive_docx_viewer()'s filtering so a jump target
-            # (paragraph N) points at the same paragraph in both places.
-            non_empty = [p for p in document.paragraphs if p.text.strip()]
-            return [(i + 1, "paragraph", p.text) for i, p in enumerate(non_empty)]
+        if ext in extract.DOCUMENT_EXTENSIONS:
+            # Extracted once per document version (see extract.py). Same
+            # page / non-empty paragraph numbering as the PDF and DOCX
+            # viewers, so a jump target points at the right place.
+            kind = extract.block_kind(ext)
+            return [(i + 1, kind, text) for i, text in enumerate(extract.document_blocks(path, ext) or [])]
+        if ext == "doc" and docx_text.etree:
+            paragraphs, _ = docx_text.read_document(path)
+            return [(i + 1, "paragraph", text) for i, text in enumerate(paragraphs)]
     except Exception:
         return []
     return []
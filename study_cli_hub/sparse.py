@@ -0,0 +1,142 @@
+# sparse.py - opt-in sparse-checkout mode: materialize only your own
+# subjects/<you>/ folder, the global subjects and the app itself, instead of
+# every user's uploads (large PDFs/DOCX included). Most sessions only ever
+# touch your own folder, so this shrinks the checkout and makes every
+# `git status` (and therefore every sync) scan far fewer files.
+#
+# Other users' folders are still fully tracked - they're just not written
+# to disk until something needs them: /explore checks a user out when you
+# open them, /search-all checks everyone out before a full-text scan. Pair it
+# with a partial clone (`git clone --filter=blob:none`) and their blobs
+# aren't even downloaded until then.
+#
+# Uses git's cone mode, so patterns are plain directory names and stay fast
+# no matter how many folders are listed.
+import os
+import subprocess
+
+from study_cli_hub.paths import SUBJECTS_DIR, subject_path
+
+
+def _git(args, cwd=None):
+    return subprocess.run(["git"] + args, capture_output=True, text=True, cwd=cwd or os.getcwd())
+
+
+def is_enabled(cwd=None):
+    return _git(["config", "--bool", "core.sparseCheckout"], cwd).stdout.strip() == "true"
+
+
+def _tracked_dirs(cwd=None):
+    """Every directory under subjects/ in HEAD, as tuples of path parts -
+    read from the commit itself, so it includes folders that aren't
+    checked out."""
+    result = _git(["ls-tree", "-r", "-d", "--name-only", "HEAD", "--", SUBJECTS_DIR], cwd)
+    if result.returncode != 0:
+        return []
+    return [tuple(line.split("/")) for line in result.stdout.splitlines() if line.startswith(SUBJECTS_DIR + "/")]
+
+
+def tracked_layout(cwd=None):
+    """(users, global_subjects) as committed in HEAD - the same "has
+    sub-folders means it's a user folder" heuristic as
+    paths.list_known_users(), but independent of what's on disk."""
+    dirs = _tracked_dirs(cwd)
+    users = sorted({parts[1] for parts in dirs if len(parts) >= 3})
+    top_level = {parts[1] for parts in dirs if len(parts) == 2}
+    return users, sorted(top_level - set(users))
+
+
+def _app_dirs(cwd=None):
+    """Top-level directories other than subjects/ (the package, scripts,
+    workflows) - always checked out, since cone mode would otherwise hide
+    an editable install's own source."""
+    result = _git(["ls-tree", "-d", "--name-only", "HEAD"], cwd)
+    return [d for d in result.stdout.splitlines() if d and d != SUBJECTS_DIR]
+
+
+def _git_path(path):
+    return path.replace(os.sep, "/")
+
+
+def checked_out_dirs(cwd=None):
+    result = _git(["sparse-checkout", "list"], cwd)
+    return result.stdout.splitlines() if result.returncode == 0 else []
+
+
+def _required_dirs(user_folder, cwd=None):
+    _, global_subjects = tracked_layout(cwd)
+    dirs = _app_dirs(cwd) + [_git_path(subject_path(None, g)) for g in global_subjects]
+    if user_folder:
+        dirs.append(_git_path(subject_path(user_folder)))
+    return dirs
+
+
+def enable(user_folder, cwd=None):
+    """Switches this clone to sparse mode. Returns (ok, error)."""
+    result = _git(["sparse-checkout", "set", "--cone"] + _required_dirs(user_folder, cwd), cwd)
+    if result.returncode != 0:
+        return False, result.stderr.strip() or "git sparse-checkout failed"
+    return True, None
+
+
+def disable(cwd=None):
+    """Back to a full checkout (materializes everything). Returns (ok, error)."""
+    result = _git(["sparse-checkout", "disable"], cwd)
+    if result.returncode != 0:
+        return False, result.stderr.strip() or "git sparse-checkout disable failed"
+    return True, None
+
+
+def refresh(user_folder=None, cwd=None):
+    """Called after a pull: keeps whatever is already checked out and adds
+    anything new that sparse mode always includes (a global subject or app
+    folder someone else just pushed). No-op outside sparse mode."""
+    if not is_enabled(cwd):
+        return
+    current = checked_out_dirs(cwd)
+    missing = [d for d in _required_dirs(user_folder, cwd) if d not in current]
+    if missing:
+        _git(["sparse-checkout", "add"] + missing, cwd)
+
+
+def is_materialized(user_folder, cwd=None):
+    if not is_enabled(cwd):
+        return True
+    return _git_path(subject_path(user_folder)) in checked_out_dirs(cwd)
+
+
+def materialize(user_folders, cwd=None):
+    """Checks the given users' folders out on demand (the folder you switch
+    to, a user opened in /explore, or everyone on /search-all). Returns
+    (ok, error); a no-op outside sparse mode or when already present."""
+    if not is_enabled(cwd):
+        return True, None
+    current = checked_out_dirs(cwd)
+    wanted = [_git_path(subject_path(u)) for u in user_folders if u]
+    missing = [d for d in wanted if d not in current]
+    if not missing:
+        return True, None
+    result = _git(["sparse-checkout", "add"] + missing, cwd)
+    if result.returncode != 0:
+        return False, result.stderr.strip() or "git sparse-checkout add failed"
+    return True, None
+
+
+def unmaterialized_users(exclude=None, cwd=None):
+    """Users tracked in HEAD whose folders aren't checked out right now."""
+    if not is_enabled(cwd):
+        return []
+    users, _ = tracked_layout(cwd)
+    current = set(checked_out_dirs(cwd))
+    return [u for u in users if u != exclude and _git_path(subject_path(u)) not in current]
+
+
+def checkout_summary(cwd=None):
+    """{"tracked", "checked_out"} file counts - how much sparse mode is
+    actually keeping off disk. skip-worktree entries are the ones left out."""
+    result = _git(["ls-files", "-t"], cwd)
+    if result.returncode != 0:
+        return None
+    lines = result.stdout.splitlines()
+    skipped = sum(1 for line in lines if line.startswith("S "))
+    return {"tracked": len(lines), "checked_out": len(lines) - skipped}
@@ -1,15 +1,40 @@
-# srs.py - lightweight spaced-repetition scheduling (a simplified SM-2) for
-# the Q:/A: flashcards /quiz already collects. State is one small JSON file
-# per subject, git-synced alongside the notes it schedules - no database,
-# consistent with the rest of this app's plain-file storage model.
+# srs.py - lightweight spaced-repetition scheduling (a simplified SM-2, or
+# FSRS per subject - see fsrs.py) for the Q:/A: flashcards /quiz already
+# collects. State is plain files per
+# subject, git-synced alongside the notes it schedules - no database,
+# consistent with the rest of this app's plain-file storage model:
+#
+# * .srs_log.jsonl - one compact JSON line per review (the review itself
+#   plus the card's new scheduling fields), appended the moment you grade a
+#   card (ReviewLog). A review is a small one-line append and a one-line git
+#   diff, however big the deck and however long the card's history.
+# * .srs_state.json - a snapshot of every card, rewritten only when the log
+#   has grown to COMPACT_AFTER_REVIEWS lines (compaction), after which the
+#   log starts over empty.
+# * .srs_config.json - which scheduler the subject uses, and the FSRS
+#   weights /srs-optimize fitted for it. Absent means SM-2.
+#
+# The state is the snapshot with the log replayed over it. Replay adds each
+# line's review to the card's history, skipping reviews it already has
+# (each is stamped with its reviewed_at time), and keeps the scheduling
+# fields of the newest review, so the log can be merged line-wise:
+# .gitattributes marks it merge=union, and two devices reviewing the same
+# card keep both reviews.
 import hashlib
 import json
 import os
-from datetime import date, timedelta
+import time
+from datetime import date, datetime, timedelta, timezone
 
+from study_cli_hub import cache, fsrs
 from study_cli_hub.paths import subject_path
 
 SRS_STATE_FILE = ".srs_state.json"
+SRS_LOG_FILE = ".srs_log.jsonl"
+SRS_CONFIG_FILE = ".srs_config.json"
+COMPACT_AFTER_REVIEWS = 500
+FSYNC_EVERY_REVIEWS = 10
+FSYNC_EVERY_SECONDS = 30
 DEFAULT_EASE_FACTOR = 2.5
 MIN_EASE_FACTOR = 1.3
 
@@ -25,17 +50,185 @@ def _state_path(user_folder, subject):
     return os.path.join(subject_path(user_folder, subject), SRS_STATE_FILE)
 
 
+def _log_path(user_folder, subject):
+    return os.path.join(subject_path(user_folder, subject), SRS_LOG_FILE)
+
+
+def load_config(user_folder, subject):
+    """The subject's scheduler settings: {"scheduler": "sm2"} by default,
+    or {"scheduler": "fsrs", "weights": [...], "desired_retention": ...}."""
+    try:
+        with open(os.path.join(subject_path(user_folder, subject), SRS_CONFIG_FILE), encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        config = {}
+    config.setdefault("scheduler", "sm2")
+    return config
+
+
+def save_config(user_folder, subject, config):
+    with open(os.path.join(subject_path(user_folder, subject), SRS_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, sort_keys=True)
+
+
+def _review_order(review):
+    return review[0], review[3] if len(review) > 3 else ""
+
+
+def _replay(state, lines):
+    """Applies log lines to `state`; returns how many were valid. Lines that
+    don't parse (a write cut short by a crash) are skipped."""
+    applied = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+            cid = record.pop("id")
+            review = record.pop("review", None)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        applied += 1
+        card = state.get(cid, {})
+        newest = record.get("reviewed_at", "") >= card.get("reviewed_at", "")
+        if "history" in record:
+            # A whole-record line from before reviews were logged on their own.
+            if newest:
+                state[cid] = record
+            continue
+        history = card.get("history", [])
+        # The same review can be replayed twice: a union merge bringing back
+        # lines another device already compacted, or a crash between
+        # writing the snapshot and emptying the log.
+        if review and review not in history:
+            history.append(review)
+            if len(history) > 1 and _review_order(history[-2]) > _review_order(review):
+                history.sort(key=_review_order)  # another device's earlier review
+        if newest:
+            card = record
+        card["history"] = history
+        state[cid] = card
+    return applied
+
+
+def _read_log(user_folder, subject):
+    try:
+        with open(_log_path(user_folder, subject), encoding="utf-8") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
 def load_state(user_folder, subject):
+    """{card id: record} - the snapshot with the review log replayed."""
     try:
         with open(_state_path(user_folder, subject), encoding="utf-8") as f:
-            return json.load(f)
+            state = json.load(f)
     except (OSError, json.JSONDecodeError):
-        return {}
+        state = {}
+    _replay(state, _read_log(user_folder, subject))
+    return state
+
+
+def state_version(user_folder, subject):
+    """Changes whenever the subject's scheduling state does (None when it
+    has none yet) - lets derived data like the /review due index skip
+    subjects whose state it has already read."""
+    versions = []
+    for path in (_state_path(user_folder, subject), _log_path(user_folder, subject)):
+        try:
+            versions.append(cache.file_version(path))
+        except OSError:
+            versions.append("")
+    return "/".join(versions) if any(versions) else None
+
+
+def _log_line(cid, record):
+    """The card's latest review and its scheduling fields after it - not
+    the history, which replay rebuilds from the reviews."""
+    line = {key: value for key, value in record.items() if key != "history"}
+    line["review"] = record["history"][-1]
+    return json.dumps({"id": cid, **line}, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+class ReviewLog:
+    """Appends reviews to a subject's log as they happen, so a quiz that's
+    interrupted (Ctrl+C, a crash, a closed terminal) keeps every grade
+    given before it. Each review is written and flushed to the OS at once -
+    enough to survive the process dying - while the fsync that makes it
+    survive a power cut is batched: every FSYNC_EVERY_REVIEWS reviews,
+    after FSYNC_EVERY_SECONDS, and on close(). close() also compacts once
+    the log is long enough."""
+
+    def __init__(self, user_folder, subject, state):
+        self.user_folder = user_folder
+        self.subject = subject
+        self.state = state
+        self.reviews = 0
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        self._file = open(_log_path(self.user_folder, self.subject), "a+b")
+        if self._file.seek(0, os.SEEK_END):
+            self._file.seek(-1, os.SEEK_END)
+            if self._file.read(1) != b"\n":
+                self._file.write(b"\n")  # don't glue onto a line a crash cut short
+
+    def record(self, cid):
+        """Logs card `cid`'s current record (call right after review_card)."""
+        if self._file is None:
+            self._open()
+        self._file.write(_log_line(cid, self.state[cid]).encode("utf-8"))
+        self._file.flush()
+        self.reviews += 1
+        self._unsynced += 1
+        if self._unsynced >= FSYNC_EVERY_REVIEWS or time.monotonic() - self._last_sync >= FSYNC_EVERY_SECONDS:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+        if len(_read_log(self.user_folder, self.subject)) >= COMPACT_AFTER_REVIEWS:
+            save_state(self.user_folder, self.subject, self.state)
 
 
 def save_state(user_folder, subject, state):
-    with open(_state_path(user_folder, subject), "w", encoding="utf-8") as f:
+    """Compaction: writes `state` (which must include everything in the
+    log) as the new snapshot, then empties the log. The snapshot is
+    replaced atomically, and replaying the old log over the new snapshot
+    is harmless, so a crash in between loses nothing. The log is truncated
+    rather than deleted, so a pull that brings in another device's appends
+    still merges as a union."""
+    path = _state_path(user_folder, subject)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    if os.path.exists(_log_path(user_folder, subject)):
+        open(_log_path(user_folder, subject), "w").close()
+
+
+def fit_histories(state):
+    """Review histories /srs-optimize can fit FSRS to, and how many cards
+    were left out because their history doesn't start at their first
+    review (they were reviewed before histories were kept)."""
+    histories = [card.get("history", []) for card in state.values() if "fsrs_seed" not in card]
+    return histories, len(state) - len(histories)
 
 
 def due_card_ids(state, all_card_ids, today=None):
@@ -44,14 +237,29 @@ def due_card_ids(state, all_card_ids, today=None):
     return [cid for cid in all_card_ids if state.get(cid, {}).get("next_review_date", today_iso) <= today_iso]
 
 
-def review_card(state, cid, quality, today=None):
+def review_card(state, cid, quality, today=None, config=None, answer_seconds=None):
     """Records one review and reschedules the card. `quality` is a 1-5
     recall grade (1 = didn't know it, 5 = perfect recall) - a simplified
     SM-2 where scores below 3 restart the interval instead of failing
-    outright, since this is casual self-study, not a strict drill.
-    Mutates `state` in place and returns the updated record."""
+    outright, since this is casual self-study, not a strict drill. With an
+    FSRS `config` (see load_config) the interval comes from fsrs.py
+    instead; the SM-2 fields are kept up to date either way, so a subject
+    can switch back. `answer_seconds`, how long it took to recall the
+    answer, is kept with the review for /quiz-stats. Mutates `state` in
+    place and returns the updated record."""
     today = today or date.today()
     card = state.get(cid, {"repetitions": 0, "interval": 0, "ease_factor": DEFAULT_EASE_FACTOR})
+    if "fsrs_seed" not in card and card.get("next_review_date") and len(card.get("history", [])) < card["repetitions"]:
+        # Reviewed before histories were kept: remember what SM-2 had
+        # learned, so FSRS (now or after a later switch) doesn't start over.
+        card["fsrs_seed"] = fsrs.seed_from_sm2(card["interval"], card["ease_factor"], card["next_review_date"])
+    # [date, quality, seconds to answer or null, reviewed_at] per review:
+    # what FSRS replays, /srs-optimize fits to and /quiz-stats summarizes.
+    # reviewed_at tells a review apart from an identical one on another day
+    # or device, so replay can skip only true repeats.
+    reviewed_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    seconds = round(answer_seconds, 1) if answer_seconds is not None else None
+    card.setdefault("history", []).append([today.isoformat(), quality, seconds, reviewed_at])
 
     if quality < 3:
         card["repetitions"] = 0
@@ -66,6 +274,12 @@ def review_card(state, cid, quality, today=None):
             interval = round(card["interval"] * card["ease_factor"])
         card["repetitions"] = reps + 1
 
+    if config and config.get("scheduler") == "fsrs":
+        stability, difficulty = fsrs.card_memory(card["history"], config.get("weights"), card.get("fsrs_seed"))
+        interval = fsrs.next_interval(stability, config.get("desired_retention", fsrs.DEFAULT_DESIRED_RETENTION))
+        card["stability"] = round(stability, 4)
+        card["difficulty"] = round(difficulty, 4)
+
     card["interval"] = max(1, interval)
     card["ease_factor"] = max(
         MIN_EASE_FACTOR,
@@ -73,5 +287,6 @@ def review_card(state, cid, quality, today=None):
     )
     card["next_review_date"] = (today + timedelta(days=card["interval"])).isoformat()
     card["last_quality"] = quality
+    card["reviewed_at"] = reviewed_at
     state[cid] = card
     return card
@@ -0,0 +1,140 @@
+# sync.py - the local half of /sync and the exit auto-push: find out what
+# changed, commit it, and say whether there's anything to push - scoped to
+# the subjects/ folders this session actually writes to, never the whole
+# working tree. A blanket `git add .` used to sweep logs/error.log, /export
+# files and any other stray file in the clone into everyone's shared history.
+#
+# The push itself (spinners, permission check, fork fallback, rebase
+# retries) stays in cli.auto_git_push(); this module is UI-free so it can be
+# timed step by step and reused by anything else that needs to sync.
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from study_cli_hub.paths import subject_path
+
+_scopes = []
+
+# Held for a whole commit+push, so /sync, the exit push and the background
+# autosync worker never run git against the same clone at the same time.
+LOCK = threading.RLock()
+
+# porcelain=v2 entry type -> number of space-separated fields before the path.
+_ENTRY_FIELDS = {"1 ": 8, "2 ": 9, "u ": 10, "? ": 1}
+
+
+def add_scope(user_folder):
+    """Registers the folder a session writes into (subjects/<user>, or all
+    of subjects/ in Global mode). Called on startup and on /switch-user, so
+    changes made before switching still get synced on exit."""
+    scope = subject_path(user_folder)
+    if scope not in _scopes:
+        _scopes.append(scope)
+
+
+def scopes():
+    return list(_scopes) or [subject_path(None)]
+
+
+def is_git_repo(cwd=None):
+    result = subprocess.run(
+        ["git", "rev-parse", "--is-inside-work-tree"], capture_output=True, text=True, cwd=cwd or os.getcwd()
+    )
+    return result.returncode == 0
+
+
+def has_unmerged_paths(cwd=None):
+    result = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=U"], capture_output=True, text=True, cwd=cwd or os.getcwd()
+    )
+    return bool(result.stdout.strip())
+
+
+class StepTimer:
+    """Collects (step, seconds) pairs for a one-line timing breakdown."""
+
+    def __init__(self):
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - began))
+
+    def total(self):
+        return sum(seconds for _, seconds in self.steps)
+
+    def summary(self):
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps]
+        return " · ".join(parts + [f"total {self.total() * 1000:.0f}ms"])
+
+
+def scan(paths, cwd=None):
+    """One `git status --porcelain=v2 --branch` call, limited to `paths`,
+    that answers both questions a sync needs: which in-scope files changed,
+    and how far ahead of upstream the branch is (so there's no separate
+    `git rev-list @{u}..HEAD`). Returns None outside a git repo; "ahead" is
+    None when no upstream is configured yet."""
+    result = subprocess.run(
+        ["git", "status", "--porcelain=v2", "--branch", "--no-renames", "--"] + list(paths),
+        capture_output=True, text=True, cwd=cwd or os.getcwd(),
+    )
+    if result.returncode != 0:
+        return None
+    changed, ahead = [], None
+    for line in result.stdout.splitlines():
+        if line.startswith("# branch.ab "):
+            ahead = int(line.split()[2].lstrip("+"))
+        elif line[:2] in _ENTRY_FIELDS:
+            # The path is the last field and may itself contain spaces.
+            changed.append(line.split(" ", _ENTRY_FIELDS[line[:2]])[-1])
+    return {"changed": changed, "ahead": ahead}
+
+
+def _within(changed_path, scope):
+    changed_path = changed_path.strip('"')  # git quotes paths with unusual characters
+    scope = scope.replace(os.sep, "/").rstrip("/")
+    return changed_path == scope or changed_path.startswith(scope + "/")
+
+
+def commit_pending(paths=None, cwd=None, timer=None, message=None):
+    """Stages and commits in-scope changes only. Returns None outside a git
+    repo, else {"committed", "changed", "needs_push"}. needs_push also
+    covers commits from a *previous* run that never reached the remote, and
+    errs on the side of pushing when there's no upstream to compare with."""
+    paths = list(paths or scopes())
+    cwd = cwd or os.getcwd()
+    timer = timer or StepTimer()
+
+    with timer.step("status"):
+        state = scan(paths, cwd=cwd)
+    if state is None:
+        return None
+
+    committed = False
+    # git aborts the whole add/commit if any one pathspec matches nothing
+    # (e.g. a folder for a user who hasn't created a subject yet).
+    touched = [p for p in paths if any(_within(c, p) for c in state["changed"])]
+    if touched:
+        message = message or f"Auto-sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        with timer.step("add"):
+            subprocess.run(["git", "add", "-A", "--"] + touched, capture_output=True, text=True, cwd=cwd)
+        with timer.step("commit"):
+            # The pathspec limits the commit itself too, so anything the
+            # user staged by hand outside these folders stays uncommitted.
+            result = subprocess.run(
+                ["git", "commit", "-q", "-m", message, "--"] + touched, capture_output=True, text=True, cwd=cwd
+            )
+        committed = result.returncode == 0
+
+    return {
+        "committed": committed,
+        "changed": state["changed"],
+        "needs_push": committed or state["ahead"] is None or state["ahead"] > 0,
+    }
@@ -23,7 +23,7 @@ from prompt_toolkit.application import run_in_terminal as _run_in_terminal
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.formatted_text import ANSI
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.layout import HSplit, Layout, Window
+from prompt_toolkit.layout import HSplit, Layout, VSplit, Window, WindowAlign
 from prompt_toolkit.layout.containers import Float, FloatContainer
 from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
 from prompt_toolkit.layout.menus import CompletionsMenu
@@ -63,12 +63,16 @@ class CaptureConsole:
 
 class TuiShell:
     """Fixed layout: a header line, a scrollable output pane, a permanently
-    pinned input line (with live completion), and a bottom hint toolbar."""
+    pinned input line (with live completion), and a bottom hint toolbar.
 
-    def __init__(self, completer, on_submit, header_text="", hint_text=""):
+    status_text, if given, is a callable polled about once a second for a
+    short right-aligned toolbar status (e.g. background sync progress)."""
+
+    def __init__(self, completer, on_submit, header_text="", hint_text="", status_text=None):
         self.header_text = header_text
         self.hint_text = hint_text
         self.on_submit = on_submit
+        self.status_text = status_text
         self._output_text = ""
 
         self.input_buffer = Buffer(completer=completer, complete_while_typing=True, multiline=False)
@@ -98,6 +102,13 @@ class TuiShell:
         toolbar_window = Window(
             content=FormattedTextControl(text=lambda: [("reverse", self.hint_text)]), height=1
         )
+        if status_text is not None:
+            status_window = Window(
+                content=FormattedTextControl(text=lambda: [("reverse", f" {self.status_text()} " if self.status_text() else "")]),
+                height=1,
+                align=WindowAlign.RIGHT,
+            )
+            toolbar_window = VSplit([toolbar_window, status_window])
 
         body = HSplit([header_window, self._output_window, separator, input_window, toolbar_window])
         root = FloatContainer(
@@ -110,6 +121,7 @@ class TuiShell:
             key_bindings=kb,
             full_screen=True,
             mouse_support=False,
+            refresh_interval=1.0 if status_text is not None else None,
         )
 
     def _render_output(self):
@@ -0,0 +1,270 @@
+# viewer_screen.py - the full-screen frame the interactive viewers (text,
+# PDF, DOCX, CSV) draw into. Each viewer keeps its simple loop - render a
+# frame, read a key, update state - but instead of clearing the terminal
+# (a `clear` subprocess per keypress) and reprinting everything, the frame
+# is rendered with Rich into memory and handed to a prompt_toolkit
+# Application, whose renderer diffs it against what's already on screen
+# and only writes the cells that changed. Keys come from prompt_toolkit's
+# input parser too, so there's no raw termios switch per keypress.
+#
+# The Application runs in its own thread (with its own event loop) so the
+# viewer loops stay plain blocking code; key() and ask() hand results back
+# through queues. Classic full-terminal screens (help, stats tables, the
+# spinners around long operations) run inside suspended(), which steps out
+# of the full-screen frame and back in afterwards.
+#
+# When stdin/stdout aren't a terminal there's nothing to navigate: frames
+# are printed once as plain Rich output and key() answers "q", so a viewer
+# shows a single static frame and returns.
+import itertools
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.formatted_text import ANSI, to_formatted_text
+from prompt_toolkit.formatted_text.utils import split_lines
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.keys import Keys
+from prompt_toolkit.layout import ConditionalContainer, HSplit, Layout, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl, UIContent, UIControl
+from rich.console import Console
+
+from study_cli_hub.animations import is_interactive
+from study_cli_hub.tui import CaptureConsole
+
+# prompt_toolkit keys -> the key strings the viewers compare against (the
+# same escape sequences the old raw-terminal reader returned).
+_KEY_NAMES = {
+    Keys.Up: "\x1b[A",
+    Keys.Down: "\x1b[B",
+    Keys.Right: "\x1b[C",
+    Keys.Left: "\x1b[D",
+    Keys.Home: "\x1b[H",
+    Keys.End: "\x1b[F",
+    Keys.PageUp: "\x1b[5~",
+    Keys.PageDown: "\x1b[6~",
+    Keys.ControlM: "\r",
+    Keys.ControlC: "q",
+}
+
+
+def _frame_lines(ansi_text):
+    """Rich's ANSI output as prompt_toolkit lines of (style, text)
+    fragments. The ANSI parser yields one fragment per character; runs of
+    the same style are merged here, on the viewer's thread, so the UI
+    thread's render only has to copy a few fragments per line."""
+    fragments = to_formatted_text(ANSI(ansi_text))
+    merged = [
+        (style, "".join(fragment[1] for fragment in run))
+        for style, run in itertools.groupby(fragments, key=lambda fragment: fragment[0])
+    ]
+    return list(split_lines(merged))
+
+
+class _SkippedFrame(Console):
+    """Stands in for the frame console when more keys are already queued:
+    the frame would be replaced before it's seen, so printing is a no-op
+    and the viewer catches up with key repeat instead of lagging behind."""
+
+    def print(self, *objects, **kwargs):
+        pass
+
+
+class _FrameControl(UIControl):
+    """Shows the most recent frame's pre-split lines as they are."""
+
+    def __init__(self, on_render):
+        self.lines = [[]]
+        self._on_render = on_render
+
+    def create_content(self, width, height):
+        self._on_render(width)
+        lines = self.lines
+        return UIContent(get_line=lambda i: lines[i], line_count=len(lines), show_cursor=False)
+
+    def is_focusable(self):
+        return True
+
+
+class ViewerScreen:
+    def __init__(self):
+        self.interactive = is_interactive() and sys.stdout.isatty()
+        self._keys = queue.Queue()
+        self._answers = queue.Queue()
+        self._frame_width = None
+        self._status = ANSI("")
+        self._asking = None  # prompt text while ask() is waiting for input
+        self._thread = None
+        if not self.interactive:
+            self._console = Console()
+            return
+        self._console = CaptureConsole()
+
+        asking = Condition(lambda: self._asking is not None)
+        kb = KeyBindings()
+
+        for key, name in _KEY_NAMES.items():
+            kb.add(key, filter=~asking)(lambda event, name=name: self._put_key(name))
+
+        @kb.add(Keys.Any, filter=~asking)
+        def _char(event):
+            if len(event.data) == 1 and event.data.isprintable():
+                return self._put_key(event.data)
+
+        @kb.add("escape", filter=asking, eager=True)
+        @kb.add("c-c", filter=asking)
+        def _cancel(event):
+            self._finish_ask("")
+
+        self._input = Buffer(multiline=False, accept_handler=self._accept)
+        self._frame = _FrameControl(self._check_width)
+        self._body = Window(self._frame, wrap_lines=False)
+        self._input_window = Window(BufferControl(buffer=self._input), height=1)
+        footer = HSplit([
+            ConditionalContainer(Window(FormattedTextControl(lambda: self._status), height=1), filter=~asking),
+            ConditionalContainer(
+                VSplit([
+                    Window(FormattedTextControl(lambda: [("bold", f"{self._asking}: ")]), dont_extend_width=True),
+                    self._input_window,
+                ]),
+                filter=asking,
+            ),
+        ])
+        self.app = Application(
+            layout=Layout(HSplit([self._body, footer]), focused_element=self._body),
+            key_bindings=kb,
+            full_screen=True,
+            mouse_support=False,
+        )
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop()
+
+    def _start(self):
+        if not self.interactive or self._thread:
+            return
+        started = threading.Event()
+        # Not run(in_thread=True): that blocks the caller until the app
+        # exits. Signal handling is skipped off the main thread, so Ctrl+C
+        # arrives as a key instead.
+        self._thread = threading.Thread(target=self.app.run, kwargs={"pre_run": started.set}, daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def _stop(self):
+        if not self._thread:
+            return
+        self._call(self.app.exit)
+        self._thread.join()
+        self._thread = None
+
+    def _call(self, func):
+        """Runs func on the Application's event loop thread."""
+        self.app.loop.call_soon_threadsafe(func)
+
+    @contextmanager
+    def suspended(self):
+        """Leaves the full-screen frame while the block runs ordinary
+        print/input code, then comes back."""
+        running = self._thread is not None
+        self._stop()
+        try:
+            yield
+        finally:
+            if running:
+                self._start()
+
+    # -- drawing --------------------------------------------------------------
+
+    @contextmanager
+    def frame(self):
+        """Yields a Rich console to print the next frame into; it replaces
+        what's on screen when the block ends (unless more keys are already
+        waiting, in which case it's skipped)."""
+        if not self.interactive:
+            yield self._console
+            return
+        self._console.refresh_width()
+        if not self._keys.empty():
+            yield _SkippedFrame(width=self._console.rich.width)
+            return
+        self._frame_width = self._console.rich.width
+        yield self._console.rich
+        self._frame.lines = _frame_lines(self._console.pop_text())
+        if self._thread:
+            self.app.invalidate()
+
+    def _check_width(self, width):
+        if self._frame_width and width != self._frame_width:
+            # Resized: ask the viewer for a frame at the new width.
+            self._frame_width = None
+            self._keys.put(None)
+
+    def notify(self, message):
+        """A one-line message (Rich markup) shown under the frame until the
+        next keypress, for what used to be "print, then press Enter"."""
+        if not self.interactive:
+            self._console.print(message)
+            return
+        self._console.rich.print(message, end="")
+        self._status = ANSI(self._console.pop_text())
+        if self._thread:
+            self.app.invalidate()
+
+    # -- input ----------------------------------------------------------------
+
+    def _put_key(self, key):
+        self._keys.put(key)
+        # The viewer answers every key with a new frame, which invalidates
+        # the UI itself - NotImplemented skips prompt_toolkit's own redraw
+        # of the old frame in between.
+        return NotImplemented
+
+    def key(self, timeout=None):
+        """The next keypress, as the viewers' key strings. None when there's
+        nothing to act on but the frame should be redrawn (a resize, or
+        `timeout` seconds passing without a key)."""
+        if not self.interactive:
+            return "q"
+        try:
+            key = self._keys.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if self._status.value:
+            self._status = ANSI("")
+            self.app.invalidate()
+        return key
+
+    def ask(self, message):
+        """A line of input typed on the bottom line, without leaving the
+        frame. Escape/Ctrl+C cancel and return ""."""
+        if not self.interactive:
+            return ""
+
+        def begin():
+            self._input.reset()
+            self._asking = message
+            self.app.layout.focus(self._input_window)
+            self.app.invalidate()
+
+        self._call(begin)
+        return self._answers.get().strip()
+
+    def _accept(self, buffer):
+        self._finish_ask(buffer.text)
+        return False  # keep_text=False: the buffer is cleared
+
+    def _finish_ask(self, text):
+        self._asking = None
+        self.app.layout.focus(self._body)
+        self._answers.put(text)